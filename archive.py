@@ -0,0 +1,209 @@
+"""
+Cold storage for finished auctions.
+
+Archiving moves a completed auction's history out of the live database and
+into zstd-compressed Parquet files, one partition per auction:
+
+    archive/bids/auction=2025-final/part-0.parquet
+    archive/sold_items/auction=2025-final/part-0.parquet
+    ...
+
+The bids, sold_items, unsold_items and lot_events rows are moved. The final
+teams and items are copied (passwords are left out). The live database is
+then reset for the next auction and compacted. A backup snapshot is taken
+first. Stop the app while archiving and start it again afterwards, so its
+in-memory state is rebuilt.
+
+    python archive.py run biddi09i_game.db --name 2025-final
+    python archive.py list
+    python archive.py show sold_items --auction 2025-final
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import backup
+import bid_series
+
+ARCHIVE_DIR = "archive"
+
+# Moved out of the live database: (table, columns)
+HISTORY_TABLES = {
+    "bids": "id, item_id, team_name, amount, timestamp",
+    "sold_items": "id, item_name, sold_amount, rating, category, nationality, team_bought, timestamp",
+    "unsold_items": "id, item_name, rating, category, nationality, status, timestamp",
+    "lot_events": "id, item_id, event, amount, timestamp",
+}
+
+# Copied as they stood when the auction finished
+SNAPSHOT_TABLES = {
+    "teams": "name, budget_remaining, initial_budget, logo_url, max_players, max_foreign_players",
+    "items": "id, name, rating, category, nationality, base_price, winner_team, expected_price",
+}
+
+
+def _partition_dir(archive_dir, table, auction):
+    return os.path.join(archive_dir, table, f"auction={auction}")
+
+
+# Declared SQLite column types -> Parquet types, so every partition of a table has the same schema
+ARROW_TYPES = {"INTEGER": pa.int64(), "REAL": pa.float64(), "TEXT": pa.string()}
+
+
+def _export(conn, table, columns, path):
+    declared = {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+    cur = conn.execute(f"SELECT {columns} FROM {table}")
+    names = [column[0] for column in cur.description]
+    rows = cur.fetchall()
+    schema = pa.schema([(name, ARROW_TYPES.get(declared.get(name), pa.string())) for name in names])
+    data = pa.table({name: [row[i] for row in rows] for i, name in enumerate(names)}, schema=schema)
+    pq.write_table(data, path, compression="zstd")
+    return len(rows)
+
+
+def _compact(conn):
+    # Switching to incremental auto-vacuum needs one full VACUUM; later archives only
+    # release the freed pages, which is much cheaper on a large database
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    else:
+        conn.execute("PRAGMA incremental_vacuum")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+def archive_auction(db_path, name=None, archive_dir=ARCHIVE_DIR, reset=True):
+    """
+    Move a finished auction into ``archive_dir`` and compact the database.
+    Returns ({table: rows archived}, size before, size after).
+    With ``reset``, teams get their initial budgets back and players go back to
+    pending at their opening price, ready for the next auction.
+    """
+    name = name or datetime.now().strftime("%Y%m%d-%H%M%S")
+    if any(os.path.exists(_partition_dir(archive_dir, table, name)) for table in {**HISTORY_TABLES, **SNAPSHOT_TABLES}):
+        raise ValueError(f"An auction named {name!r} is already archived.")
+
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if conn.execute("SELECT COUNT(*) FROM items WHERE is_active = 1").fetchone()[0]:
+            raise ValueError("A lot is still open; close it before archiving the auction.")
+        backup.snapshot(db_path, "pre-archive")
+        size_before = os.path.getsize(db_path)
+
+        # Write every partition under a temporary name first, so a failed export leaves nothing behind
+        staged, counts = [], {}
+        try:
+            for table, columns in {**HISTORY_TABLES, **SNAPSHOT_TABLES}.items():
+                final = _partition_dir(archive_dir, table, name)
+                partial = final + ".partial"
+                os.makedirs(partial, exist_ok=True)
+                counts[table] = _export(conn, table, columns, os.path.join(partial, "part-0.parquet"))
+                staged.append((partial, final))
+        except Exception:
+            for partial, _ in staged:
+                shutil.rmtree(partial, ignore_errors=True)
+            raise
+        for partial, final in staged:
+            os.replace(partial, final)
+
+        conn.execute("BEGIN IMMEDIATE")
+        if reset:
+            # Opening price: the first 'open' event of each player, before any bid moved it (players
+            # auctioned before lot_events existed keep their last price)
+            conn.execute("""UPDATE items SET base_price = (
+                                SELECT e.amount FROM lot_events e WHERE e.item_id = items.id AND e.event = 'open'
+                                ORDER BY e.id LIMIT 1)
+                            WHERE EXISTS (SELECT 1 FROM lot_events e WHERE e.item_id = items.id
+                                          AND e.event = 'open' AND e.amount IS NOT NULL)""")
+            conn.execute("UPDATE items SET winner_team = NULL, is_active = 0, unsold_timestamp = 0, closes_at = NULL")
+            conn.execute("UPDATE teams SET budget_remaining = initial_budget")
+            for table in ("proxy_bids", "nominations", "lot_queue"):
+                conn.execute(f"DELETE FROM {table}")
+        for table in HISTORY_TABLES:
+            conn.execute(f"DELETE FROM {table}")
+        bid_series.note_deletion(conn.cursor())
+        conn.execute("COMMIT")
+
+        _compact(conn)
+    finally:
+        conn.close()
+    return counts, size_before, os.path.getsize(db_path)
+
+
+class ArchiveReader:
+    """Read-only access to archived auctions."""
+
+    def __init__(self, archive_dir=ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+
+    def tables(self):
+        if not os.path.isdir(self.archive_dir):
+            return []
+        return sorted(name for name in os.listdir(self.archive_dir)
+                      if os.path.isdir(os.path.join(self.archive_dir, name)))
+
+    def auctions(self):
+        """Names of every archived auction, oldest first."""
+        path = os.path.join(self.archive_dir, "teams")
+        if not os.path.isdir(path):
+            return []
+        return sorted(entry.split("=", 1)[1] for entry in os.listdir(path)
+                      if entry.startswith("auction=") and not entry.endswith(".partial"))
+
+    def read(self, table, auction=None, columns=None, where=None):
+        """
+        A pyarrow Table of ``table`` across every archived auction (with an
+        ``auction`` column), or only ``auction``. ``where`` is a pyarrow
+        dataset expression, e.g. ``ds.field("amount") > 100000000``.
+        """
+        dataset = ds.dataset(os.path.join(self.archive_dir, table), format="parquet",
+                             partitioning=ds.partitioning(pa.schema([("auction", pa.string())]), flavor="hive"),
+                             exclude_invalid_files=True)
+        if auction is not None:
+            expression = ds.field("auction") == auction
+            where = expression if where is None else where & expression
+        return dataset.to_table(columns=columns, filter=where)
+
+    def rows(self, table, auction=None, columns=None, where=None):
+        return self.read(table, auction, columns, where).to_pylist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive finished auctions to Parquet and read them back.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_cmd = commands.add_parser("run")
+    run_cmd.add_argument("db_path")
+    run_cmd.add_argument("--name", help="archive name (default: a timestamp)")
+    run_cmd.add_argument("--keep-state", action="store_true",
+                         help="move the history but leave team budgets and player results as they are")
+    list_cmd = commands.add_parser("list")
+    show_cmd = commands.add_parser("show")
+    show_cmd.add_argument("table", choices=sorted({**HISTORY_TABLES, **SNAPSHOT_TABLES}))
+    show_cmd.add_argument("--auction")
+    for command in (run_cmd, list_cmd, show_cmd):
+        command.add_argument("--dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        counts, size_before, size_after = archive_auction(args.db_path, args.name, args.dir, reset=not args.keep_state)
+        for table, count in counts.items():
+            print(f"{table:<14} {count:>8} rows")
+        print(f"database {size_before / 1e6:.2f} MB -> {size_after / 1e6:.2f} MB; restart the app to reload its state")
+    elif args.command == "list":
+        reader = ArchiveReader(args.dir)
+        for auction in reader.auctions():
+            sold = reader.read("sold_items", auction, columns=["sold_amount"]).column("sold_amount").to_pylist()
+            print(f"{auction:<24} {len(sold):>4} sold  ₹{sum(amount or 0 for amount in sold) / 10000000:.2f} Cr")
+    elif args.command == "show":
+        for row in ArchiveReader(args.dir).rows(args.table, args.auction):
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,22 @@
 import streamlit as st
 import sqlite3
+import os
+import json
 from datetime import datetime
 from streamlit_autorefresh import st_autorefresh
-import pandas as pd
+import lot_queue as lotq
+import increments
+import player_search
+import auth
+from auction_core import Auction, format_amount
+from auction_core.repository import (
+    get_active_item, get_active_items, get_highest_bid, get_pending_items, get_proxy_max,
+    get_setting, get_team_budgets, get_team_squad_info,
+)
+from image_cache import thumbnail_url  # Light: requests and Pillow load on the first cache_image call
+from models import Team, Sale, fetch
+import backup
+from squad_rules import BidRejected
 
 # Set up the Streamlit page (must be the first command)
 st.set_page_config(layout="wide")  # Use the full width of the screen
@@ -70,339 +84,102 @@ st.markdown(
 # Remove this
 # TEAMS = ["Team A", "Team B", "Team C", "Team D"]
 # STARTING_BUDGET = 100000
-BID_INCREMENT = 5000
 
 # ---------- DB SETUP ----------
-conn = sqlite3.connect('biddi09i_game.db', check_same_thread=False)
+DB_PATH = 'biddi09i_game.db'
+
+@st.cache_resource
+def get_auction():
+    # One per server process: applies the schema once and owns the writer, timer and backup
+    # threads plus the in-memory lot state (see auction_core/service.py)
+    return Auction(DB_PATH)
+
+auction = get_auction()
+authenticator = auction.authenticator
+squad_book = auction.squad_book
+increment_ladder = auction.increment_ladder
+lot_queue = auction.lot_queue
+lot_board = auction.lot_board
+lot_timer = auction.lot_timer
+bid_series = auction.bid_series
+team_pacing = auction.team_pacing
+backup_service = auction.backup_service
+
+conn = sqlite3.connect(DB_PATH, check_same_thread=False)  # Used for reads; writes go through the writer
 c = conn.cursor()
-
-# Create tables
-c.execute('''CREATE TABLE IF NOT EXISTS items (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    name TEXT NOT NULL,
-    rating INTEGER,
-    category TEXT,
-    nationality TEXT,
-    image_url TEXT,
-    base_price INTEGER,
-    is_active INTEGER DEFAULT 0,
-    winner_team TEXT DEFAULT NULL,
-    unsold_timestamp REAL DEFAULT 0
-)''')
-
-c.execute('''CREATE TABLE IF NOT EXISTS bids (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    item_id INTEGER,
-    team_name TEXT,
-    amount INTEGER,
-    timestamp TEXT
-)''')
-
-# Create teams table with password column
-c.execute('''CREATE TABLE IF NOT EXISTS teams (
-    name TEXT PRIMARY KEY,
-    budget_remaining INTEGER,
-    logo_url TEXT,
-    initial_budget INTEGER,
-    password TEXT NOT NULL
-)''')
-
-# Add password column if it doesn't exist
-try:
-    c.execute("ALTER TABLE teams ADD COLUMN password TEXT NOT NULL DEFAULT ''")
-except sqlite3.OperationalError:
-    # Handle the case where the column already exists or other errors
-    pass
-
-# Check if unsold_timestamp column exists
-try:
-    c.execute("SELECT unsold_timestamp FROM items LIMIT 1")
-except sqlite3.OperationalError:
-    # Column doesn't exist, add it
-    c.execute("ALTER TABLE items ADD COLUMN unsold_timestamp REAL DEFAULT 0")
-
-# Create sold_items table
-c.execute('''CREATE TABLE IF NOT EXISTS sold_items (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    item_name TEXT NOT NULL,
-    sold_amount INTEGER,
-    rating INTEGER,
-    category TEXT,
-    nationality TEXT,
-    team_bought TEXT,
-    timestamp TEXT
-)''')
-
-# Create unsold_items table
-c.execute('''CREATE TABLE IF NOT EXISTS unsold_items (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    item_name TEXT NOT NULL,
-    rating INTEGER,
-    category TEXT,
-    nationality TEXT,
-    status TEXT,
-    timestamp TEXT
-)''')
-
-conn.commit()
-
-# Initialize teams if not present
-# for team in TEAMS:
-#     c.execute("INSERT OR IGNORE INTO teams (name, budget_remaining) VALUES (?, ?)", (team, STARTING_BUDGET))
-conn.commit()
-
-# ---------- FUNCTIONS ----------
-
-def get_active_item():
-    c.execute("SELECT * FROM items WHERE is_active = 1 LIMIT 1")
-    return c.fetchone()
-
-def get_highest_bid(item_id):
-    c.execute("SELECT team_name, amount FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (item_id,))
-    return c.fetchone()
-
-def get_bid_increment(current_bid):
-    """
-    Returns bid increment based on current bid amount:
-    - Up to ₹1 crore: ₹5 lakh increment
-    - Up to ₹2 crore: ₹10 lakh increment
-    - Between ₹2-5 crore: ₹20 lakh increment
-    - Above ₹5 crore: ₹25 lakh increment
-    """
-    if current_bid < 10000000:  # Less than ₹1 crore
-        return 500000  # ₹5 lakh
-    elif current_bid < 20000000:  # Less than ₹2 crore
-        return 1000000  # ₹10 lakh
-    elif current_bid < 50000000:  # Less than ₹5 crore
-        return 2000000  # ₹20 lakh
-    else:  # Above ₹5 crore
-        return 2500000  # ₹25 lakh
-
-def place_bid(item_id, team_name, current_amount):
-    # Check if the item is already sold
-    c.execute("SELECT winner_team, base_price FROM items WHERE id = ?", (item_id,))
-    item_details = c.fetchone()
-    
-    # Get the team's remaining budget
-    remaining_budget = get_team_budget(team_name)
-
-    # Check if this is the first bid
-    c.execute("SELECT COUNT(*) FROM bids WHERE item_id = ?", (item_id,))
-    bid_count = c.fetchone()[0]
-    
-    # If it's the first bid, use base price, otherwise add increment
-    if bid_count == 0:
-        new_amount = current_amount  # Use base price for first bid
-    else:
-        # Get the appropriate bid increment based on current amount
-        increment = get_bid_increment(current_amount)
-        new_amount = current_amount + increment
-
-    # Check if the new bid amount exceeds the remaining budget
-    if new_amount > remaining_budget:
-        st.warning(f"{team_name} doesn't have enough budget to place this bid!")
-        return  # Exit the function if the bid cannot be placed
-
-    if item_details and item_details[0] != 'UNSOLD':
-        previous_winner = item_details[0]
-        previous_amount = item_details[1]
-        
-        # Refund the previous team
-        update_team_budget(previous_winner, previous_amount)
-        
-        # Remove the item from sold_items table
-        c.execute("DELETE FROM sold_items WHERE item_name = ?", (item_details[1],))
-
-    c.execute("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)",
-              (item_id, team_name, new_amount, datetime.now().isoformat()))
-    c.execute("UPDATE items SET base_price = ? WHERE id = ?", (new_amount, item_id))
-    conn.commit()
-
-def get_team_budget(team_name):
-    c.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,))
-    result = c.fetchone()
-    return result[0] if result else 0
-
-def update_team_budget(team_name, spent_amount):
-    c.execute("UPDATE teams SET budget_remaining = budget_remaining - ? WHERE name = ?", (spent_amount, team_name))
-    conn.commit()
-
-def get_all_items():
-    c.execute("SELECT id, name, rating, category, nationality, image_url, base_price, is_active, winner_team FROM items")
-    return c.fetchall()
-
-def set_active_item(item_id):
-    c.execute("UPDATE items SET is_active = 0")
-    c.execute("UPDATE items SET is_active = 1, winner_team = NULL WHERE id = ?", (item_id,))
-    conn.commit()
-
-def stop_all_bidding():
-    active = get_active_item()
-    if active:
-        item_id = active[0]
-        highest = get_highest_bid(item_id)
-        if highest:
-            winner, amount = highest
-            update_team_budget(winner, amount)
-            c.execute("UPDATE items SET winner_team = ? WHERE id = ?", (winner, item_id))
-            
-            # Insert sold item into sold_items table
-            c.execute("INSERT INTO sold_items (item_name, sold_amount, rating, category, nationality, team_bought, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
-                      (active[1], amount, active[2], active[3], active[4], winner, datetime.now().isoformat()))
-            
-            # Remove from unsold_items table
-            c.execute("DELETE FROM unsold_items WHERE item_name = ?", (active[1],))
-        
-        c.execute("UPDATE items SET is_active = 0 WHERE id = ?", (item_id,))
-        conn.commit()
-
-def get_team_budgets():
-    c.execute("SELECT name, budget_remaining, logo_url FROM teams")
-    return c.fetchall()
-
-def mark_as_unsold(item_id):
-    # Set a timestamp for when the item was marked as unsold
-    timestamp = datetime.now().timestamp()
-    c.execute("UPDATE items SET winner_team = 'UNSOLD', is_active = 0, unsold_timestamp = ? WHERE id = ?", 
-             (timestamp, item_id))
-    
-    # Get item details to insert into unsold_items table
-    c.execute("SELECT name, rating, category, nationality FROM items WHERE id = ?", (item_id,))
-    item_details = c.fetchone()
-    
-    if item_details:
-        c.execute("INSERT INTO unsold_items (item_name, rating, category, nationality, status, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
-                  (item_details[0], item_details[1], item_details[2], item_details[3], 'Unsold', datetime.now().isoformat()))
-    
-    conn.commit()
-
-def delete_item(item_id):
-    # Fetch the item name before deletion
-    c.execute("SELECT name FROM items WHERE id = ?", (item_id,))
-    item_name = c.fetchone()
-    
-    if item_name:
-        item_name = item_name[0]  # Get the actual name from the tuple
-
-        # Delete from items table
-        c.execute("DELETE FROM items WHERE id = ?", (item_id,))
-        # Delete from bids table
-        c.execute("DELETE FROM bids WHERE item_id = ?", (item_id,))
-        # Delete from sold_items and unsold_items tables
-        c.execute("DELETE FROM sold_items WHERE item_name = ?", (item_name,))
-        c.execute("DELETE FROM unsold_items WHERE item_name = ?", (item_name,))
-    
-    conn.commit()
-
-def get_team_squad_info(team_name):
-    # Fetch players for the specified team
-    c.execute("SELECT name, rating, category, nationality FROM items WHERE winner_team = ?", (team_name,))
-    players = c.fetchall()
-
-    # Initialize metrics
-    total_spent = 0
-    total_rating = 0
-    remaining_budget = 0  # This will be fetched from the teams table
-    num_batters = 0
-    num_bowlers = 0
-    num_allrounders = 0
-    num_wicketkeepers = 0
-    num_indian_players = 0
-    num_foreign_players = 0
-
-    # Calculate metrics
-    for player in players:
-        player_name, player_rating, player_category, player_nationality = player
-        total_rating += player_rating
-
-        # Fetch the sold amount for the player
-        c.execute("SELECT sold_amount FROM sold_items WHERE item_name = ?", (player_name,))
-        sold_amount_result = c.fetchone()
-        if sold_amount_result:
-            total_spent += sold_amount_result[0]  # Update total_spent with the sold amount
-
-        # Count player categories
-        if player_category == "Batsman":
-            num_batters += 1
-        elif player_category == "Bowler":
-            num_bowlers += 1
-        elif player_category == "Allrounder":
-            num_allrounders += 1
-        elif player_category == "Wicketkeeper":
-            num_wicketkeepers += 1
-
-        # Count nationality
-        if player_nationality == "India":
-            num_indian_players += 1
-        else:
-            num_foreign_players += 1
-
-    # Fetch remaining budget for the team
-    c.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,))
-    budget_result = c.fetchone()  # Store the result in a variable
-    remaining_budget = budget_result[0] if budget_result else 0  # Check the variable
-
-    # Total number of players bought
-    total_players_bought = len(players)
-
-    return {
-        "total_spent": total_spent,
-        "total_rating": total_rating,
-        "remaining_budget": remaining_budget,
-        "num_batters": num_batters,
-        "num_bowlers": num_bowlers,
-        "num_allrounders": num_allrounders,
-        "num_wicketkeepers": num_wicketkeepers,
-        "num_indian_players": num_indian_players,
-        "num_foreign_players": num_foreign_players,
-        "total_players_bought": total_players_bought,
-    }
-
-def format_amount(amount):
-    """
-    Format amount in lakhs (L) or crores (Cr)
-    Examples:
-    - 5000000 -> 50L (50 lakhs)
-    - 20000000 -> 2Cr (2 crores)
-    - 22500000 -> 2.25Cr (2.25 crores)
-    """
-    if amount >= 10000000:  # 1 crore = 10000000
-        crores = amount / 10000000
-        return f"₹{crores:.2f} Cr"
-    else:
-        lakhs = amount / 100000
-        return f"₹{lakhs:.0f}L"
-
-def get_sold_amount(item_name):
-    c.execute("SELECT sold_amount FROM sold_items WHERE item_name = ?", (item_name,))
-    result = c.fetchone()
-    return result[0] if result else 0
+# The analytical tabs and charts read the replica, so their scans don't contend with bids
+rconn = auction.replica.connect()
+rc = rconn.cursor()
+
+def logged_in_team():
+    """The team this browser session is logged in as, or None (an in-memory token check)."""
+    return authenticator.team(st.session_state.get('team_token'))
+
+@st.cache_data(max_entries=64)
+def lot_price_figure(item_id, version):
+    # Cached per series version, so an unchanged lot isn't redrawn every second
+    import plotly.graph_objects as go  # Loaded on first chart, not at startup
+    times, amounts, teams = bid_series.lot(item_id)
+    fig = go.Figure(go.Scatter(x=times, y=[amount / 10000000 for amount in amounts], text=teams,
+                               mode="lines+markers", line_shape="hv",
+                               hovertemplate="%{text}: ₹%{y:.2f} Cr<extra></extra>"))
+    fig.update_layout(height=320, margin=dict(l=10, r=10, t=10, b=10), yaxis_title="Price (₹ Cr)")
+    return fig
+
+@st.cache_data(max_entries=8)
+def team_spend_figure(version):
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    for team, (times, spent) in sorted(bid_series.spend().items()):
+        fig.add_trace(go.Scatter(x=times, y=[amount / 10000000 for amount in spent], name=team,
+                                 mode="lines", line_shape="hv"))
+    fig.update_layout(height=360, margin=dict(l=10, r=10, t=10, b=10), yaxis_title="Spent (₹ Cr)")
+    return fig
 
 # ---------- SIDEBAR ADMIN ----------
 st.sidebar.title("Admin Panel")
-admin_password = st.sidebar.text_input("Admin Password", type="password")
 
-# Check if the password is correct
-if admin_password == "admin123":
-    st.session_state['admin_authenticated'] = True  # Store authentication state
+# The password is checked once at login; reruns only look up the session token
+st.session_state['admin_authenticated'] = authenticator.is_admin(st.session_state.get('admin_token'))
+if st.session_state['admin_authenticated']:
     st.sidebar.success("Authenticated as Admin")
+    if st.sidebar.button("Log out", key="admin_logout"):
+        authenticator.sessions.revoke(st.session_state.pop('admin_token'))
+        st.rerun()
 else:
-    if 'admin_authenticated' in st.session_state:
-        st.sidebar.success("Already authenticated as Admin")
-    else:
-        st.sidebar.warning("Please enter the correct password.")
+    with st.sidebar.form("admin_login"):
+        admin_password = st.text_input("Admin Password", type="password")
+        admin_login = st.form_submit_button("Log in")
+    if admin_login:
+        try:
+            admin_token = authenticator.login_admin(c, admin_password, st.context.ip_address)
+        except auth.TooManyAttempts as e:
+            st.sidebar.error(str(e))
+        else:
+            if admin_token:
+                st.session_state['admin_token'] = admin_token
+                st.rerun()
+            st.sidebar.warning("Please enter the correct password.")
 
     # Add tabs for different admin functions
 if 'admin_authenticated' in st.session_state and st.session_state['admin_authenticated']:
     admin_tab = st.sidebar.radio("Admin Functions", ["Manage Teams", "Manage Players"])
+
+    with st.sidebar.expander("Change Admin Password"):
+        new_admin_password = st.text_input("New Admin Password", type="password")
+        if st.button("Save Admin Password") and new_admin_password:
+            auction.set_setting('admin_password_hash', auth.hash_password(new_admin_password)).result()
+            authenticator.sessions.revoke_subject("admin", "admin")
+            st.session_state['admin_token'] = authenticator.sessions.issue("admin", "admin")
+            st.success("Admin password changed.")
     
     if admin_tab == "Manage Teams":
         st.sidebar.subheader("Team Management")
         
         # Add Clear All Teams button
         if st.sidebar.button("🗑️ Clear All Teams", type="primary"):
-            c.execute("DELETE FROM teams")
-            conn.commit()
+            auction.execute_write("DELETE FROM teams").result()
+            squad_book.load(c)
             st.sidebar.success("All teams have been removed.")
             st.rerun()
         
@@ -412,23 +189,27 @@ if 'admin_authenticated' in st.session_state and st.session_state['admin_authent
         team_budget = st.sidebar.number_input("Initial Budget", min_value=0, value=100000)
         team_logo_url = st.sidebar.text_input("Team Logo URL")
         team_password = st.sidebar.text_input("Team Password", type="password")  # New password input
+        team_max_players = st.sidebar.number_input("Max Players (0 = no cap)", min_value=0, value=0)
+        team_max_foreign = st.sidebar.number_input("Max Overseas Players (0 = no cap)", min_value=0, value=0)
 
         if st.sidebar.button("Add Team") and new_team_name and team_password:
-            c.execute("INSERT OR REPLACE INTO teams (name, budget_remaining, logo_url, initial_budget, password) VALUES (?, ?, ?, ?, ?)",
-                      (new_team_name, team_budget, team_logo_url, team_budget, team_password))
-            conn.commit()
+            import image_cache
+            team_logo_key = image_cache.cache_image(team_logo_url)
+            auction.execute_write("INSERT OR REPLACE INTO teams (name, budget_remaining, logo_url, initial_budget, password, logo_key, max_players, max_foreign_players) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                          (new_team_name, team_budget, team_logo_url, team_budget, auth.hash_password(team_password), team_logo_key, team_max_players, team_max_foreign)).result()
+            authenticator.sessions.revoke_subject("team", new_team_name)
+            squad_book.refresh_team(c, new_team_name)
             st.sidebar.success(f"Team '{new_team_name}' added/updated with the specified password.")
         
         # Show existing teams
         st.sidebar.markdown("### Existing Teams")
-        c.execute("SELECT name, budget_remaining, logo_url, initial_budget FROM teams")
-        teams = c.fetchall()
+        teams = fetch(conn, Team, f"SELECT {Team.columns()} FROM teams").fetchall()
 
         for team in teams:
-            with st.sidebar.expander(f"Team: {team[0]}"):
+            with st.sidebar.expander(f"Team: {team.name}"):
                 # Convert budget to crores
-                current_budget = team[1] / 10000000  # Convert to crores
-                initial_budget = team[3] / 10000000  # Convert to crores
+                current_budget = team.budget_remaining / 10000000  # Convert to crores
+                initial_budget = team.initial_budget / 10000000  # Convert to crores
                 
                 # Format the budget display
                 budget_display = f"₹{current_budget:.2f} Cr"  # Format to two decimal places
@@ -437,20 +218,43 @@ if 'admin_authenticated' in st.session_state and st.session_state['admin_authent
                 st.write(f"Initial Budget: ₹{initial_budget:.2f} Cr")
                 
                 # Input fields for editing budget and logo
-                new_budget = st.number_input(f"Edit Budget for {team[0]}", min_value=0.0, value=max(0.0, current_budget), format="%.2f")
-                new_logo_url = st.text_input(f"Edit Logo URL for {team[0]}", value=team[2])
+                new_budget = st.number_input(f"Edit Budget for {team.name}", min_value=0.0, value=max(0.0, current_budget), format="%.2f")
+                new_logo_url = st.text_input(f"Edit Logo URL for {team.name}", value=team.logo_url)
+                new_max_players = st.number_input(f"Max Players for {team.name}", min_value=0, value=team.max_players or 0)
+                new_max_foreign = st.number_input(f"Max Overseas Players for {team.name}", min_value=0, value=team.max_foreign_players or 0)
                 
-                if st.button(f"Update {team[0]}", key=f"update_{team[0]}"):
+                if st.button(f"Update {team.name}", key=f"update_{team.name}"):
+                    # Only re-fetch the logo if its URL changed
+                    import image_cache
+                    new_logo_key = team.logo_key if new_logo_url == team.logo_url else image_cache.cache_image(new_logo_url)
                     # Update the team in the database
-                    c.execute("UPDATE teams SET budget_remaining = ?, logo_url = ? WHERE name = ?", 
-                              (new_budget * 10000000, new_logo_url, team[0]))  # Convert back to original value
-                    conn.commit()
-                    st.success(f"Updated budget and logo for {team[0]}.")
+                    auction.execute_write("UPDATE teams SET budget_remaining = ?, logo_url = ?, logo_key = ?, max_players = ?, max_foreign_players = ? WHERE name = ?", 
+                                  (new_budget * 10000000, new_logo_url, new_logo_key, new_max_players, new_max_foreign, team.name)).result()  # Convert back to original value
+                    squad_book.refresh_team(c, team.name)
+                    st.success(f"Updated budget, logo and squad limits for {team.name}.")
                     st.rerun()
-                if st.button(f"Delete {team[0]}", key=f"del_{team[0]}"):
-                    c.execute("DELETE FROM teams WHERE name = ?", (team[0],))
-                    conn.commit()
+                if st.button(f"Delete {team.name}", key=f"del_{team.name}"):
+                    auction.execute_write("DELETE FROM teams WHERE name = ?", (team.name,)).result()
+                    squad_book.refresh_team(c, team.name)
                     st.rerun()
+
+        # Auction-wide squad rules checked on every bid (see squad_rules.py)
+        st.sidebar.markdown("### Squad Rules")
+        min_squad_size = st.sidebar.number_input("Minimum Squad Size", min_value=0, value=squad_book.min_squad_size)
+        reserve_lakhs = st.sidebar.number_input("Reserve per Open Slot (in Lakhs)", min_value=0.0,
+                                                value=squad_book.reserve_price / 100000, format="%.2f")
+        category_minimums = {}
+        for category in ["Batsman", "Bowler", "Allrounder", "Wicketkeeper"]:
+            category_minimums[category] = st.sidebar.number_input(f"Minimum {category}s", min_value=0,
+                                                                  value=squad_book.category_minimums.get(category, 0))
+        if st.sidebar.button("Save Squad Rules"):
+            category_minimums = {name: count for name, count in category_minimums.items() if count}
+            auction.set_setting('min_squad_size', min_squad_size)
+            auction.set_setting('slot_reserve_price', int(reserve_lakhs * 100000))
+            auction.set_setting('category_minimums', json.dumps(category_minimums)).result()
+            squad_book.configure(min_squad_size=min_squad_size, category_minimums=category_minimums,
+                                 reserve_price=int(reserve_lakhs * 100000))
+            st.sidebar.success("Squad rules saved.")
     
     elif admin_tab == "Manage Players":
         # Existing player management code
@@ -469,42 +273,194 @@ if 'admin_authenticated' in st.session_state and st.session_state['admin_authent
                 # Convert base price from lakhs to actual amount
                 base_price_amount = int(item_base_price * 100000)
                 
-                c.execute("INSERT INTO items (name, rating, category, nationality, image_url, base_price) VALUES (?, ?, ?, ?, ?, ?)",
-                         (item_name, item_rating_value, item_category, item_nationality, item_image_url, base_price_amount))
-                conn.commit()
+                import image_cache
+                item_image_key = image_cache.cache_image(item_image_url)
+                auction.execute_write("INSERT INTO items (name, rating, category, nationality, image_url, base_price, image_key) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                              (item_name, item_rating_value, item_category, item_nationality, item_image_url, base_price_amount, item_image_key)).result()
                 formatted_base_price = format_amount(base_price_amount)
                 st.sidebar.success(f"Item '{item_name}' added with base price of {formatted_base_price}.")
             except ValueError:
                 st.sidebar.error("Please enter a valid integer for the Player Rating.")
 
+        if st.sidebar.button("🖼️ Cache Missing Images"):
+            cached_count = auction.cache_missing_images(conn)
+            st.sidebar.success(f"Cached {cached_count} images.")
+
+        st.sidebar.subheader("Lot Timer")
+        lot_duration = st.sidebar.number_input("Lot Duration (seconds, 0 = close manually)", min_value=0, value=int(get_setting(conn, 'lot_duration', 0)))
+        snipe_window = st.sidebar.number_input("Anti-Sniping Window (seconds)", min_value=0, value=int(get_setting(conn, 'snipe_window', 10)))
+        snipe_extension = st.sidebar.number_input("Extend Deadline To (seconds)", min_value=1, value=int(get_setting(conn, 'snipe_extension', 10)))
+        if st.sidebar.button("Save Timer Settings"):
+            auction.set_setting('lot_duration', lot_duration)
+            auction.set_setting('snipe_window', snipe_window)
+            auction.set_setting('snipe_extension', snipe_extension).result()
+            lot_timer.configure(duration=lot_duration, snipe_window=snipe_window, extension=snipe_extension)
+            st.sidebar.success("Timer settings saved.")
+
+        st.sidebar.subheader("Increment Ladder")
+        ladder_text = st.sidebar.text_input("Breakpoint:Increment (in Lakhs)", value=increments.format_steps(increment_ladder.steps))
+        if st.sidebar.button("Save Ladder"):
+            try:
+                increment_ladder.set_steps(increments.parse_steps(ladder_text))
+                auction.set_setting('increment_ladder', increment_ladder.to_json()).result()
+                st.sidebar.success("Increment ladder saved.")
+            except ValueError as e:
+                st.sidebar.error(f"Invalid ladder: {e}")
+
+        st.sidebar.subheader("Lot Queue")
+        queue_set = st.sidebar.selectbox("Set", lotq.SETS)
+        pending_items = {item.id: item.name for item in get_pending_items(conn)}
+        queue_picks = st.sidebar.multiselect("Players to Queue", list(pending_items), format_func=pending_items.get)
+        if st.sidebar.button("Add to Set") and queue_picks:
+            auction.enqueue_lots(queue_picks, queue_set).result()
+            auction.reload_lot_queue(conn)
+            st.sidebar.success(f"Queued {len(queue_picks)} players in the {queue_set} set.")
+
+        queue_counts = lot_queue.counts()
+        st.sidebar.write(" | ".join(f"{name.title()}: {count}" for name, count in queue_counts.items()))
+        next_lot_id = lot_queue.peek()
+        if next_lot_id is not None:
+            c.execute("SELECT name FROM items WHERE id = ?", (next_lot_id,))
+            next_lot = c.fetchone()
+            st.sidebar.write(f"Next up: **{next_lot[0] if next_lot else next_lot_id}** ({lot_queue.set_of(next_lot_id)})")
+            if st.sidebar.button("⏭️ Next Lot"):
+                current = get_active_item(conn)
+                auction.advance_lot(current.id if current else None).result()
+                st.rerun()
+        else:
+            st.sidebar.write("Queue is empty.")
+
+        auto_advance = st.sidebar.checkbox("Auto-advance when a timed lot closes", value=lot_queue.auto_advance)
+        if auto_advance != lot_queue.auto_advance:
+            auction.set_setting('auto_advance', '1' if auto_advance else '0')
+            lot_queue.auto_advance = auto_advance
+
+        st.sidebar.subheader("Accelerated Round")
+        unsold_ids = lotq.unsold_lots(c)
+        nominated_ids = lotq.nominated_lots(c)
+        round_source = st.sidebar.radio("Players", [f"All unsold ({len(unsold_ids)})", f"Team nominations ({len(nominated_ids)})"])
+        round_price_pct = st.sidebar.slider("Base Price (% of current)", min_value=10, max_value=100, value=100, step=5)
+        accelerated_duration = st.sidebar.number_input("Accelerated Lot Duration (seconds, 0 = normal)", min_value=0,
+                                                       value=lot_queue.durations.get('accelerated', 0))
+        if st.sidebar.button("🚀 Start Accelerated Round"):
+            round_ids = unsold_ids if round_source.startswith("All") else nominated_ids
+            auction.set_setting('accelerated_lot_duration', accelerated_duration)
+            lot_queue.durations['accelerated'] = accelerated_duration
+            if round_ids:
+                auction.start_accelerated_round(round_ids, round_price_pct / 100).result()
+                auction.reload_lot_queue(conn)
+                st.sidebar.success(f"{len(round_ids)} players queued for the accelerated round.")
+            else:
+                st.sidebar.warning("No unsold players to re-auction.")
+
         st.sidebar.subheader("Activate Bidding")
-        items = get_all_items()
-        item_names = [item[1] for item in items]
-        selected_item_name = st.sidebar.selectbox("Select Player to Activate Bidding", item_names)
+        valuation_model = get_setting(conn, 'valuation_model')
+        if valuation_model:
+            valuation_model = json.loads(valuation_model)
+            st.sidebar.caption(f"Valuation model trained on {valuation_model['samples']} sales "
+                               f"({valuation_model['trained_at'][:10]}). Retrain with `python valuation.py`.")
+        # Search + facets, one page at a time; the pick is keyed by id so duplicate names are fine
+        search_text = st.sidebar.text_input("Search Players", key="player_search")
+        search_facets = player_search.facets(c)
+        facet_cols = st.sidebar.columns(2)
+        with facet_cols[0]:
+            search_category = st.selectbox("Category", [None] + [value for value, _ in search_facets['category']],
+                                           format_func=lambda value: "All" if value is None else value, key="search_category")
+            search_band = st.selectbox("Rating", [None] + list(player_search.RATING_BANDS),
+                                       format_func=lambda value: "All" if value is None else value, key="search_band")
+        with facet_cols[1]:
+            search_nationality = st.selectbox("Nationality", [None] + [value for value, _ in search_facets['nationality']],
+                                              format_func=lambda value: "All" if value is None else value, key="search_nationality")
+            search_status = st.selectbox("Status", [None] + list(player_search.STATUSES),
+                                         format_func=lambda value: "All" if value is None else value, key="search_status")
+        search_page = st.sidebar.number_input("Page", min_value=1, value=1, key="search_page")
+        search_results, search_total = player_search.search(c, search_text, search_category, search_nationality,
+                                                            search_band, search_status, page=search_page - 1)
+        search_pages = max(1, -(-search_total // player_search.PAGE_SIZE))
+        st.sidebar.caption(f"{search_total} players match (page {search_page} of {search_pages})")
+        results_by_id = {item.id: item for item in search_results}
+        selected_item_id = st.sidebar.selectbox(
+            "Select Player to Activate Bidding", list(results_by_id),
+            format_func=lambda item_id: f"{results_by_id[item_id].name} ({results_by_id[item_id].rating}, {results_by_id[item_id].category})",
+        )
 
-        if selected_item_name:
-            selected_item = next(item for item in items if item[1] == selected_item_name)
+        if selected_item_id is not None:
+            selected_item = results_by_id[selected_item_id]
+            selected_item_name = selected_item.name
+            if selected_item.expected_price:
+                st.sidebar.caption(f"Expected price (valuation model): {format_amount(selected_item.expected_price)}")
             
             # Delete button
             if st.sidebar.button("🗑️ Delete Player", type="primary"):
-                delete_item(selected_item[0])
+                auction.delete_item(selected_item.id).result()
                 st.sidebar.success(f"Player '{selected_item_name}' deleted.")
                 st.rerun()
             
             # Unsold button
             if st.sidebar.button("❌ Mark as Unsold", type="secondary"):
-                mark_as_unsold(selected_item[0])
+                auction.mark_as_unsold(selected_item.id).result()
                 st.sidebar.success(f"Player '{selected_item_name}' marked as unsold.")
                 st.rerun()
             
             if st.sidebar.button("Start Bidding"):
-                set_active_item(selected_item[0])
-                st.sidebar.success(f"Bidding started for '{selected_item_name}'")
+                if lot_board.max_active > 1 and lot_board.is_full():
+                    st.sidebar.warning(f"{lot_board.max_active} lots are already open. Stop one first.")
+                else:
+                    auction.start_lot(selected_item.id).result()
+                    st.sidebar.success(f"Bidding started for '{selected_item_name}'")
+
+            if lot_board.max_active > 1 and selected_item.id in lot_board.active_ids():
+                if st.sidebar.button("Stop Selected Lot"):
+                    auction.stop_lot(selected_item.id).result()
+                    st.sidebar.success(f"Bidding stopped for '{selected_item_name}'.")
 
             if st.sidebar.button("Stop Current Bidding"):
-                stop_all_bidding()
+                auction.stop_all_bidding().result()
                 st.sidebar.success("Bidding stopped and winner updated.")
 
+        st.sidebar.subheader("Bid Traffic")
+        gate_metrics = auction.bid_gate.metrics()
+        st.sidebar.caption(f"Accepted: {gate_metrics['accepted']} | Coalesced duplicates: {gate_metrics['coalesced']} | "
+                           f"Throttled: {gate_metrics['throttled']}")
+        st.sidebar.caption(f"Writer: {auction.writer.commands} commands in {auction.writer.commits} commits")
+        replica_lag = auction.replica.lag()
+        st.sidebar.caption(f"Analytics replica: {'not synced yet' if replica_lag is None else f'{replica_lag:.1f}s behind'} | "
+                           f"{auction.replica.rows_applied} rows applied")
+        if auction.replica.last_error:
+            st.sidebar.warning(f"Replica sync failed: {auction.replica.last_error}")
+
+        st.sidebar.subheader("Backups")
+        if st.sidebar.button("💾 Snapshot Now"):
+            backup_service.request("manual", force=True)
+            st.sidebar.success("Snapshot requested.")
+        if backup_service.last_error:
+            st.sidebar.error(f"Last backup failed: {backup_service.last_error}")
+        recent_snapshots = backup.snapshots(backup_service.backup_dir)[:5]
+        for path in recent_snapshots:
+            st.sidebar.caption(os.path.basename(path))
+        if recent_snapshots:
+            st.sidebar.caption(f"Restore with `python backup.py restore <snapshot> {DB_PATH}` and restart the app.")
+
+        # Parallel rounds: several lots open at once, each with its own timer and price
+        max_active_lots = st.sidebar.number_input("Max Simultaneous Lots", min_value=1, max_value=12,
+                                                  value=lot_board.max_active)
+        if max_active_lots != lot_board.max_active:
+            auction.set_setting('max_active_lots', max_active_lots)
+            lot_board.max_active = max_active_lots
+
+        # Broadcast overlay for OBS, served outside Streamlit (see overlay.py)
+        st.sidebar.subheader("Broadcast Overlay")
+        overlay_port = st.sidebar.number_input("Overlay Port (0 = off)", min_value=0, max_value=65535,
+                                               value=int(get_setting(conn, 'overlay_port', 0)))
+        if st.sidebar.button("Apply Overlay Port"):
+            auction.set_setting('overlay_port', overlay_port).result()
+            try:
+                auction.start_overlay(overlay_port)
+            except OSError as exc:
+                st.sidebar.error(f"Could not start the overlay on port {overlay_port}: {exc}")
+        if auction.overlay is not None:
+            st.sidebar.caption(f"Browser source: http://localhost:{auction.overlay.port}/")
+
 # ---------- MAIN UI ----------
 st.title("💸 Real-Time Bidding Game")
 
@@ -598,6 +554,13 @@ st.markdown("""
             background: rgba(40,167,69,0.13);
             box-shadow: 0 2px 8px rgba(40,167,69,0.10);
         }
+        .team-maxbid {
+            font-size: 11px;
+            font-weight: 600;
+            color: #6c757d;
+            margin: 0;
+            white-space: nowrap;
+        }
 
         /* Tab Styling */
         .stTabs {
@@ -650,37 +613,43 @@ st.markdown("""
     """, unsafe_allow_html=True)
 
 # Fetch available teams from the database
-c.execute("SELECT name, budget_remaining, password FROM teams")
-available_teams = c.fetchall()
+available_teams = fetch(conn, Team, "SELECT name, budget_remaining FROM teams").fetchall()
 
 # Create a list of team names
-team_names = [team[0] for team in available_teams]
-
-# Create tabs for different sections
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "🎯 Bidding & Budgets", 
-    "📊 Players Market", 
-    "👥 Team Squad", 
+team_names = [team.name for team in available_teams]
+
+# One view at a time: unlike st.tabs, which runs every tab's body on every rerun, only the
+# selected view's queries, tables and charts run (pandas and plotly load when a view needs them)
+VIEWS = [
+    "🎯 Bidding & Budgets",
+    "📊 Players Market",
+    "👥 Team Squad",
     "📜 Auction History",
-    "🌟 Special Bidding Zone"  # New tab
-])
+    "🌟 Special Bidding Zone",
+]
+view = st.radio("View", VIEWS, horizontal=True, key="main_view", label_visibility="collapsed")
 
 # Tab 1: Bidding & Budgets
-with tab1:
+if view == VIEWS[0]:
+    team_pacing.refresh(rc)  # Only the views that show pacing pay for its incremental read
     st.subheader("Team Budgets")
-    team_budgets = get_team_budgets()
+    team_budgets = get_team_budgets(conn)
     cols = st.columns(len(team_budgets)) if team_budgets else st.columns(1)
 
     # Display teams in a grid
     st.markdown('<div class="team-grid">', unsafe_allow_html=True)
-    for idx, (team, budget, logo_url) in enumerate(team_budgets):
+    for idx, team_row in enumerate(team_budgets):
+        team, budget, logo_url, logo_key = team_row.name, team_row.budget_remaining, team_row.logo_url, team_row.logo_key
+        pacing = team_pacing.dashboard(team)
         with cols[idx]:
             st.markdown(
                 f"""
                 <div class=\"team-card\">
-                    <img src=\"{logo_url}\" alt=\"{team} logo\" />
+                    <img src=\"{thumbnail_url(logo_key, 'logo', logo_url)}\" alt=\"{team} logo\" />
                     <div class=\"team-name\">{team}</div>
                     <div class=\"team-budget\">{format_amount(budget)}</div>
+                    <div class=\"team-maxbid\">Max bid {format_amount(squad_book.max_bid(team))}</div>
+                    <div class=\"team-maxbid\">Pace ×{pacing['pace'] if pacing else 0:.2f} · Risk {pacing['risk'] if pacing else 0}%</div>
                 </div>
                 """,
                 unsafe_allow_html=True
@@ -764,23 +733,19 @@ with tab1:
     # --- RECENT 5 PLAYERS PANEL ---
     recent_players = []
     # Fetch the current active item
-    active_item = get_active_item()
+    active_item = get_active_item(conn)
     if active_item:
-        item_id, item_name, item_rating, item_category, item_nationality, item_image_url, item_base_price, is_active, winner, unsold_timestamp = active_item
         # Check if bidding is ongoing (no winner yet)
-        c.execute("SELECT winner_team FROM items WHERE id = ?", (item_id,))
-        winner_team = c.fetchone()[0]
-        if winner_team is None:
+        if active_item.winner_team is None:
             recent_players.append({
-                'name': item_name,
+                'name': active_item.name,
                 'status': 'bidding',
                 'icon': '🔨',
                 'amount': None,
                 'team': None
             })
     # Fetch the last 4 finished bids (sold)
-    c.execute("SELECT item_name, sold_amount, team_bought, timestamp FROM sold_items ORDER BY timestamp DESC LIMIT 4")
-    sold = c.fetchall()
+    sold = fetch(conn, Sale, "SELECT item_name, sold_amount, team_bought, timestamp FROM sold_items ORDER BY timestamp DESC LIMIT 4").fetchall()
 
     # Fetch the last 4 unsold items
     c.execute("SELECT item_name, timestamp FROM unsold_items ORDER BY timestamp DESC LIMIT 4")
@@ -788,9 +753,9 @@ with tab1:
 
     # Merge and sort by timestamp (most recent first)
     merged = []
-    for s in sold:
-        formatted_amount = format_amount(s[1])  # Format the sold amount
-        merged.append({'name': s[0], 'status': 'sold', 'icon': '✅', 'amount': formatted_amount, 'team': s[2], 'ts': s[3]})
+    for sale in sold:
+        formatted_amount = format_amount(sale.sold_amount)  # Format the sold amount
+        merged.append({'name': sale.item_name, 'status': 'sold', 'icon': '✅', 'amount': formatted_amount, 'team': sale.team_bought, 'ts': sale.timestamp})
     for u in unsold:
         merged.append({'name': u[0], 'status': 'unsold', 'icon': '❌', 'amount': None, 'team': None, 'ts': u[1]})
 
@@ -953,17 +918,60 @@ with tab1:
 ''', unsafe_allow_html=True)
 
 
+    # Parallel round: a compact card per open lot, each with its own Bid button
+    active_lots = get_active_items(conn)
+    if len(active_lots) > 1:
+        st.subheader(f"🟢 Active Lots ({len(active_lots)})")
+        lot_cols = st.columns(min(len(active_lots), 3))
+        bidding_team = logged_in_team()
+        for index, lot in enumerate(active_lots):
+            lot_id, lot_name, lot_category, lot_nationality = lot.id, lot.name, lot.category, lot.nationality
+            lot_price, lot_leader = lot_board.snapshot(lot_id) or (lot.base_price, None)
+            lot_left = lot_timer.remaining(lot_id)
+            with lot_cols[index % len(lot_cols)]:
+                st.markdown(
+                    f"""
+                    <div style="text-align: center;">
+                        <img src="{thumbnail_url(lot.image_key, 'avatar', lot.image_url)}" style="width: 80px; height: 80px; border-radius: 50%; object-fit: cover;"/>
+                        <h4 style="margin: 4px 0;">{lot_name}</h4>
+                        <p style="margin: 0;">{format_amount(lot_price)} · {lot_leader or "No bids yet"}</p>
+                        <p style="margin: 0;">{f"⏱️ {int(lot_left)}s" if lot_left is not None else ""}</p>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                if bidding_team:
+                    next_bid = increment_ladder.next_price(lot_price) if lot_leader else lot_price
+                    bid_limit = squad_book.limit_or_none(bidding_team, lot_category, lot_nationality, lot_id)
+                    can_bid = bid_limit is not None and next_bid <= bid_limit and lot_leader != bidding_team
+                    if st.button(f"Bid {format_amount(next_bid)}", key=f"grid_bid_{lot_id}", disabled=not can_bid):
+                        try:
+                            auction.place_bid(lot_id, bidding_team, lot_price).result()
+                        except BidRejected as e:
+                            st.warning(str(e))
+                        else:
+                            st.rerun()
+        st.markdown("---")
+
     # Bidding section
-    active_item = get_active_item()
+    active_item = get_active_item(conn)
 
     if not active_item:
         st.warning("No item is currently open for bidding.")
     else:
-        item_id, item_name, item_rating, item_category, item_nationality, item_image_url, item_base_price, is_active, winner, unsold_timestamp = active_item
+        item_id, item_name, item_rating = active_item.id, active_item.name, active_item.rating
+        item_category, item_nationality = active_item.category, active_item.nationality
+        item_image_url, item_image_key = active_item.image_url, active_item.image_key
+        item_base_price, unsold_timestamp = active_item.base_price, active_item.unsold_timestamp
         
         # Display the player's name at the top
         st.header(f"🟢 {item_name}")
 
+        # Countdown for timed lots (the server closes the lot when it reaches zero)
+        time_left = lot_timer.remaining(item_id)
+        if time_left is not None:
+            st.markdown(f"⏱️ **{int(time_left)}s** left on this lot")
+
         # Create three columns for image, current highest bid, and current bidder
         cols = st.columns([1, 1, 1, 1])  # Equal width columns with no gap
 
@@ -996,7 +1004,7 @@ with tab1:
                         position: relative;
                         box-shadow: 0 4px 8px rgba(0, 0, 0, 0.1);
                     ">
-                        <img src="{item_image_url}" 
+                        <img src="{thumbnail_url(item_image_key, 'card', item_image_url)}" 
                             style="
                                 width: 100%;
                                 height: 100%;
@@ -1048,9 +1056,9 @@ with tab1:
             )
 
         # Get the highest bid
-        highest = get_highest_bid(item_id)
-        current_bid = highest[1] if highest else item_base_price
-        current_team = highest[0] if highest else "No bids yet"
+        highest = get_highest_bid(conn, item_id)
+        current_bid = highest.amount if highest else item_base_price
+        current_team = highest.team_name if highest else "No bids yet"
 
         # Current Highest Bid Section
         with cols[1]:
@@ -1376,9 +1384,9 @@ with tab1:
                     unsafe_allow_html=True
                 )
             else:
-                c.execute("SELECT logo_url FROM teams WHERE name = ?", (current_team,))
+                c.execute("SELECT logo_url, logo_key FROM teams WHERE name = ?", (current_team,))
                 team_logo_result = c.fetchone()
-                team_logo_url = team_logo_result[0] if team_logo_result else ""
+                team_logo_url = thumbnail_url(team_logo_result[1], 'logo', team_logo_result[0]) if team_logo_result else ""
                 
                 st.markdown(
                     f"""
@@ -1644,35 +1652,77 @@ with tab1:
         selected_team = st.selectbox("Select Team", team_names)
 
         # Find the selected team's details
-        selected_team_details = next((team for team in available_teams if team[0] == selected_team), None)
+        selected_team_details = next((team for team in available_teams if team.name == selected_team), None)
 
         if selected_team_details:
             # Ensure that selected_team_details has the expected number of values
-            if len(selected_team_details) == 3:
-                team_name, budget, password = selected_team_details
-                password_verified = False
-
-                # Password input field
-                password_input = st.text_input(f"Enter password for {team_name}", type="password")
+            if selected_team_details.budget_remaining is not None:
+                team_name, budget = selected_team_details.name, selected_team_details.budget_remaining
+                password_verified = logged_in_team() == team_name
 
-                # Check if the password is correct
-                if password_input == password:
-                    st.session_state['team_password'] = password  # Store the password in session state
-                    st.session_state['selected_team'] = team_name  # Store the selected team
-                    password_verified = True
+                if password_verified:
+                    if st.button(f"Log out of {team_name}"):
+                        authenticator.sessions.revoke(st.session_state.pop('team_token'))
+                        st.rerun()
+                else:
+                    # The password is checked once at login; reruns only look up the session token
+                    with st.form(f"login_{team_name}"):
+                        password_input = st.text_input(f"Enter password for {team_name}", type="password")
+                        team_login = st.form_submit_button("Log in")
+                    if team_login:
+                        try:
+                            team_token, upgraded_hash = authenticator.login_team(c, team_name, password_input, st.context.ip_address)
+                        except auth.TooManyAttempts as e:
+                            st.error(str(e))
+                        else:
+                            if team_token:
+                                if upgraded_hash:
+                                    # Replace a plaintext password from before hashing
+                                    auction.execute_write("UPDATE teams SET password = ? WHERE name = ?", (upgraded_hash, team_name))
+                                st.session_state['team_token'] = team_token
+                                st.session_state['selected_team'] = team_name  # Store the selected team
+                                st.rerun()
+                            st.warning("Incorrect password.")
 
                 # Only show bid button if password is verified
                 if password_verified:
+                    # Disable the button when the next price is above the team's precomputed limit
+                    can_bid = False
+                    if active_item:
+                        next_bid = increment_ladder.next_price(current_bid) if highest else current_bid
+                        bid_limit = squad_book.limit_or_none(team_name, item_category, item_nationality, item_id)
+                        can_bid = bid_limit is not None and next_bid <= bid_limit
+                        if not can_bid:
+                            st.caption(f"{team_name} can't bid {format_amount(next_bid)} on this player "
+                                       f"(max affordable: {format_amount(max(bid_limit or 0, 0))}).")
+
                     # Create a button using Streamlit's button function
-                    if st.button(f"Bid ({team_name})"):
-                        if budget < current_bid + BID_INCREMENT:
-                            st.warning(f"{team_name} doesn't have enough budget!")
+                    if st.button(f"Bid ({team_name})", disabled=not can_bid):
+                        try:
+                            auction.place_bid(item_id, team_name, current_bid).result()
+                        except BidRejected as e:
+                            st.warning(str(e))
                         else:
-                            place_bid(item_id, team_name, current_bid)
                             formatted_amount = format_amount(current_bid)
                             st.success(f"Bid placed by {team_name} for {formatted_amount}.")
                             st.session_state['selected_team'] = team_name  # Store the selected team in session state
                             st.rerun()
+
+                    # Proxy bidding: the server bids on the team's behalf up to a confidential maximum
+                    if active_item:
+                        proxy_max = get_proxy_max(conn, item_id, team_name)
+                        if proxy_max:
+                            st.info(f"Auto-bidding for {team_name} up to {format_amount(proxy_max)}.")
+                        proxy_max_cr = st.number_input("Auto-bid up to (in Crores)", min_value=0.0,
+                                                       value=(proxy_max or 0) / 10000000, format="%.2f", key=f"proxy_{item_id}")
+                        if st.button("Set Max Bid") and proxy_max_cr > 0:
+                            try:
+                                proxy_bids = auction.register_proxy(item_id, team_name, int(proxy_max_cr * 10000000)).result()
+                            except BidRejected as e:
+                                st.warning(str(e))
+                            else:
+                                st.success(f"Max bid set. {len(proxy_bids)} automatic bids placed.")
+                                st.rerun()
             else:
                 st.warning("Team details are incomplete. Please check the database.")
         else:
@@ -1680,7 +1730,7 @@ with tab1:
 
 
 # Tab 2: Players Market
-with tab2:
+if view == VIEWS[1]:
     st.subheader("Players Market")
     
     # Add dropdown to select which table to view
@@ -1693,8 +1743,8 @@ with tab2:
     # Show the selected table based on dropdown choice
     if market_view == "Players Sold":
         # Update the SQL query to change the order of columns
-        c.execute("SELECT item_name, rating, category, nationality, sold_amount, team_bought FROM sold_items ORDER BY timestamp DESC")
-        sold_items = c.fetchall()
+        rc.execute("SELECT item_name, rating, category, nationality, sold_amount, team_bought FROM sold_items ORDER BY timestamp DESC")
+        sold_items = rc.fetchall()
 
         if sold_items:
             st.markdown("""
@@ -1715,6 +1765,7 @@ with tab2:
                 formatted_item[4] = format_amount(item[4])  # Format the sold_amount
                 formatted_sold_items.append(formatted_item)
             
+            import pandas as pd  # Loaded the first time a table is shown, not at startup
             sold_df = pd.DataFrame(
                 formatted_sold_items,
                 columns=["Player Name", "Rating", "Category", "Nationality", "Sold Amount", "Team Bought"]
@@ -1730,13 +1781,13 @@ with tab2:
     
     else:  # Players Unsold view
         # Update the query to include base_price
-        c.execute("""
+        rc.execute("""
             SELECT i.name AS item_name, i.rating, i.category, i.nationality, i.base_price, 'Unsold' AS status 
             FROM items i 
             WHERE i.is_active = 0 AND i.winner_team = 'UNSOLD'
             ORDER BY i.unsold_timestamp DESC
         """)
-        unsold_items = c.fetchall()
+        unsold_items = rc.fetchall()
 
         if unsold_items:
             st.markdown("""
@@ -1757,6 +1808,7 @@ with tab2:
                 formatted_item[4] = format_amount(item[4])  # Format the base_price
                 formatted_unsold_items.append(formatted_item)
             
+            import pandas as pd
             unsold_df = pd.DataFrame(
                 formatted_unsold_items,
                 columns=["Player Name", "Rating", "Category", "Nationality", "Base Price", "Status"]
@@ -1770,8 +1822,18 @@ with tab2:
         else:
             st.info("No players are currently unsold.")
 
+        # Logged-in teams can nominate unsold players for the accelerated round
+        nominating_team = logged_in_team()
+        if unsold_items and nominating_team:
+            rc.execute("SELECT id, name FROM items WHERE winner_team = 'UNSOLD' ORDER BY rating DESC")
+            nominable = dict(rc.fetchall())
+            nominations = st.multiselect("Nominate for the accelerated round", list(nominable), format_func=nominable.get)
+            if st.button("Nominate") and nominations:
+                auction.nominate_lots(nominating_team, nominations).result()
+                st.success(f"{nominating_team} nominated {len(nominations)} players.")
+
 # Tab 3: Team Squad
-with tab3:
+if view == VIEWS[2]:
     st.subheader("Team Squad")
     
     # Dropdown for team selection
@@ -1779,7 +1841,7 @@ with tab3:
 
     # After the team selection, display the squad information
     if selected_team_name:
-        team_info = get_team_squad_info(selected_team_name)
+        team_info = get_team_squad_info(rconn, selected_team_name)
 
         # Create two columns for the information display
         col1, col2 = st.columns(2)
@@ -1798,11 +1860,42 @@ with tab3:
             st.write(f"Indian Players: {team_info['num_indian_players']}")
             st.write(f"Foreign Players: {team_info['num_foreign_players']}")
 
+        # Spend pacing and projected squad completion, from cached aggregates (see team_pacing.py)
+        team_pacing.refresh(rc)
+        pacing = team_pacing.dashboard(selected_team_name)
+        if pacing:
+            st.markdown("#### Spend Pacing")
+            pace_cols = st.columns(4)
+            pace_cols[0].metric("Spent", format_amount(pacing['spent']),
+                                f"{format_amount(pacing['spend_per_lot'])} per lot auctioned", delta_color="off")
+            pace_cols[1].metric("Pace", f"×{pacing['pace']:.2f}",
+                                help="Share of the budget spent divided by the share of lots auctioned. "
+                                     "Above 1 means the team is spending faster than the auction is progressing.")
+            pace_cols[2].metric("Open Slots", pacing['open_slots'], f"{pacing['remaining_lots']} lots left", delta_color="off")
+            risk_label = "High" if pacing['risk'] >= 85 else "Medium" if pacing['risk'] >= 50 else "Low"
+            pace_cols[3].metric("Overspend Risk", f"{pacing['risk']}%", risk_label, delta_color="off")
+
+            st.write(f"Projected cost to fill open slots: {format_amount(pacing['projected_cost'])} "
+                     f"of {format_amount(pacing['budget'])} left "
+                     f"({format_amount(pacing['budget_per_remaining_lot'])} per remaining lot)")
+            if pacing['shortfall']:
+                st.warning(f"At predicted prices {selected_team_name} is {format_amount(pacing['shortfall'])} short of filling its squad.")
+            if pacing['categories']:
+                import pandas as pd
+                slots_df = pd.DataFrame(
+                    [[row['category'], row['have'], row['open'], row['available'],
+                      format_amount(row['median_price']), format_amount(row['projected_cost'])]
+                     for row in pacing['categories']],
+                    columns=["Category", "Have", "Open Slots", "Players Left", "Median Predicted Price", "Projected Cost"]
+                )
+                st.dataframe(slots_df, use_container_width=True, hide_index=True)
+
         # Fetch and display the squad in a table
-        c.execute("SELECT name, rating, category, nationality FROM items WHERE winner_team = ?", (selected_team_name,))
-        players = c.fetchall()
+        rc.execute("SELECT name, rating, category, nationality FROM items WHERE winner_team = ?", (selected_team_name,))
+        players = rc.fetchall()
 
         if players:
+            import pandas as pd
             players_df = pd.DataFrame(players, columns=["Player Name", "Rating", "Category", "Nationality"])
             st.dataframe(players_df)
         else:
@@ -1811,50 +1904,68 @@ with tab3:
         st.warning("Please select a team to view the squad information.")
 
 # Tab 4: Auction History
-with tab4:
+if view == VIEWS[3]:
+    bid_series.refresh(rc)
+    st.subheader("📈 Bid Progression")
+    chart_lot_ids = bid_series.lot_ids()
+    if chart_lot_ids:
+        rc.execute(f"SELECT id, name FROM items WHERE id IN ({','.join('?' * len(chart_lot_ids))})", chart_lot_ids)
+        chart_lot_names = dict(rc.fetchall())
+        chart_lot_ids = [item_id for item_id in reversed(chart_lot_ids) if item_id in chart_lot_names]
+        current_lot = get_active_item(conn)
+        default_index = chart_lot_ids.index(current_lot.id) if current_lot and current_lot.id in chart_lot_ids else 0
+        chart_lot = st.selectbox("Player", chart_lot_ids, index=default_index,
+                                 format_func=chart_lot_names.get, key="chart_lot")
+        st.plotly_chart(lot_price_figure(chart_lot, bid_series.version), use_container_width=True)
+        st.markdown("**Team spend over the auction**")
+        st.plotly_chart(team_spend_figure(bid_series.version), use_container_width=True)
+    else:
+        st.write("No bids yet.")
+
     st.subheader("Auction History")
     
     # Fetch sold items ordered by timestamp in descending order
-    c.execute("SELECT item_name, team_bought FROM sold_items ORDER BY timestamp DESC")
-    sold_items = c.fetchall()
+    sold_items = fetch(rconn, Sale, "SELECT item_name, team_bought FROM sold_items ORDER BY timestamp DESC").fetchall()
 
     # Fetch unsold items ordered by timestamp in descending order
-    c.execute("SELECT item_name FROM unsold_items ORDER BY timestamp DESC")
-    unsold_items = c.fetchall()
+    rc.execute("SELECT item_name FROM unsold_items ORDER BY timestamp DESC")
+    unsold_items = rc.fetchall()
 
     # Display sold items
-    for item in sold_items:
-        st.write(f"✅ **{item[0]}** SOLD TO **{item[1]}**")
+    for sale in sold_items:
+        st.write(f"✅ **{sale.item_name}** SOLD TO **{sale.team_bought}**")
 
     # Display unsold items
     for item in unsold_items:
         st.write(f"❌ **{item[0]}** UNSOLD (No Team is interested)")
 
 # Tab 5: Special Bidding Zone
-with tab5:
+if view == VIEWS[4]:
     st.subheader("Special Bidding Zone")
     
     # Fetch the current active item
-    active_item = get_active_item()
+    active_item = get_active_item(conn)
     
     if active_item:
-        item_id, item_name, item_rating, item_category, item_nationality, item_image_url, item_base_price, is_active, winner, unsold_timestamp = active_item
+        item_id, item_name = active_item.id, active_item.name
+        item_category, item_nationality = active_item.category, active_item.nationality
+        item_image_url, item_image_key = active_item.image_url, active_item.image_key
         
         # Fetch the highest bid for the current item
-        highest_bid = get_highest_bid(item_id)
+        highest_bid = get_highest_bid(conn, item_id)
         
         if highest_bid:
-            current_bidder, current_bid_amount = highest_bid
+            current_bidder, current_bid_amount = highest_bid.team_name, highest_bid.amount
         else:
             current_bidder = "No bids yet"
-            current_bid_amount = item_base_price  # Use base price if no bids
+            current_bid_amount = active_item.base_price  # Use base price if no bids
         
         # Display the item details with circular image
         st.markdown(
             f"""
             <div style="display: flex; align-items: center; gap: 20px;">
                 <div style="flex-shrink: 0;">
-                    <img src="{item_image_url}" style="width: 80px; height: 80px; border-radius: 50%; object-fit: cover;"/>
+                    <img src="{thumbnail_url(item_image_key, 'avatar', item_image_url)}" style="width: 80px; height: 80px; border-radius: 50%; object-fit: cover;"/>
                 </div>
                 <div>
                     <h4 style="margin: 0;">{item_name}</h4>
@@ -1867,11 +1978,18 @@ with tab5:
         )
         
         # Check if the user has selected a team and entered the password
-        if 'selected_team' in st.session_state and 'team_password' in st.session_state:
-            if st.button("    💰                      Bid", key="big_bid"):
+        zone_team = logged_in_team()
+        if zone_team:
+            next_bid = increment_ladder.next_price(current_bid_amount) if highest_bid else current_bid_amount
+            bid_limit = squad_book.limit_or_none(zone_team, item_category, item_nationality, item_id)
+            can_bid = bid_limit is not None and next_bid <= bid_limit
+            if st.button("    💰                      Bid", key="big_bid", disabled=not can_bid):
                 # Logic to place a big bid
-                place_bid(item_id, st.session_state['selected_team'], current_bid_amount)
-                st.success("Big Bid placed successfully!")
+                try:
+                    auction.place_bid(item_id, zone_team, current_bid_amount).result()
+                    st.success("Big Bid placed successfully!")
+                except BidRejected as e:
+                    st.warning(str(e))
         else:
             st.warning("Please select a team and enter the password in the Bidding & Budgets tab to enable bidding.")
     else:
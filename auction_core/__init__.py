@@ -0,0 +1,11 @@
+"""
+The auction without the UI: schema, read queries and bid/close logic.
+
+Nothing in this package imports Streamlit, so benchmarks, the simulator, the
+replay tool or an API server can import it directly; atime.py only renders.
+"""
+from auction_core.engine import AuctionEngine, format_amount, log_lot_event
+from auction_core.schema import SCHEMA_VERSION, create_schema, ensure_schema
+from auction_core.service import Auction
+
+__all__ = ["Auction", "AuctionEngine", "SCHEMA_VERSION", "create_schema", "ensure_schema", "format_amount", "log_lot_event"]
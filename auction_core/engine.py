@@ -0,0 +1,246 @@
+"""
+Auction engine: every bid/sale/unsold command.
+
+Commands take the writer's cursor as their first argument (see
+write_queue.py), so the same code runs behind the app's write queue and in
+headless tools such as the simulator.
+"""
+from datetime import datetime
+
+import bid_series
+import proxy_bidding
+from squad_rules import BidRejected
+from write_queue import on_rollback
+
+
+def log_lot_event(cur, item_id, event, amount=None, team_name=None):
+    cur.execute("INSERT INTO lot_events (item_id, event, amount, timestamp, team_name) VALUES (?, ?, ?, ?, ?)",
+                (item_id, event, amount, datetime.now().isoformat(), team_name))
+
+
+def format_amount(amount):
+    """
+    Format amount in lakhs (L) or crores (Cr)
+    Examples:
+    - 5000000 -> 50L (50 lakhs)
+    - 20000000 -> 2Cr (2 crores)
+    - 22500000 -> 2.25Cr (2.25 crores)
+    """
+    if amount >= 10000000:  # 1 crore = 10000000
+        crores = amount / 10000000
+        return f"₹{crores:.2f} Cr"
+    else:
+        lakhs = amount / 100000
+        return f"₹{lakhs:.0f}L"
+
+
+class AuctionEngine:
+    """
+    Write commands for one auction. ``squad_book`` (squad_rules.SquadBook) checks
+    every bid and is updated inside the command that sells, refunds or changes a
+    lot's leader, so the next bid in the same batch sees it; ``ladder``
+    (increments.IncrementLadder) prices the next bid.
+    """
+
+    def __init__(self, squad_book, ladder):
+        self.squad_book = squad_book
+        self.ladder = ladder
+
+    def update_team_budget(self, cur, team_name, spent_amount):
+        cur.execute("UPDATE teams SET budget_remaining = budget_remaining - ? WHERE name = ?", (spent_amount, team_name))
+
+    def place_bid(self, cur, item_id, team_name, current_amount):
+        # Check if the item is already sold
+        cur.execute("SELECT winner_team, base_price, is_active, category, nationality FROM items WHERE id = ?", (item_id,))
+        item_details = cur.fetchone()
+
+        # Bids can land after a timed lot has closed; reject them
+        if not item_details or not item_details[2]:
+            raise BidRejected("Bidding has closed for this player.")
+
+        # Get the team's remaining budget
+        cur.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,))
+        result = cur.fetchone()
+        remaining_budget = result[0] if result else 0
+
+        # Check if this is the first bid
+        cur.execute("SELECT MAX(amount) FROM bids WHERE item_id = ?", (item_id,))
+        highest_amount = cur.fetchone()[0]
+
+        # If it's the first bid, use base price, otherwise add increment
+        if highest_amount is None:
+            new_amount = current_amount  # Use base price for first bid
+        else:
+            # Get the appropriate bid increment based on current amount
+            new_amount = self.ladder.next_price(current_amount)
+
+        # Two teams can click on the same price; only the first bid counts
+        if highest_amount is not None and new_amount <= highest_amount:
+            raise BidRejected(f"The price has already moved to {format_amount(highest_amount)}. Try again.")
+
+        # Check if the new bid amount exceeds the remaining budget, less what the team
+        # already leads on the other open lots of a parallel round
+        if new_amount > remaining_budget - self.leading_total(cur, team_name, item_id):
+            raise BidRejected(f"{team_name} doesn't have enough budget to place this bid!")
+
+        # Squad caps, overseas limit, category minimums and reserve budget (O(1), in memory)
+        self.squad_book.check_bid(team_name, item_details[3], item_details[4], new_amount, item_id)
+
+        # Open lots have no winner yet, so this only applies to a lot re-opened after a sale
+        if item_details[0] not in (None, 'UNSOLD'):
+            previous_winner = item_details[0]
+            previous_amount = item_details[1]
+
+            # Refund the previous team
+            self.update_team_budget(cur, previous_winner, previous_amount)
+            self._refresh_team(cur, previous_winner)
+
+            # Remove the item from sold_items table
+            cur.execute("DELETE FROM sold_items WHERE item_name = ?", (item_details[1],))
+            bid_series.note_deletion(cur)
+
+        cur.execute("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)",
+                    (item_id, team_name, new_amount, datetime.now().isoformat()))
+        cur.execute("UPDATE items SET base_price = ? WHERE id = ?", (new_amount, item_id))
+
+        # Let registered proxies answer the new price in the same transaction
+        proxy_bids = proxy_bidding.run_proxies(cur, item_id, self.ladder, self.squad_book.limit_or_none)
+        bids = [(team_name, new_amount)] + proxy_bids
+        self._record_lead(cur, item_id, bids, item_details[3], item_details[4])
+        return bids
+
+    def register_proxy(self, cur, item_id, team_name, max_amount):
+        cur.execute("SELECT is_active, base_price FROM items WHERE id = ?", (item_id,))
+        item_details = cur.fetchone()
+        if not item_details or not item_details[0]:
+            raise BidRejected("Bidding has closed for this player.")
+        cur.execute("SELECT MAX(amount) FROM bids WHERE item_id = ?", (item_id,))
+        highest_amount = cur.fetchone()[0]
+        first = item_details[1] if highest_amount is None else self.ladder.next_price(highest_amount)
+        # A maximum that can't reach the next price on the ladder would never bid
+        if self.ladder.max_price_within(first, max_amount) is None:
+            raise BidRejected(f"The maximum must be at least {format_amount(first)}.")
+
+        proxy_bidding.register_proxy(cur, item_id, team_name, max_amount)
+        # Recorded so replay.py can re-run the proxy instead of its bids
+        log_lot_event(cur, item_id, 'proxy', max_amount, team_name)
+        bids = proxy_bidding.run_proxies(cur, item_id, self.ladder, self.squad_book.limit_or_none)
+        if bids:
+            cur.execute("SELECT category, nationality FROM items WHERE id = ?", (item_id,))
+            self._record_lead(cur, item_id, bids, *cur.fetchone())
+        return bids
+
+    def leading_total(self, cur, team_name, exclude_item_id=None):
+        """What the team currently leads on open lots other than ``exclude_item_id``."""
+        cur.execute("""SELECT COALESCE(SUM(i.base_price), 0) FROM items i
+                       WHERE i.is_active = 1 AND i.id IS NOT ?
+                         AND (SELECT b.team_name FROM bids b WHERE b.item_id = i.id
+                              ORDER BY b.amount DESC LIMIT 1) = ?""", (exclude_item_id, team_name))
+        return cur.fetchone()[0]
+
+    # Squad book updates: applied in the command, and rebuilt from the restored rows if it rolls back
+
+    def _record_lead(self, cur, item_id, bids, category, nationality):
+        leader, amount = bids[-1]
+        on_rollback(cur, self.squad_book.load)
+        self.squad_book.set_lead(item_id, leader, amount, category, nationality)
+
+    def _clear_lead(self, cur, item_id):
+        on_rollback(cur, self.squad_book.load)
+        self.squad_book.clear_lead(item_id)
+
+    def _refresh_team(self, cur, team_name):
+        on_rollback(cur, self.squad_book.load)
+        self.squad_book.refresh_team(cur, team_name)
+
+    def set_active_item(self, cur, item_id, exclusive=True):
+        # Only the previously active row and the new one are written
+        if exclusive:
+            cur.execute("UPDATE items SET is_active = 0 WHERE is_active = 1")
+        cur.execute("UPDATE items SET is_active = 1, winner_team = NULL WHERE id = ?", (item_id,))
+        cur.execute("SELECT base_price FROM items WHERE id = ?", (item_id,))
+        base_price = cur.fetchone()[0]
+        log_lot_event(cur, item_id, 'open', base_price)
+        # Deactivated lots no longer hold anyone's budget
+        on_rollback(cur, self.squad_book.load)
+        self.squad_book.load_leads(cur)
+        return base_price
+
+    def sell_item(self, cur, item, winner, amount):
+        item_id, item_name, item_rating, item_category, item_nationality = item
+        self.update_team_budget(cur, winner, amount)
+        cur.execute("UPDATE items SET winner_team = ? WHERE id = ?", (winner, item_id))
+
+        # Insert sold item into sold_items table
+        cur.execute("INSERT INTO sold_items (item_name, sold_amount, rating, category, nationality, team_bought, timestamp) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (item_name, amount, item_rating, item_category, item_nationality, winner, datetime.now().isoformat()))
+
+        # Remove from unsold_items table
+        cur.execute("DELETE FROM unsold_items WHERE item_name = ?", (item_name,))
+        self._clear_lead(cur, item_id)
+        self._refresh_team(cur, winner)
+        log_lot_event(cur, item_id, 'sold', amount)
+
+        # Maximums are confidential and only apply while the lot is open
+        proxy_bidding.clear_proxies(cur, item_id)
+
+    def stop_all_bidding(self, cur):
+        cur.execute("SELECT id FROM items WHERE is_active = 1")
+        for (item_id,) in cur.fetchall():
+            self.close_lot(cur, item_id, unsold_if_no_bids=False)
+
+    def close_lot(self, cur, item_id, unsold_if_no_bids=True):
+        # Sell to the highest bidder; a lot without bids is marked unsold (timed lots) or just stopped
+        cur.execute("SELECT id, name, rating, category, nationality FROM items WHERE id = ? AND is_active = 1", (item_id,))
+        item = cur.fetchone()
+        if not item:
+            return  # Already closed by the admin
+        cur.execute("SELECT team_name, amount FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (item_id,))
+        highest = cur.fetchone()
+        if highest:
+            winner, amount = highest
+            self.sell_item(cur, item, winner, amount)
+        elif unsold_if_no_bids:
+            self.mark_as_unsold(cur, item_id)
+            return
+        else:
+            log_lot_event(cur, item_id, 'stopped')
+        cur.execute("UPDATE items SET is_active = 0, closes_at = NULL WHERE id = ?", (item_id,))
+
+    def mark_as_unsold(self, cur, item_id):
+        # Set a timestamp for when the item was marked as unsold
+        timestamp = datetime.now().timestamp()
+        cur.execute("UPDATE items SET winner_team = 'UNSOLD', is_active = 0, closes_at = NULL, unsold_timestamp = ? WHERE id = ?",
+                    (timestamp, item_id))
+
+        # Get item details to insert into unsold_items table
+        cur.execute("SELECT name, rating, category, nationality FROM items WHERE id = ?", (item_id,))
+        item_details = cur.fetchone()
+
+        if item_details:
+            cur.execute("INSERT INTO unsold_items (item_name, rating, category, nationality, status, timestamp) VALUES (?, ?, ?, ?, ?, ?)",
+                        (item_details[0], item_details[1], item_details[2], item_details[3], 'Unsold', datetime.now().isoformat()))
+
+        proxy_bidding.clear_proxies(cur, item_id)
+        self._clear_lead(cur, item_id)
+        log_lot_event(cur, item_id, 'unsold')
+
+    def delete_item(self, cur, item_id):
+        # Fetch the item name before deletion
+        cur.execute("SELECT name, winner_team FROM items WHERE id = ?", (item_id,))
+        item_name = cur.fetchone()
+
+        if item_name:
+            item_name, winner_team = item_name  # Get the actual name from the tuple
+
+            # Delete from items table
+            cur.execute("DELETE FROM items WHERE id = ?", (item_id,))
+            # Delete from bids table
+            cur.execute("DELETE FROM bids WHERE item_id = ?", (item_id,))
+            # Delete from sold_items and unsold_items tables
+            cur.execute("DELETE FROM sold_items WHERE item_name = ?", (item_name,))
+            cur.execute("DELETE FROM unsold_items WHERE item_name = ?", (item_name,))
+            bid_series.note_deletion(cur)
+            self._clear_lead(cur, item_id)
+            if winner_team not in (None, 'UNSOLD'):
+                self._refresh_team(cur, winner_team)
@@ -0,0 +1,116 @@
+"""
+Read queries for the auction tables.
+
+Every function takes a read connection (the app opens one per script run);
+writes never go through here, they are submitted to the write queue by
+auction_core.service.Auction.
+"""
+from models import Bid, Item, Team, fetch
+
+
+def get_active_item(conn):
+    return fetch(conn, Item, f"SELECT {Item.columns()} FROM items WHERE is_active = 1 ORDER BY id LIMIT 1").fetchone()
+
+
+def get_active_items(conn):
+    # Every lot currently open (more than one in parallel rounds)
+    return fetch(conn, Item, f"SELECT {Item.columns()} FROM items WHERE is_active = 1 ORDER BY id").fetchall()
+
+
+def get_highest_bid(conn, item_id):
+    return fetch(conn, Bid, "SELECT team_name, amount FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (item_id,)).fetchone()
+
+
+def get_pending_items(conn):
+    # Players not yet auctioned, for the admin's lot queue picker
+    return fetch(conn, Item, "SELECT id, name FROM items WHERE winner_team IS NULL AND is_active = 0 ORDER BY id").fetchall()
+
+
+def get_proxy_max(conn, item_id, team_name):
+    result = conn.execute("SELECT max_amount FROM proxy_bids WHERE item_id = ? AND team_name = ?", (item_id, team_name)).fetchone()
+    return result[0] if result else None
+
+
+def get_team_budget(conn, team_name):
+    result = conn.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,)).fetchone()
+    return result[0] if result else 0
+
+
+def get_team_budgets(conn):
+    return fetch(conn, Team, "SELECT name, budget_remaining, logo_url, logo_key FROM teams").fetchall()
+
+
+def get_sold_amount(conn, item_name):
+    result = conn.execute("SELECT sold_amount FROM sold_items WHERE item_name = ?", (item_name,)).fetchone()
+    return result[0] if result else 0
+
+
+def get_setting(conn, key, default=None):
+    result = conn.execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    return result[0] if result else default
+
+
+def get_team_squad_info(conn, team_name):
+    c = conn.cursor()
+    # Fetch players for the specified team
+    c.execute("SELECT name, rating, category, nationality FROM items WHERE winner_team = ?", (team_name,))
+    players = c.fetchall()
+
+    # Initialize metrics
+    total_spent = 0
+    total_rating = 0
+    remaining_budget = 0  # This will be fetched from the teams table
+    num_batters = 0
+    num_bowlers = 0
+    num_allrounders = 0
+    num_wicketkeepers = 0
+    num_indian_players = 0
+    num_foreign_players = 0
+
+    # Calculate metrics
+    for player in players:
+        player_name, player_rating, player_category, player_nationality = player
+        total_rating += player_rating
+
+        # Fetch the sold amount for the player
+        c.execute("SELECT sold_amount FROM sold_items WHERE item_name = ?", (player_name,))
+        sold_amount_result = c.fetchone()
+        if sold_amount_result:
+            total_spent += sold_amount_result[0]  # Update total_spent with the sold amount
+
+        # Count player categories
+        if player_category == "Batsman":
+            num_batters += 1
+        elif player_category == "Bowler":
+            num_bowlers += 1
+        elif player_category == "Allrounder":
+            num_allrounders += 1
+        elif player_category == "Wicketkeeper":
+            num_wicketkeepers += 1
+
+        # Count nationality
+        if player_nationality == "India":
+            num_indian_players += 1
+        else:
+            num_foreign_players += 1
+
+    # Fetch remaining budget for the team
+    c.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,))
+    budget_result = c.fetchone()  # Store the result in a variable
+    remaining_budget = budget_result[0] if budget_result else 0  # Check the variable
+
+    # Total number of players bought
+    total_players_bought = len(players)
+
+    return {
+        "total_spent": total_spent,
+        "total_rating": total_rating,
+        "remaining_budget": remaining_budget,
+        "num_batters": num_batters,
+        "num_bowlers": num_bowlers,
+        "num_allrounders": num_allrounders,
+        "num_wicketkeepers": num_wicketkeepers,
+        "num_indian_players": num_indian_players,
+        "num_foreign_players": num_foreign_players,
+        "total_players_bought": total_players_bought,
+    }
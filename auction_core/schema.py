@@ -0,0 +1,237 @@
+"""
+Database schema and column migrations for the auction tables.
+
+``ensure_schema`` records the applied version in ``PRAGMA user_version``, so
+once a database is up to date, startup costs a single pragma read instead of
+a dozen CREATE/ALTER statements and commits. Bump ``SCHEMA_VERSION`` whenever
+``create_schema`` changes.
+"""
+import sqlite3
+
+SCHEMA_VERSION = 4
+
+# Tables the replica copies by primary key, with the key its change log records
+REPLICA_LOGGED_TABLES = {
+    "items": ("id",),
+    "teams": ("name",),
+    "settings": ("key",),
+    "lot_queue": ("item_id",),
+    "nominations": ("team_name", "item_id"),
+    "proxy_bids": ("item_id", "team_name"),
+}
+
+
+def ensure_schema(conn):
+    """Apply ``create_schema`` unless the database is already at SCHEMA_VERSION. True if it ran."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return False
+    create_schema(conn.cursor())
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    return True
+
+
+def create_schema(cur):
+    """Create the auction tables and apply column migrations (idempotent)."""
+    # Create tables
+    cur.execute('''CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        rating INTEGER,
+        category TEXT,
+        nationality TEXT,
+        image_url TEXT,
+        base_price INTEGER,
+        is_active INTEGER DEFAULT 0,
+        winner_team TEXT DEFAULT NULL,
+        unsold_timestamp REAL DEFAULT 0
+    )''')
+
+    cur.execute('''CREATE TABLE IF NOT EXISTS bids (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER,
+        team_name TEXT,
+        amount INTEGER,
+        timestamp TEXT
+    )''')
+
+    # Create teams table with password column
+    cur.execute('''CREATE TABLE IF NOT EXISTS teams (
+        name TEXT PRIMARY KEY,
+        budget_remaining INTEGER,
+        logo_url TEXT,
+        initial_budget INTEGER,
+        password TEXT NOT NULL
+    )''')
+
+    # Add password column if it doesn't exist
+    try:
+        cur.execute("ALTER TABLE teams ADD COLUMN password TEXT NOT NULL DEFAULT ''")
+    except sqlite3.OperationalError:
+        # Handle the case where the column already exists or other errors
+        pass
+
+    # Check if unsold_timestamp column exists
+    try:
+        cur.execute("SELECT unsold_timestamp FROM items LIMIT 1")
+    except sqlite3.OperationalError:
+        # Column doesn't exist, add it
+        cur.execute("ALTER TABLE items ADD COLUMN unsold_timestamp REAL DEFAULT 0")
+
+    # Add cached thumbnail keys (see image_cache.py) if they don't exist
+    try:
+        cur.execute("ALTER TABLE items ADD COLUMN image_key TEXT DEFAULT NULL")
+    except sqlite3.OperationalError:
+        pass
+    try:
+        cur.execute("ALTER TABLE teams ADD COLUMN logo_key TEXT DEFAULT NULL")
+    except sqlite3.OperationalError:
+        pass
+
+    # Add squad limits (0 = no cap) if they don't exist
+    try:
+        cur.execute("ALTER TABLE teams ADD COLUMN max_players INTEGER DEFAULT 0")
+    except sqlite3.OperationalError:
+        pass
+    try:
+        cur.execute("ALTER TABLE teams ADD COLUMN max_foreign_players INTEGER DEFAULT 0")
+    except sqlite3.OperationalError:
+        pass
+
+    # Add lot deadline (epoch seconds) for timed lots if it doesn't exist
+    try:
+        cur.execute("ALTER TABLE items ADD COLUMN closes_at REAL DEFAULT NULL")
+    except sqlite3.OperationalError:
+        pass
+
+    # Mark bids placed by a proxy rather than by the team (see proxy_bidding.py) if it doesn't exist
+    try:
+        cur.execute("ALTER TABLE bids ADD COLUMN proxy INTEGER DEFAULT 0")
+    except sqlite3.OperationalError:
+        pass
+
+    # Add the cached model price (see valuation.py) if it doesn't exist
+    try:
+        cur.execute("ALTER TABLE items ADD COLUMN expected_price INTEGER DEFAULT NULL")
+    except sqlite3.OperationalError:
+        pass
+
+    # Create sold_items table
+    cur.execute('''CREATE TABLE IF NOT EXISTS sold_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_name TEXT NOT NULL,
+        sold_amount INTEGER,
+        rating INTEGER,
+        category TEXT,
+        nationality TEXT,
+        team_bought TEXT,
+        timestamp TEXT
+    )''')
+
+    # Create unsold_items table
+    cur.execute('''CREATE TABLE IF NOT EXISTS unsold_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_name TEXT NOT NULL,
+        rating INTEGER,
+        category TEXT,
+        nationality TEXT,
+        status TEXT,
+        timestamp TEXT
+    )''')
+
+    # Create settings table (auction-wide key/value configuration)
+    cur.execute('''CREATE TABLE IF NOT EXISTS settings (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )''')
+
+    # Create lot_queue table (auction order of players, see lot_queue.py)
+    cur.execute('''CREATE TABLE IF NOT EXISTS lot_queue (
+        item_id INTEGER PRIMARY KEY,
+        set_name TEXT NOT NULL,
+        position INTEGER NOT NULL
+    )''')
+
+    # Create nominations table (unsold players teams want in the accelerated round)
+    cur.execute('''CREATE TABLE IF NOT EXISTS nominations (
+        team_name TEXT NOT NULL,
+        item_id INTEGER NOT NULL,
+        PRIMARY KEY (team_name, item_id)
+    )''')
+
+    # Create proxy_bids table (confidential per-lot maximums, see proxy_bidding.py)
+    cur.execute('''CREATE TABLE IF NOT EXISTS proxy_bids (
+        item_id INTEGER NOT NULL,
+        team_name TEXT NOT NULL,
+        max_amount INTEGER NOT NULL,
+        created_at TEXT,
+        PRIMARY KEY (item_id, team_name)
+    )''')
+
+    # Create lot_events table (lot opened/sold/unsold/stopped/requeued and proxy maximums
+    # registered, used by replay.py)
+    cur.execute('''CREATE TABLE IF NOT EXISTS lot_events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_id INTEGER NOT NULL,
+        event TEXT NOT NULL,
+        amount INTEGER,
+        timestamp TEXT
+    )''')
+
+    # Add the team behind a lot event (proxy registrations) if it doesn't exist
+    try:
+        cur.execute("ALTER TABLE lot_events ADD COLUMN team_name TEXT DEFAULT NULL")
+    except sqlite3.OperationalError:
+        pass
+
+    # Partial index so finding/deactivating the active lot touches only that row
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_items_active ON items(is_active) WHERE is_active = 1")
+    # A lot's highest bid (its leader) is read on every bid, for this lot and every other open one
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_bids_item_amount ON bids(item_id, amount)")
+
+    # Full-text index for the admin player search (see player_search.py), kept in sync by
+    # triggers; bids only touch base_price, so they never rewrite the index
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'")
+    if cur.fetchone() is None:
+        try:
+            cur.execute("""CREATE VIRTUAL TABLE items_fts USING fts5(
+                name, category, nationality, content='items', content_rowid='id'
+            )""")
+        except sqlite3.OperationalError:
+            return  # SQLite built without FTS5; the search falls back to LIKE
+        cur.execute("INSERT INTO items_fts (items_fts) VALUES ('rebuild')")
+    cur.execute("""CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items BEGIN
+        INSERT INTO items_fts (rowid, name, category, nationality) VALUES (new.id, new.name, new.category, new.nationality);
+    END""")
+    cur.execute("""CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, category, nationality) VALUES ('delete', old.id, old.name, old.category, old.nationality);
+    END""")
+    cur.execute("""CREATE TRIGGER IF NOT EXISTS items_fts_update AFTER UPDATE OF name, category, nationality ON items BEGIN
+        INSERT INTO items_fts (items_fts, rowid, name, category, nationality) VALUES ('delete', old.id, old.name, old.category, old.nationality);
+        INSERT INTO items_fts (rowid, name, category, nationality) VALUES (new.id, new.name, new.category, new.nationality);
+    END""")
+
+    # Change log for the analytics replica: one row per changed key, re-sequenced on every write,
+    # so the replica copies only the rows changed since its last cycle
+    cur.execute('''CREATE TABLE IF NOT EXISTS replica_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tbl TEXT NOT NULL,
+        key TEXT NOT NULL,
+        UNIQUE (tbl, key)
+    )''')
+    for table, key in REPLICA_LOGGED_TABLES.items():
+        new_key = f"json_array({', '.join(f'new.{column}' for column in key)})"
+        old_key = f"json_array({', '.join(f'old.{column}' for column in key)})"
+        # Delete then insert rather than INSERT OR REPLACE: a trigger takes the outer statement's conflict clause
+        log = ("DELETE FROM replica_changes WHERE tbl = '{table}' AND key = {key};"
+               " INSERT INTO replica_changes (tbl, key) VALUES ('{table}', {key});")
+        cur.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_replica_insert AFTER INSERT ON {table} BEGIN
+            {log.format(table=table, key=new_key)}
+        END""")
+        cur.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_replica_update AFTER UPDATE ON {table} BEGIN
+            {log.format(table=table, key=old_key)}
+            {log.format(table=table, key=new_key)}
+        END""")
+        cur.execute(f"""CREATE TRIGGER IF NOT EXISTS {table}_replica_delete AFTER DELETE ON {table} BEGIN
+            {log.format(table=table, key=old_key)}
+        END""")
@@ -0,0 +1,280 @@
+"""
+One running auction: the write queue and every in-memory structure around it.
+
+``Auction`` is built once per server process (the app keeps it in a Streamlit
+cache resource; tools can build their own). Building it applies the schema,
+loads the squad book, increment ladder, lot queue and lot board from the
+database and starts the writer, lot timer, backup and replica threads. Its write
+methods submit commands to the single writer and return a Future that
+resolves once the change is committed.
+"""
+import json
+import sqlite3
+from concurrent.futures import Future
+
+import auth
+import increments
+import lot_queue as lotq
+import squad_rules
+from backup import BackupService
+from bid_gate import BidGate
+from bid_series import BidSeries
+from lot_board import LotBoard
+from lot_timer import LotTimer
+from replica import Replicator
+from team_pacing import TeamPacing
+from squad_rules import BidRejected
+from write_queue import WriteQueue
+
+from auction_core import repository
+from auction_core.engine import AuctionEngine, format_amount
+from auction_core.schema import ensure_schema
+
+
+def _execute(cur, sql, params=()):
+    cur.execute(sql, params)
+
+
+def _rejected(message):
+    future = Future()
+    future.set_exception(BidRejected(message))
+    return future
+
+
+class Auction:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = sqlite3.connect(db_path)
+        try:
+            # Create tables and apply column migrations once per process (and once per schema version)
+            ensure_schema(conn)
+            self._load(conn)
+        finally:
+            conn.close()
+
+    def _load(self, conn):
+        # One writer thread per server process, shared by every session
+        self.writer = WriteQueue(self.db_path)
+        # Background snapshots of the live database (see backup.py)
+        self.backup_service = BackupService(self.db_path)
+        # Session tokens and login rate limits live in memory, shared by every session
+        self.authenticator = auth.Authenticator()
+        # Per-team token buckets and the duplicate-click window
+        self.bid_gate = BidGate()
+
+        # Per-team squad counters used to check every bid without recounting players
+        rules = dict(conn.execute("SELECT key, value FROM settings WHERE key IN "
+                                  "('min_squad_size', 'category_minimums', 'slot_reserve_price')").fetchall())
+        self.squad_book = squad_rules.SquadBook(
+            min_squad_size=int(rules.get('min_squad_size', 0)),
+            category_minimums=json.loads(rules.get('category_minimums', '{}')),
+            reserve_price=int(rules.get('slot_reserve_price', 0)),
+        )
+        self.squad_book.load(conn.cursor())
+
+        # Shared by bid validation, proxy bidding and affordability checks
+        self.increment_ladder = increments.IncrementLadder.from_json(repository.get_setting(conn, 'increment_ladder'))
+
+        # Bid, sale and unsold commands, shared with headless tools such as simulator.py
+        self.engine = AuctionEngine(self.squad_book, self.increment_ladder)
+
+        self.lot_queue = lotq.LotQueue(
+            auto_advance=repository.get_setting(conn, 'auto_advance', '0') == '1',
+            durations={'accelerated': int(repository.get_setting(conn, 'accelerated_lot_duration', 0))},
+        )
+        self.lot_queue.load(lotq.pending_lots(conn.cursor()))
+
+        # Price and leader of every open lot, each lot behind its own lock
+        self.lot_board = LotBoard(max_active=int(repository.get_setting(conn, 'max_active_lots', 1)))
+        self.lot_board.load(conn.cursor())
+
+        # One scheduler per server process; it closes expired lots through the writer
+        self.lot_timer = LotTimer(
+            on_expire=self._on_lot_expired,
+            duration=int(repository.get_setting(conn, 'lot_duration', 0)),
+            snipe_window=int(repository.get_setting(conn, 'snipe_window', 10)),
+            extension=int(repository.get_setting(conn, 'snipe_extension', 10)),
+        )
+        # Re-arm lots that were still running when the server stopped
+        for item_id, closes_at in conn.execute("SELECT id, closes_at FROM items WHERE is_active = 1 AND closes_at IS NOT NULL"):
+            self.lot_timer.restore(item_id, closes_at)
+        self.lot_timer.start()
+
+        # Chart data shared by every session; each refresh only appends the new rows
+        self.bid_series = BidSeries()
+        # Team dashboards: the pool of players left, on top of the squad book's counters
+        self.team_pacing = TeamPacing(self.squad_book)
+
+        # Read-only copy for the analytical views, kept current by its own thread (see replica.py)
+        self.replica = Replicator(self.db_path)
+
+        # Broadcast overlay server, if a port is configured (see overlay.py)
+        self.overlay = None
+        try:
+            self.start_overlay(int(repository.get_setting(conn, 'overlay_port', 0)))
+        except OSError:
+            pass  # Port taken (e.g. by another server process); the admin panel can pick another
+
+    def start_overlay(self, port):
+        """(Re)start the broadcast overlay server on ``port``; 0 stops it."""
+        if self.overlay is not None:
+            self.overlay.stop()
+            self.overlay = None
+        if port:
+            from overlay import OverlayServer  # overlay.py imports auction_core itself
+            self.overlay = OverlayServer(self.db_path, port)
+        return self.overlay
+
+    # ---------- WRITE COMMANDS ----------
+
+    def execute_write(self, sql, params=()):
+        return self.writer.submit(_execute, sql, params)
+
+    def set_setting(self, key, value):
+        return self.execute_write("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def _timed_bid(self, cur, command, item_id, *args):
+        bids = command(cur, item_id, *args)
+        if bids:
+            # Anti-sniping in the bid's own transaction: a late bid pushes the deadline out before
+            # it commits, so the timer can't close the lot between the bid and its extension
+            deadline = self.lot_timer.on_bid(item_id)
+            if deadline is not None:
+                cur.execute("UPDATE items SET closes_at = ? WHERE id = ?", (deadline, item_id))
+        return bids
+
+    def _on_bids_committed(self, item_id, future):
+        # Runs on the writer thread after commit: update the lot's in-memory price
+        if future.exception() or not future.result():
+            return
+        leader, price = future.result()[-1]
+        self.lot_board.record(item_id, leader, price)
+
+    def _submit_bid(self, item_id, team_name, current_amount):
+        # Cheap pre-check against the lot's in-memory price (per-lot lock only)
+        lot = self.lot_board.snapshot(item_id)
+        if lot is None:
+            return _rejected("Bidding has closed for this player.")
+        if lot[0] != current_amount:
+            return _rejected(f"The price has already moved to {format_amount(lot[0])}. Try again.")
+        future = self.writer.submit(self._timed_bid, self.engine.place_bid, item_id, team_name, current_amount)
+        future.add_done_callback(lambda f: self._on_bids_committed(item_id, f))
+        return future
+
+    def place_bid(self, item_id, team_name, current_amount):
+        """
+        Future resolving to the list of (team, amount) bids recorded (the team's bid
+        plus any proxy answers); it raises BidRejected if the bid breaks a rule.
+        A double-click at the same price gets the first click's future back.
+        """
+        future = self.bid_gate.submit(team_name, item_id, current_amount,
+                                      lambda: self._submit_bid(item_id, team_name, current_amount))
+        return future if future is not None else _rejected("Too many bids. Slow down.")
+
+    def register_proxy(self, item_id, team_name, max_amount):
+        """Future resolving to the list of (team, amount) bids the proxies placed."""
+        future = self.writer.submit(self._timed_bid, self.engine.register_proxy, item_id, team_name, max_amount)
+        future.add_done_callback(lambda f: self._on_bids_committed(item_id, f))
+        return future
+
+    def update_team_budget(self, team_name, spent_amount):
+        return self.writer.submit(self.engine.update_team_budget, team_name, spent_amount)
+
+    def set_active_item(self, item_id, exclusive=True):
+        future = self.writer.submit(self.engine.set_active_item, item_id, exclusive)
+        future.add_done_callback(lambda f: self.lot_board.open(item_id, f.result()) if not f.exception() else None)
+        return future
+
+    def _snapshot_after(self, future):
+        # Lot boundary: snapshot the database once the close has committed
+        future.add_done_callback(lambda f: self.backup_service.request("lot") if not f.exception() else None)
+        return future
+
+    def stop_all_bidding(self):
+        # Sales, budget deductions and deactivations commit as one transaction
+        self.lot_timer.clear()
+        self.lot_board.clear()
+        return self._snapshot_after(self.writer.submit(self.engine.stop_all_bidding))
+
+    def stop_lot(self, item_id):
+        """Stop one lot of a parallel round: sell to its highest bidder, if any."""
+        self.lot_timer.cancel(item_id)
+        self.lot_board.close(item_id)
+        return self._snapshot_after(self.writer.submit(self.engine.close_lot, item_id, False))
+
+    def mark_as_unsold(self, item_id):
+        self.lot_timer.cancel(item_id)
+        self.lot_board.close(item_id)
+        self.lot_queue.discard(item_id)
+        return self._snapshot_after(self.writer.submit(self.engine.mark_as_unsold, item_id))
+
+    def delete_item(self, item_id):
+        self.lot_timer.cancel(item_id)
+        self.lot_board.close(item_id)
+        self.lot_queue.discard(item_id)
+        future = self.writer.submit(self.engine.delete_item, item_id)
+        # The player pool is incremental; rebuild it without the deleted player
+        future.add_done_callback(lambda f: self.team_pacing.reset())
+        return future
+
+    def start_lot(self, item_id):
+        """Activate a lot and, if timed lots are enabled, start its countdown."""
+        # Only touches the writer and in-memory state, so the timer thread can call it too
+        exclusive = self.lot_board.max_active <= 1
+        if exclusive:
+            self.lot_timer.clear()
+            self.lot_board.clear()
+        duration = self.lot_queue.duration_for(item_id, self.lot_timer.duration)
+        self.lot_queue.discard(item_id)
+        future = self.set_active_item(item_id, exclusive)
+        if duration > 0:
+            deadline = self.lot_timer.open(item_id, duration)
+            future = self.execute_write("UPDATE items SET closes_at = ? WHERE id = ?", (deadline, item_id))
+        return future
+
+    def advance_lot(self, current_id=None):
+        """Close the current lot (sale or unsold) and open the next queued one."""
+        future = None
+        if current_id is not None:
+            self.lot_timer.cancel(current_id)
+            self.lot_board.close(current_id)
+            future = self._snapshot_after(self.writer.submit(self.engine.close_lot, current_id))
+        next_id = self.lot_queue.pop()
+        if next_id is not None:
+            future = self.start_lot(next_id)
+        return future
+
+    def _on_lot_expired(self, item_id):
+        self.lot_board.close(item_id)
+        self._snapshot_after(self.writer.submit(self.engine.close_lot, item_id))
+        if self.lot_queue.auto_advance:
+            self.advance_lot()
+
+    def enqueue_lots(self, item_ids, set_name):
+        return self.writer.submit(lotq.enqueue, item_ids, set_name)
+
+    def start_accelerated_round(self, item_ids, price_factor=1.0):
+        return self.writer.submit(lotq.start_accelerated_round, item_ids, price_factor)
+
+    def nominate_lots(self, team_name, item_ids):
+        return self.writer.submit(lotq.nominate, team_name, item_ids)
+
+    def reload_lot_queue(self, conn):
+        self.lot_queue.load(lotq.pending_lots(conn.cursor()))
+
+    def cache_missing_images(self, conn):
+        """Fetch and thumbnail every player photo and team logo that isn't cached yet."""
+        import image_cache  # Pulls in requests and Pillow, which headless tools don't need
+        cached = 0
+        for item_id, image_url in conn.execute("SELECT id, image_url FROM items WHERE image_key IS NULL AND image_url != ''").fetchall():
+            key = image_cache.cache_image(image_url)
+            if key:
+                self.execute_write("UPDATE items SET image_key = ? WHERE id = ?", (key, item_id))
+                cached += 1
+        for team_name, logo_url in conn.execute("SELECT name, logo_url FROM teams WHERE logo_key IS NULL AND logo_url != ''").fetchall():
+            key = image_cache.cache_image(logo_url)
+            if key:
+                self.execute_write("UPDATE teams SET logo_key = ? WHERE name = ?", (key, team_name))
+                cached += 1
+        self.writer.flush()
+        return cached
@@ -0,0 +1,186 @@
+"""
+Authentication for teams and the admin.
+
+Passwords are stored as salted PBKDF2 hashes and checked once, at login.
+A successful login returns a signed session token; checking a token on each
+rerun is a dictionary lookup, so auth costs nothing on the refresh path. A
+session expires after ``ttl`` seconds without use, and every authenticated
+request pushes that out again, so a team that stays on the page for a long
+auction isn't logged out mid-lot. Login attempts are rate limited in memory
+per team and client, so brute-force traffic never reaches the database and
+one client's failures can't lock a team out everywhere (bids are throttled
+by bid_gate.py).
+"""
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import deque
+
+HASH_SCHEME = "pbkdf2_sha256"
+HASH_ITERATIONS = 200000
+DEFAULT_ADMIN_PASSWORD = "admin123"  # until an admin password is set
+
+
+class TooManyAttempts(Exception):
+    """Login attempts for a team (or the admin) from one client are rate limited; the message says when to retry."""
+
+
+def hash_password(password, salt=None, iterations=HASH_ITERATIONS):
+    salt = salt or secrets.token_hex(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+    return f"{HASH_SCHEME}${iterations}${salt}${digest}"
+
+
+def is_hashed(stored):
+    return bool(stored) and stored.startswith(HASH_SCHEME + "$")
+
+
+def verify_password(password, stored):
+    """Check a password against a stored hash (or a legacy plaintext password)."""
+    if not stored:
+        return False
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, iterations, salt, _ = stored.split("$")
+    return hmac.compare_digest(hash_password(password, salt, int(iterations)), stored)
+
+
+class RateLimiter:
+    """At most ``max_attempts`` per key in any ``window`` seconds (sliding window)."""
+
+    def __init__(self, max_attempts, window, clock=time.monotonic):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.clock = clock
+        self._attempts = {}
+        self._lock = threading.Lock()
+
+    def allow(self, key):
+        now = self.clock()
+        with self._lock:
+            attempts = self._attempts.setdefault(key, deque())
+            while attempts and attempts[0] <= now - self.window:
+                attempts.popleft()
+            if len(attempts) >= self.max_attempts:
+                return False
+            attempts.append(now)
+            return True
+
+    def retry_after(self, key):
+        """Seconds until ``key`` may try again (0 if it may now)."""
+        with self._lock:
+            attempts = self._attempts.get(key)
+            if not attempts or len(attempts) < self.max_attempts:
+                return 0
+            return max(0, attempts[0] + self.window - self.clock())
+
+    def reset(self, key):
+        with self._lock:
+            self._attempts.pop(key, None)
+
+
+class SessionStore:
+    """Signed session tokens that expire after ``ttl`` idle seconds; verified tokens are cached in memory."""
+
+    def __init__(self, ttl=1800, secret=None, clock=time.time):
+        self.ttl = ttl
+        self.clock = clock
+        self._secret = secret or secrets.token_bytes(32)  # per process: a restart logs everyone out
+        self._sessions = {}  # token -> (role, subject, expires)
+        self._lock = threading.Lock()
+
+    def _sign(self, payload):
+        return hmac.new(self._secret, payload, hashlib.sha256).hexdigest()
+
+    def issue(self, role, subject):
+        expires = int(self.clock()) + self.ttl
+        payload = f"{role}\n{subject}\n{expires}\n{secrets.token_hex(8)}".encode()
+        token = f"{base64.urlsafe_b64encode(payload).decode()}.{self._sign(payload)}"
+        with self._lock:
+            self._sessions[token] = (role, subject, expires)
+        return token
+
+    def verify(self, token, role):
+        """The token's subject if it is valid for ``role``, else None."""
+        if not token or not self.check_signature(token):
+            return None
+        with self._lock:
+            session = self._sessions.get(token)
+        if session is None:
+            return None  # Never issued by this process, or revoked
+        session_role, subject, expires = session
+        now = self.clock()
+        if session_role != role or expires < now:
+            self.revoke(token)
+            return None
+        # Sliding expiry: each authenticated request renews the session
+        with self._lock:
+            if token in self._sessions:
+                self._sessions[token] = (session_role, subject, int(now) + self.ttl)
+        return subject
+
+    def check_signature(self, token):
+        try:
+            encoded, signature = token.rsplit(".", 1)
+            payload = base64.urlsafe_b64decode(encoded.encode())
+        except (ValueError, UnicodeEncodeError):
+            return False
+        return hmac.compare_digest(self._sign(payload), signature)
+
+    def revoke(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def revoke_subject(self, role, subject):
+        """Log out every session of a team (e.g. after its password changes)."""
+        with self._lock:
+            for token, (session_role, session_subject, _) in list(self._sessions.items()):
+                if session_role == role and session_subject == subject:
+                    del self._sessions[token]
+
+
+class Authenticator:
+    def __init__(self, session_ttl=1800, login_attempts=5, login_window=300):
+        # session_ttl is idle time: a session in use is renewed on every request
+        self.sessions = SessionStore(ttl=session_ttl)
+        self.login_limiter = RateLimiter(login_attempts, login_window)
+
+    def _allow(self, key):
+        if not self.login_limiter.allow(key):
+            raise TooManyAttempts(f"Too many attempts. Try again in {int(self.login_limiter.retry_after(key)) + 1}s.")
+
+    def login_team(self, cur, team_name, password, client=None):
+        """
+        Returns (token, upgraded_hash). ``upgraded_hash`` is set when the team
+        still had a plaintext password and should be saved by the caller.
+        Raises TooManyAttempts when the team is rate limited for ``client``
+        (e.g. the browser's IP address).
+        """
+        key = ("team", team_name, client)
+        self._allow(key)
+        cur.execute("SELECT password FROM teams WHERE name = ?", (team_name,))
+        row = cur.fetchone()
+        if not row or not verify_password(password, row[0]):
+            return None, None
+        self.login_limiter.reset(key)
+        upgraded = None if is_hashed(row[0]) else hash_password(password)
+        return self.sessions.issue("team", team_name), upgraded
+
+    def login_admin(self, cur, password, client=None):
+        key = ("admin", client)
+        self._allow(key)
+        cur.execute("SELECT value FROM settings WHERE key = 'admin_password_hash'")
+        row = cur.fetchone()
+        if not verify_password(password, row[0] if row else DEFAULT_ADMIN_PASSWORD):
+            return None
+        self.login_limiter.reset(key)
+        return self.sessions.issue("admin", "admin")
+
+    def team(self, token):
+        return self.sessions.verify(token, "team")
+
+    def is_admin(self, token):
+        return self.sessions.verify(token, "admin") is not None
@@ -0,0 +1,232 @@
+"""
+Online backups of the live auction database.
+
+Snapshots are taken with SQLite's online backup API in small page steps. Each
+step holds the source's read lock only while it copies its pages, and the
+copy pauses between steps, so the writer thread and readers are never held
+up for long. A background service takes a snapshot whenever one is requested
+(the app requests one after every lot closes), writes it under a temporary
+name and renames it into place, so a snapshot on disk is always complete, and
+keeps only the newest few. Snapshots go to a ``backups`` directory next to
+the database unless another directory is given.
+
+    python backup.py snapshot biddi09i_game.db
+    python backup.py list
+    python backup.py restore backups/auction-20250509-114459-lot.db biddi09i_game.db
+    python backup.py benchmark
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BACKUP_DIR = "backups"
+SNAPSHOT_PREFIX = "auction-"
+
+
+def backup_dir_for(db_path):
+    """Default snapshot directory: ``backups`` next to the database, whatever the working directory."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), BACKUP_DIR)
+
+
+def backup(db_path, dest_path, pages=64, sleep=0.005):
+    """Copy a live database to ``dest_path`` (atomically) without stopping writers."""
+    partial = dest_path + ".partial"
+    try:
+        src = sqlite3.connect(db_path)
+        try:
+            dst = sqlite3.connect(partial)
+            try:
+                # Each step copies ``pages`` pages under the read lock; the progress callback runs
+                # after the step has released it, so writers get the pause between steps
+                src.backup(dst, pages=pages, progress=lambda status, remaining, total: time.sleep(sleep))
+            finally:
+                dst.close()
+        finally:
+            src.close()
+        os.replace(partial, dest_path)
+    except Exception:
+        # A failed copy leaves nothing behind
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return dest_path
+
+
+def snapshot(db_path, label, backup_dir=None):
+    """Take a labelled snapshot into ``backup_dir`` (default: next to the database); returns its path."""
+    return backup(db_path, _snapshot_path(backup_dir or backup_dir_for(db_path), label))
+
+
+def snapshots(backup_dir=BACKUP_DIR):
+    """Snapshot paths, newest first."""
+    if not os.path.isdir(backup_dir):
+        return []
+    names = [name for name in os.listdir(backup_dir) if name.startswith(SNAPSHOT_PREFIX) and name.endswith(".db")]
+    return [os.path.join(backup_dir, name) for name in sorted(names, reverse=True)]
+
+
+def restore(snapshot_path, db_path, pages=64):
+    """
+    Copy a snapshot back over ``db_path``, keeping a snapshot of the current
+    state first. Restart the app afterwards so its in-memory state is rebuilt.
+    """
+    if os.path.exists(db_path):
+        safety = backup(db_path, _snapshot_path(os.path.dirname(snapshot_path) or BACKUP_DIR, "pre-restore"))
+    else:
+        safety = None
+    src = sqlite3.connect(f"file:{snapshot_path}?mode=ro", uri=True)
+    dst = sqlite3.connect(db_path)
+    try:
+        src.backup(dst, pages=pages)
+    finally:
+        dst.close()
+        src.close()
+    return safety
+
+
+def _snapshot_path(backup_dir, label):
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(backup_dir, f"{SNAPSHOT_PREFIX}{stamp}-{label}.db")
+
+
+class BackupService:
+    def __init__(self, db_path, backup_dir=None, keep=20, min_interval=30, pages=64, sleep=0.005):
+        self.db_path = db_path
+        self.backup_dir = backup_dir or backup_dir_for(db_path)
+        self.keep = keep
+        self.min_interval = min_interval  # seconds between automatic snapshots
+        self.pages = pages
+        self.sleep = sleep
+        self.last_snapshot = None
+        self.last_error = None
+        self._last_time = 0
+        self._requests = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="auction-backup", daemon=True)
+        self._thread.start()
+
+    def request(self, label="lot", force=False):
+        """
+        Ask for a snapshot; returns immediately. Automatic requests are throttled
+        by ``min_interval``: one that comes too soon is taken once it has passed.
+        """
+        self._requests.put((label, force))
+
+    def _run(self):
+        label = None
+        while True:
+            if label is None:
+                label, force = self._requests.get()
+            # Collapse a burst of requests (e.g. several lots closing together) into one snapshot
+            while not self._requests.empty():
+                next_label, next_force = self._requests.get_nowait()
+                if next_force:
+                    label, force = next_label, True
+            remaining = 0 if force else self.min_interval - (time.time() - self._last_time)
+            if remaining > 0:
+                # Too soon after the last snapshot: keep the request until the interval has passed
+                # (or a forced request comes in meanwhile)
+                try:
+                    next_label, next_force = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if next_force:
+                    label, force = next_label, True
+                continue
+            path, label = _snapshot_path(self.backup_dir, label), None
+            try:
+                self.last_snapshot = backup(self.db_path, path, self.pages, self.sleep)
+                self.last_error = None
+            except (sqlite3.Error, OSError) as exc:
+                self.last_error = exc
+                continue
+            self._last_time = time.time()
+            for old in snapshots(self.backup_dir)[self.keep:]:
+                os.remove(old)
+
+
+def benchmark(num_bids=3000, padding_rows=200000):
+    """Bid latency through the write queue with and without a backup running alongside."""
+    from write_queue import WriteQueue, _insert_bid
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        setup = sqlite3.connect(db_path)
+        setup.execute("PRAGMA journal_mode=WAL")
+        setup.execute("CREATE TABLE bids (id INTEGER PRIMARY KEY AUTOINCREMENT, item_id INTEGER, team_name TEXT, amount INTEGER, timestamp TEXT)")
+        # Make the database big enough that a backup takes a while
+        setup.executemany("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)",
+                          [(0, "Padding", i, "x" * 100) for i in range(padding_rows)])
+        setup.commit()
+        setup.close()
+
+        writer = WriteQueue(db_path)
+
+        def latencies():
+            result = []
+            for i in range(num_bids):
+                start = time.perf_counter()
+                writer.submit(_insert_bid, 1, "Team A", i).result()
+                result.append(time.perf_counter() - start)
+            return result
+
+        idle = latencies()
+        backups = 0
+        stop = threading.Event()
+
+        def keep_backing_up():
+            nonlocal backups
+            while not stop.is_set():
+                backup(db_path, os.path.join(tmp, "snapshot.db"))
+                backups += 1
+
+        thread = threading.Thread(target=keep_backing_up)
+        thread.start()
+        busy = latencies()
+        stop.set()
+        thread.join()
+        writer.close()
+        size = os.path.getsize(db_path) / 1e6
+
+    for name, values in (("no backup", idle), (f"during backups ({backups} x {size:.0f} MB)", busy)):
+        values = sorted(values)
+        print(f"{name:<32} p50 {statistics.median(values) * 1000:.2f} ms   "
+              f"p99 {values[int(len(values) * 0.99)] * 1000:.2f} ms   max {values[-1] * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot, list or restore the auction database.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot_cmd = commands.add_parser("snapshot")
+    snapshot_cmd.add_argument("db_path")
+    snapshot_cmd.add_argument("--dir", help=f"default: {BACKUP_DIR}/ next to the database")
+    list_cmd = commands.add_parser("list")
+    list_cmd.add_argument("--dir", default=BACKUP_DIR)
+    restore_cmd = commands.add_parser("restore")
+    restore_cmd.add_argument("snapshot_path")
+    restore_cmd.add_argument("db_path")
+    commands.add_parser("benchmark")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        print(snapshot(args.db_path, "manual", args.dir))
+    elif args.command == "list":
+        for path in snapshots(args.dir):
+            print(f"{path}  {os.path.getsize(path) / 1e6:.1f} MB")
+    elif args.command == "restore":
+        safety = restore(args.snapshot_path, args.db_path)
+        if safety:
+            print(f"previous state saved to {safety}")
+        print(f"restored {args.snapshot_path} into {args.db_path}; restart the app to reload its state")
+    elif args.command == "benchmark":
+        benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-team bid throttling and duplicate-click coalescing.
+
+Every bid passes the gate before it reaches the write queue. A token bucket
+per team caps the sustained bid rate (with a small burst allowance), and an
+identical bid intent (same team, lot and price) arriving within ``window``
+seconds of the first gets the first bid's future back instead of a second
+transaction. Counters are kept for the admin panel.
+"""
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity, now):
+        self.rate = rate          # tokens added per second
+        self.capacity = capacity  # burst size
+        self.tokens = capacity
+        self.updated = now
+
+    def take(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class BidGate:
+    def __init__(self, rate=4, burst=8, window=0.4, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.window = window
+        self.clock = clock
+        self.accepted = 0
+        self.coalesced = 0
+        self.throttled = 0
+        self._buckets = {}
+        self._recent = {}        # (team, item_id, amount) -> (time, future)
+        self._expiry = deque()   # (time, key) in arrival order
+        self._lock = threading.Lock()
+
+    def submit(self, team_name, item_id, amount, submit_fn):
+        """
+        The future from ``submit_fn()``, the earlier future for a duplicate
+        click, or None if the team is over its rate.
+        """
+        key = (team_name, item_id, amount)
+        now = self.clock()
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now - self.window:
+                _, old_key = self._expiry.popleft()
+                recent = self._recent.get(old_key)
+                if recent and recent[0] <= now - self.window:
+                    del self._recent[old_key]
+            recent = self._recent.get(key)
+            if recent:
+                self.coalesced += 1
+                return recent[1]
+            bucket = self._buckets.get(team_name)
+            if bucket is None:
+                bucket = self._buckets[team_name] = TokenBucket(self.rate, self.burst, now)
+            if not bucket.take(now):
+                self.throttled += 1
+                return None
+            future = submit_fn()
+            self._recent[key] = (now, future)
+            self._expiry.append((now, key))
+            self.accepted += 1
+            return future
+
+    def metrics(self):
+        with self._lock:
+            return {"accepted": self.accepted, "coalesced": self.coalesced, "throttled": self.throttled}
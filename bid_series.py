@@ -0,0 +1,88 @@
+"""
+Append-only, in-memory time series of bids and sales for the live charts.
+
+``refresh`` only reads rows added since the last call (by rowid), so keeping
+the charts current costs one indexed query per rerun instead of re-reading
+the whole ``bids`` table. Anything that deletes bids or sales (a refunded
+sale, a deleted or re-auctioned player, an archived auction) calls
+``note_deletion`` in the same transaction, which bumps a generation counter
+in ``settings``; a refresh that sees a new generation rebuilds the series.
+``version`` only ever increases, on new rows, rebuilds and resets, so
+figures can be cached per version and only redrawn when something moved.
+"""
+import threading
+from datetime import datetime
+
+GENERATION_KEY = "history_generation"
+
+
+def note_deletion(cur):
+    """Record that rows were deleted from ``bids`` or ``sold_items`` (call in the deleting transaction)."""
+    cur.execute("""INSERT INTO settings (key, value) VALUES (?, '1')
+                   ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1""", (GENERATION_KEY,))
+
+
+class BidSeries:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._generation = None
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next refresh re-reads from the start."""
+        with self._lock:
+            self._clear()
+            self.version += 1
+
+    def _clear(self):
+        self._lots = {}         # item_id -> ([times], [amounts], [teams])
+        self._last_bid_id = 0
+        self._spend = {}        # team_name -> ([times], [cumulative spend])
+        self._last_sale_id = 0
+
+    def refresh(self, cur):
+        """Append the bids and sales recorded since the last refresh."""
+        bid_sql = "SELECT id, item_id, team_name, amount, timestamp FROM bids WHERE id > ? ORDER BY id"
+        sale_sql = "SELECT id, team_bought, sold_amount, timestamp FROM sold_items WHERE id > ? ORDER BY id"
+        with self._lock:
+            cur.execute("SELECT value FROM settings WHERE key = ?", (GENERATION_KEY,))
+            row = cur.fetchone()
+            generation = row[0] if row else None
+            rebuilt = generation != self._generation
+            if rebuilt:
+                self._clear()
+                self._generation = generation
+            cur.execute(bid_sql, (self._last_bid_id,))
+            bids = cur.fetchall()
+            cur.execute(sale_sql, (self._last_sale_id,))
+            sales = cur.fetchall()
+            for bid_id, item_id, team_name, amount, timestamp in bids:
+                times, amounts, teams = self._lots.setdefault(item_id, ([], [], []))
+                times.append(datetime.fromisoformat(timestamp))
+                amounts.append(amount)
+                teams.append(team_name)
+                self._last_bid_id = bid_id
+            for sale_id, team_name, amount, timestamp in sales:
+                times, spent = self._spend.setdefault(team_name, ([], []))
+                times.append(datetime.fromisoformat(timestamp))
+                spent.append((spent[-1] if spent else 0) + (amount or 0))
+                self._last_sale_id = sale_id
+            if bids or sales or rebuilt:
+                self.version += 1
+            return len(bids) + len(sales)
+
+    def lot(self, item_id):
+        """(times, amounts, teams) of every bid on a lot, oldest first."""
+        with self._lock:
+            times, amounts, teams = self._lots.get(item_id, ([], [], []))
+            return list(times), list(amounts), list(teams)
+
+    def spend(self):
+        """{team_name: (times, cumulative spend)} over the auction."""
+        with self._lock:
+            return {team: (list(times), list(spent)) for team, (times, spent) in self._spend.items()}
+
+    def lot_ids(self):
+        with self._lock:
+            return list(self._lots)
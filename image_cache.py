@@ -0,0 +1,105 @@
+"""
+Local thumbnail cache for player photos and team logos.
+
+Images are fetched once (when a player or team is saved), resized with Pillow
+and written to a content-addressed folder under ``static/img``. Streamlit
+serves that folder as static files, so browsers never hit the original hosts.
+requests and Pillow are only imported when an image is actually fetched, so
+pages that just build ``thumbnail_url``s don't pay for them.
+"""
+import hashlib
+import io
+import os
+from urllib.parse import urlsplit
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+CACHE_DIR = os.path.join(STATIC_DIR, "img")
+STATIC_URL = "app/static/img"
+FETCH_TIMEOUT = 10  # seconds
+
+# Thumbnail variants: name -> (width, height, fit)
+VARIANTS = {
+    "logo": (70, 70, "contain"),     # team grid and current bidder
+    "card": (200, 220, "cover"),     # player card in the bidding tab
+    "avatar": (80, 80, "circle"),    # Special Bidding Zone
+}
+
+
+def fetch_image(source):
+    """Return the raw bytes for an http(s) URL (anything else, e.g. a local path, is refused)."""
+    if urlsplit(source).scheme not in ("http", "https"):
+        raise ValueError(f"Not an http(s) image URL: {source!r}")
+    import requests
+    response = requests.get(source, timeout=FETCH_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+def image_key(data):
+    """Content address of an image: the first 32 hex chars of its SHA-256."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def make_thumbnail(data, variant):
+    """Resize image bytes to the given variant and return PNG bytes."""
+    from PIL import Image, ImageDraw, ImageOps
+    width, height, fit = VARIANTS[variant]
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image).convert("RGBA")
+
+    if fit == "contain":
+        image = ImageOps.contain(image, (width, height), Image.LANCZOS)
+        canvas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+        canvas.paste(image, ((width - image.width) // 2, (height - image.height) // 2))
+        image = canvas
+    else:
+        image = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        if fit == "circle":
+            mask = Image.new("L", (width, height), 0)
+            ImageDraw.Draw(mask).ellipse((0, 0, width - 1, height - 1), fill=255)
+            image.putalpha(mask)
+
+    out = io.BytesIO()
+    image.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def thumbnail_path(key, variant, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"{key}_{variant}.png")
+
+
+def cache_image(source, cache_dir=CACHE_DIR):
+    """
+    Fetch an image once and store every thumbnail variant.
+    Returns the content key, or None if the image could not be fetched or decoded.
+    """
+    if not source:
+        return None
+    import requests
+    from PIL import Image
+    try:
+        data = fetch_image(source)
+        key = image_key(data)
+        os.makedirs(cache_dir, exist_ok=True)
+        for variant in VARIANTS:
+            path = thumbnail_path(key, variant, cache_dir)
+            if os.path.exists(path):
+                continue  # Same content already cached
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(make_thumbnail(data, variant))
+            os.replace(tmp_path, path)
+        return key
+    except (OSError, ValueError, requests.RequestException, Image.DecompressionBombError):
+        return None
+
+
+def thumbnail_url(key, variant, fallback_url=""):
+    """
+    URL of a cached thumbnail, or the original URL if the image was never cached.
+    The ``v`` query argument makes Streamlit's static file handler send
+    far-future cache headers; this is safe because file names are content hashes.
+    """
+    if not key:
+        return fallback_url
+    return f"{STATIC_URL}/{key}_{variant}.png?v={key}"
@@ -0,0 +1,96 @@
+"""
+Bid increment ladder.
+
+The ladder is a sorted list of (breakpoint, increment) pairs: a price at or
+above a breakpoint moves up by that increment. Lookups are a bisect over the
+breakpoints, and "price after k increments" tables are precomputed per
+starting price so proxy bidding and the proxy-maximum check read the same
+numbers. Only the most recently used tables are kept.
+"""
+import json
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+
+# Up to ₹1 Cr: ₹5L, up to ₹2 Cr: ₹10L, up to ₹5 Cr: ₹20L, above: ₹25L
+DEFAULT_STEPS = [(0, 500000), (10000000, 1000000), (20000000, 2000000), (50000000, 2500000)]
+PRICE_CEILING = 2000000000  # ₹200 Cr, upper bound for precomputed price tables
+TABLE_CACHE_SIZE = 64  # price tables kept (one per starting price, i.e. per open lot price)
+
+
+class IncrementLadder:
+    def __init__(self, steps=DEFAULT_STEPS, ceiling=PRICE_CEILING, cache_size=TABLE_CACHE_SIZE):
+        self.ceiling = ceiling
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self.set_steps(steps)
+
+    def set_steps(self, steps):
+        steps = sorted((int(breakpoint), int(increment)) for breakpoint, increment in steps)
+        if not steps or steps[0][0] != 0:
+            raise ValueError("The first breakpoint must be 0.")
+        if any(increment <= 0 for _, increment in steps):
+            raise ValueError("Increments must be positive.")
+        if len({breakpoint for breakpoint, _ in steps}) != len(steps):
+            raise ValueError("Breakpoints must be unique.")
+        with self._lock:
+            self.steps = steps
+            self.breakpoints = [breakpoint for breakpoint, _ in steps]
+            self.increments = [increment for _, increment in steps]
+            self._tables = OrderedDict()
+
+    def increment(self, price):
+        """Increment that applies at the given price."""
+        return self.increments[max(bisect_right(self.breakpoints, price) - 1, 0)]
+
+    def next_price(self, price):
+        return price + self.increment(price)
+
+    def price_table(self, start):
+        """Every price reachable from ``start``: table[k] is the price after k increments."""
+        with self._lock:
+            table = self._tables.get(start)
+            if table is not None:
+                self._tables.move_to_end(start)
+                return table
+        table = [start]
+        while table[-1] < self.ceiling:
+            table.append(self.next_price(table[-1]))
+        with self._lock:
+            self._tables[start] = table
+            if len(self._tables) > self.cache_size:
+                self._tables.popitem(last=False)
+        return table
+
+    def steps_within(self, start, limit):
+        """How many increments from ``start`` stay at or below ``limit`` (-1 if start is above it)."""
+        return bisect_right(self.price_table(start), limit) - 1
+
+    def max_price_within(self, start, limit):
+        """Highest ladder price reachable from ``start`` that doesn't exceed ``limit``."""
+        steps = self.steps_within(start, limit)
+        return self.price_table(start)[steps] if steps >= 0 else None
+
+    def to_json(self):
+        return json.dumps(self.steps)
+
+    @classmethod
+    def from_json(cls, text):
+        return cls(json.loads(text)) if text else cls()
+
+
+def parse_steps(text, unit=100000):
+    """
+    Parse a "breakpoint:increment" list such as "0:5, 100:10, 200:20, 500:25"
+    where both numbers are in lakhs.
+    """
+    steps = []
+    for part in text.split(","):
+        if part.strip():
+            breakpoint, increment = part.split(":")
+            steps.append((round(float(breakpoint) * unit), round(float(increment) * unit)))
+    return steps
+
+
+def format_steps(steps, unit=100000):
+    return ", ".join(f"{breakpoint / unit:g}:{increment / unit:g}" for breakpoint, increment in steps)
@@ -0,0 +1,72 @@
+"""
+In-memory bid state for every open lot.
+
+Several lots can run at once (silent/parallel rounds). Each lot keeps its own
+price, leader and lock, so reading or updating one lot never waits on
+another; the board-level lock only guards opening and closing lots.
+"""
+import threading
+
+
+class LotState:
+    __slots__ = ("item_id", "price", "leader", "lock")
+
+    def __init__(self, item_id, price, leader=None):
+        self.item_id = item_id
+        self.price = price    # highest bid, or the base price while leader is None
+        self.leader = leader
+        self.lock = threading.Lock()
+
+
+class LotBoard:
+    def __init__(self, max_active=1):
+        self.max_active = max_active
+        self._lots = {}
+        self._lock = threading.Lock()
+
+    def load(self, cur):
+        """Rebuild the board from the active lots in the database."""
+        # place_bid keeps items.base_price at the latest bid, so it is the current price
+        cur.execute("""SELECT i.id, i.base_price,
+                              (SELECT team_name FROM bids b WHERE b.item_id = i.id ORDER BY amount DESC LIMIT 1)
+                       FROM items i WHERE i.is_active = 1""")
+        lots = {item_id: LotState(item_id, price, leader) for item_id, price, leader in cur.fetchall()}
+        with self._lock:
+            self._lots = lots
+
+    def open(self, item_id, price):
+        with self._lock:
+            self._lots[item_id] = LotState(item_id, price)
+
+    def close(self, item_id):
+        with self._lock:
+            self._lots.pop(item_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._lots.clear()
+
+    def active_ids(self):
+        with self._lock:
+            return sorted(self._lots)
+
+    def is_full(self):
+        with self._lock:
+            return len(self._lots) >= self.max_active
+
+    def snapshot(self, item_id):
+        """(price, leader) of an open lot, or None if it isn't open."""
+        lot = self._lots.get(item_id)
+        if lot is None:
+            return None
+        with lot.lock:
+            return lot.price, lot.leader
+
+    def record(self, item_id, leader, price):
+        """Apply a committed bid; stale updates arriving out of order are ignored."""
+        lot = self._lots.get(item_id)
+        if lot is None:
+            return
+        with lot.lock:
+            if lot.leader is None or price > lot.price:
+                lot.price, lot.leader = price, leader
@@ -0,0 +1,138 @@
+"""
+Pre-ordered lot queue.
+
+Players are queued into sets that are auctioned in a fixed order (marquee
+first, the accelerated round for unsold players last). The queue of pending
+lots is kept in memory with the next lot precomputed, so advancing to the next
+player is a pointer bump rather than a query.
+"""
+import threading
+from collections import deque
+
+import bid_series
+from auction_core.engine import log_lot_event
+
+SETS = ["marquee", "capped", "uncapped", "accelerated"]
+
+
+def enqueue(cur, item_ids, set_name):
+    """Append players to the end of a set (re-queueing moves them)."""
+    cur.execute("SELECT COALESCE(MAX(position), 0) FROM lot_queue WHERE set_name = ?", (set_name,))
+    position = cur.fetchone()[0]
+    rows = [(item_id, set_name, position + offset) for offset, item_id in enumerate(item_ids, start=1)]
+    cur.executemany("INSERT OR REPLACE INTO lot_queue (item_id, set_name, position) VALUES (?, ?, ?)", rows)
+
+
+def dequeue(cur, item_ids):
+    cur.executemany("DELETE FROM lot_queue WHERE item_id = ?", [(item_id,) for item_id in item_ids])
+
+
+def unsold_lots(cur):
+    """Ids of every unsold player, best rated first."""
+    cur.execute("SELECT id FROM items WHERE winner_team = 'UNSOLD' ORDER BY rating DESC")
+    return [row[0] for row in cur.fetchall()]
+
+
+def nominate(cur, team_name, item_ids):
+    cur.executemany("INSERT OR IGNORE INTO nominations (team_name, item_id) VALUES (?, ?)",
+                    [(team_name, item_id) for item_id in item_ids])
+
+
+def nominated_lots(cur):
+    """Ids of unsold players nominated by at least one team, most nominated first."""
+    cur.execute("""SELECT n.item_id FROM nominations n JOIN items i ON i.id = n.item_id
+                   WHERE i.winner_team = 'UNSOLD'
+                   GROUP BY n.item_id ORDER BY COUNT(*) DESC, i.rating DESC""")
+    return [row[0] for row in cur.fetchall()]
+
+
+def start_accelerated_round(cur, item_ids, price_factor=1.0):
+    """
+    Put unsold players back up for auction in one batch: reset their status and
+    price, clear their previous round's bids, and queue them in the accelerated
+    set. The price restarts from the player's opening price (the first 'open'
+    lot event, else the current base price), optionally scaled.
+    """
+    marks = ", ".join("?" * len(item_ids))
+    cur.execute(f"SELECT id FROM items WHERE id IN ({marks}) AND winner_team = 'UNSOLD'", list(item_ids))
+    ids = [(row[0],) for row in cur.fetchall()]
+    # Bids from the round the player went unsold in would otherwise still lead the new lot
+    cur.executemany("DELETE FROM bids WHERE item_id = ?", ids)
+    bid_series.note_deletion(cur)
+    cur.executemany("DELETE FROM proxy_bids WHERE item_id = ?", ids)
+    cur.executemany("""UPDATE items SET winner_team = NULL, unsold_timestamp = 0,
+                              base_price = CAST(COALESCE((SELECT e.amount FROM lot_events e
+                                                          WHERE e.item_id = items.id AND e.event = 'open'
+                                                          ORDER BY e.id LIMIT 1), base_price) * ? AS INTEGER)
+                       WHERE id = ?""", [(price_factor, item_id) for item_id, in ids])
+    # A player that goes unsold again gets a fresh unsold_items row
+    cur.executemany("DELETE FROM unsold_items WHERE item_name = (SELECT name FROM items WHERE id = ?)", ids)
+    cur.executemany("DELETE FROM nominations WHERE item_id = ?", ids)
+    for item_id, in ids:
+        log_lot_event(cur, item_id, 'requeued')
+    enqueue(cur, [item_id for item_id, in ids], "accelerated")
+
+
+def pending_lots(cur):
+    """Queued players that haven't been auctioned yet, as (item_id, set_name, position)."""
+    cur.execute("""SELECT q.item_id, q.set_name, q.position
+                   FROM lot_queue q JOIN items i ON i.id = q.item_id
+                   WHERE i.winner_team IS NULL AND i.is_active = 0""")
+    return cur.fetchall()
+
+
+class LotQueue:
+    def __init__(self, auto_advance=False, durations=None):
+        self.auto_advance = auto_advance
+        self.durations = durations or {}  # per-set lot duration overrides (seconds)
+        self._lots = deque()  # item ids in auction order
+        self._sets = {}       # item id -> set name
+        self._lock = threading.Lock()
+
+    def load(self, rows):
+        """Replace the queue with rows from ``pending_lots``."""
+        rank = {name: index for index, name in enumerate(SETS)}
+        ordered = sorted(rows, key=lambda row: (rank.get(row[1], len(SETS)), row[2]))
+        with self._lock:
+            self._lots = deque(item_id for item_id, _, _ in ordered)
+            self._sets = {item_id: set_name for item_id, set_name, _ in ordered}
+
+    def peek(self):
+        """The next lot to open, or None if the queue is empty."""
+        with self._lock:
+            return self._lots[0] if self._lots else None
+
+    def pop(self):
+        with self._lock:
+            if not self._lots:
+                return None
+            item_id = self._lots.popleft()
+            self._sets.pop(item_id, None)
+            return item_id
+
+    def discard(self, item_id):
+        """Drop a lot that was opened, sold or removed outside the queue."""
+        with self._lock:
+            if item_id in self._sets:
+                self._lots.remove(item_id)
+                del self._sets[item_id]
+
+    def set_of(self, item_id):
+        with self._lock:
+            return self._sets.get(item_id)
+
+    def duration_for(self, item_id, default):
+        """Lot duration for a queued player, honouring per-set overrides."""
+        return self.durations.get(self.set_of(item_id)) or default
+
+    def counts(self):
+        """Number of pending lots per set, in auction order."""
+        with self._lock:
+            counts = {name: 0 for name in SETS}
+            for set_name in self._sets.values():
+                counts[set_name] = counts.get(set_name, 0) + 1
+            return counts
+
+    def __len__(self):
+        with self._lock:
+            return len(self._lots)
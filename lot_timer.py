@@ -0,0 +1,109 @@
+"""
+Server-side countdown for timed lots.
+
+Each open lot has a deadline. A bid that lands inside the anti-sniping window
+pushes the deadline out so rivals get time to respond. A background thread
+calls ``tick()`` a few times a second and hands every expired lot to the
+``on_expire`` callback, which closes it (sale or unsold). The clock is
+injectable so the timer can be driven deterministically without the thread.
+"""
+import threading
+import time
+
+
+class LotTimer:
+    def __init__(self, on_expire, duration=60, snipe_window=10, extension=10, clock=time.time):
+        self.on_expire = on_expire
+        self.duration = duration          # default seconds a lot stays open
+        self.snipe_window = snipe_window  # bids this close to the deadline extend it
+        self.extension = extension        # seconds left on the clock after an extension
+        self.clock = clock
+        self._deadlines = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def configure(self, duration=None, snipe_window=None, extension=None):
+        with self._lock:
+            if duration is not None:
+                self.duration = duration
+            if snipe_window is not None:
+                self.snipe_window = snipe_window
+            if extension is not None:
+                self.extension = extension
+
+    def open(self, item_id, duration=None):
+        """Start the countdown for a lot and return its deadline."""
+        with self._lock:
+            deadline = self.clock() + (self.duration if duration is None else duration)
+            self._deadlines[item_id] = deadline
+            return deadline
+
+    def restore(self, item_id, deadline):
+        """Re-arm a lot from a persisted deadline (e.g. after a server restart)."""
+        with self._lock:
+            self._deadlines[item_id] = deadline
+
+    def cancel(self, item_id):
+        with self._lock:
+            self._deadlines.pop(item_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._deadlines.clear()
+
+    def on_bid(self, item_id):
+        """
+        Apply the anti-sniping rule for a bid that was just accepted.
+        Returns the new deadline if it was extended, otherwise None.
+        """
+        with self._lock:
+            deadline = self._deadlines.get(item_id)
+            if deadline is None:
+                return None
+            now = self.clock()
+            if deadline - now > self.snipe_window:
+                return None
+            self._deadlines[item_id] = now + self.extension
+            return self._deadlines[item_id]
+
+    def deadline(self, item_id):
+        with self._lock:
+            return self._deadlines.get(item_id)
+
+    def remaining(self, item_id):
+        """Seconds left on a lot, or None if the lot isn't timed."""
+        with self._lock:
+            deadline = self._deadlines.get(item_id)
+            if deadline is None:
+                return None
+            return max(0.0, deadline - self.clock())
+
+    def tick(self):
+        """Fire ``on_expire`` for every lot whose deadline has passed; return their ids."""
+        with self._lock:
+            now = self.clock()
+            expired = [item_id for item_id, deadline in self._deadlines.items() if deadline <= now]
+            for item_id in expired:
+                del self._deadlines[item_id]
+        # Callbacks run outside the lock so they may open the next lot
+        for item_id in expired:
+            self.on_expire(item_id)
+        return expired
+
+    def start(self, interval=0.25):
+        """Run ``tick()`` on a daemon thread until ``stop()`` is called."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, args=(interval,), name="lot-timer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            self.tick()
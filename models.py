@@ -0,0 +1,76 @@
+"""
+Typed rows for the auction tables.
+
+Each type has a ``from_row`` row factory that builds it from the cursor's
+column names, so a query selects only the columns it needs (the rest stay
+None) and code reads fields by name instead of by tuple position; adding a
+column with ALTER TABLE can no longer shift anything. The classes are frozen
+and use slots, which keeps large result sets compact.
+"""
+from dataclasses import dataclass, fields
+
+
+class Row:
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls, cursor, row):
+        return cls(**{column[0]: value for column, value in zip(cursor.description, row)})
+
+    @classmethod
+    def columns(cls):
+        """Every column of the type, for ``SELECT {columns()} FROM ...``."""
+        return ", ".join(field.name for field in fields(cls))
+
+
+@dataclass(frozen=True, slots=True)
+class Item(Row):
+    id: int
+    name: str = None
+    rating: int = None
+    category: str = None
+    nationality: str = None
+    image_url: str = None
+    base_price: int = None
+    is_active: int = None
+    winner_team: str = None
+    unsold_timestamp: float = None
+    image_key: str = None
+    expected_price: int = None
+
+
+@dataclass(frozen=True, slots=True)
+class Team(Row):
+    name: str
+    budget_remaining: int = None
+    logo_url: str = None
+    initial_budget: int = None
+    logo_key: str = None
+    max_players: int = None
+    max_foreign_players: int = None
+
+
+@dataclass(frozen=True, slots=True)
+class Bid(Row):
+    item_id: int = None
+    team_name: str = None
+    amount: int = None
+    timestamp: str = None
+
+
+@dataclass(frozen=True, slots=True)
+class Sale(Row):
+    item_name: str
+    sold_amount: int = None
+    rating: int = None
+    category: str = None
+    nationality: str = None
+    team_bought: str = None
+    timestamp: str = None
+
+
+def fetch(conn, row_type, sql, params=()):
+    """Run ``sql`` on a fresh cursor whose rows come back as ``row_type``."""
+    cur = conn.cursor()
+    cur.row_factory = row_type.from_row
+    return cur.execute(sql, params)
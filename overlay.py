@@ -0,0 +1,337 @@
+"""
+Broadcast overlay for streaming software (an OBS browser source).
+
+A small HTTP server, separate from Streamlit, serves:
+
+    /             the overlay page (static HTML, cached by the browser)
+    /state.json   current lot, price, leading team, lot deadline and last sale
+    /events       the same document as Server-Sent Events, pushed on every change
+    /img/<file>   cached thumbnails (see image_cache.py)
+
+The state is one shared JSON document. A single thread rebuilds it only when
+``PRAGMA data_version`` shows a new commit, so every viewer reads the same
+bytes and adding viewers costs nothing but an idle connection. Timers count
+down in the browser from the lot's deadline, so the server does not push
+once a second.
+
+The app starts the server when the ``overlay_port`` setting is non-zero. It
+can also run on its own against the same database:
+
+    python overlay.py biddi09i_game.db --port 8765
+"""
+import argparse
+import json
+import os
+import re
+import socket
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from auction_core.engine import format_amount
+
+# Same folder image_cache.py writes thumbnails to
+IMG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static", "img")
+KEEPALIVE = 15  # seconds between SSE comments on an idle stream
+
+
+class OverlayFeed:
+    """The overlay's state: one JSON document, rebuilt when the database changes."""
+
+    def __init__(self, db_path, interval=0.25, clock=time.time):
+        self.db_path = db_path
+        self.interval = interval
+        self.clock = clock
+        self.version = 0
+        self.body = b"{}"
+        self._data_version = None
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="auction-overlay-feed", daemon=True)
+        self._thread.start()
+
+    def snapshot(self):
+        with self._changed:
+            return self.version, self.body
+
+    def wait(self, version, timeout):
+        """
+        Block until the document is newer than ``version`` (or ``timeout``);
+        returns (version, body), or None once the feed has stopped.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version or self._stop.is_set(), timeout)
+            if self._stop.is_set():
+                return None
+            return self.version, self.body
+
+    def stop(self):
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.refresh(conn)
+                except sqlite3.Error:
+                    pass  # e.g. the database is being restored; try again on the next tick
+                self._stop.wait(self.interval)
+        finally:
+            conn.close()
+
+    def refresh(self, conn):
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return
+        self._data_version = data_version
+        body = json.dumps(self._build(conn), separators=(",", ":")).encode()
+        with self._changed:
+            if body != self.body:
+                self.version += 1
+                self.body = body
+                self._changed.notify_all()
+
+    def _build(self, conn):
+        logos = {name: _image(key, "logo", url) for name, url, key in conn.execute("SELECT name, logo_url, logo_key FROM teams")}
+        state = {"lot": None, "last_sale": None, "active_lots": 0}
+
+        lots = conn.execute("""SELECT id, name, rating, category, nationality, image_url, image_key, base_price, closes_at
+                               FROM items WHERE is_active = 1 ORDER BY id""").fetchall()
+        state["active_lots"] = len(lots)
+        if lots:
+            item_id, name, rating, category, nationality, image_url, image_key, price, closes_at = lots[0]
+            leader = conn.execute("SELECT team_name FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (item_id,)).fetchone()
+            state["lot"] = {
+                "id": item_id,
+                "name": name,
+                "rating": rating,
+                "category": category,
+                "nationality": nationality,
+                "image": _image(image_key, "card", image_url),
+                "price": price,
+                "price_label": format_amount(price or 0),
+                "leader": leader[0] if leader else None,
+                "leader_logo": logos.get(leader[0]) if leader else None,
+                "closes_at": closes_at,
+            }
+
+        sale = conn.execute("SELECT item_name, sold_amount, team_bought FROM sold_items ORDER BY id DESC LIMIT 1").fetchone()
+        if sale:
+            state["last_sale"] = {"name": sale[0], "amount": sale[1], "amount_label": format_amount(sale[1]),
+                                  "team": sale[2], "team_logo": logos.get(sale[2])}
+        return state
+
+
+def _image(key, variant, fallback_url):
+    # Cached thumbnails are served by the overlay server itself (see image_cache.thumbnail_url)
+    return f"/img/{key}_{variant}.png" if key else (fallback_url or None)
+
+
+class OverlayHandler(BaseHTTPRequestHandler):
+    feed = None     # set on the subclass built by OverlayServer
+    streams = None  # the server's open /events connections, closed when it stops
+
+    def log_message(self, format, *args):
+        pass  # A busy stream would flood the console
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path in ("/", "/overlay"):
+            self._send(200, OVERLAY_HTML.encode(), "text/html; charset=utf-8", cache="public, max-age=300")
+        elif path == "/state.json":
+            version, body = self.feed.snapshot()
+            etag = f'"{version}"'
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", None, cache="no-cache", etag=etag)
+            else:
+                self._send(200, body, "application/json", cache="no-cache", etag=etag)
+        elif path == "/events":
+            self._stream()
+        elif re.fullmatch(r"/img/[0-9a-f]{32}_\w+\.png", path):
+            file_path = os.path.join(IMG_DIR, os.path.basename(path))
+            if not os.path.isfile(file_path):
+                self._send(404, b"not found", "text/plain")
+                return
+            with open(file_path, "rb") as f:
+                # Content-addressed file names never change, so they can be cached for good
+                self._send(200, f.read(), "image/png", cache="public, max-age=31536000, immutable")
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _send(self, status, body, content_type, cache=None, etag=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        if cache:
+            self.send_header("Cache-Control", cache)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        version, body = self.feed.snapshot()
+        self.streams.add(self.connection)
+        try:
+            self.wfile.write(b"id: %d\ndata: %s\n\n" % (version, body))
+            self.wfile.flush()
+            while True:
+                update = self.feed.wait(version, KEEPALIVE)
+                if update is None:
+                    break  # The server is stopping
+                if update[0] == version:
+                    self.wfile.write(b": keepalive\n\n")
+                else:
+                    version, body = update
+                    self.wfile.write(b"id: %d\ndata: %s\n\n" % (version, body))
+                self.wfile.flush()
+        except OSError:
+            pass  # The viewer went away, or the server closed the connection
+        finally:
+            self.streams.discard(self.connection)
+
+
+class OverlayServer:
+    def __init__(self, db_path, port=8765, host="0.0.0.0"):
+        self.feed = OverlayFeed(db_path)
+        self.streams = set()
+        handler = type("BoundOverlayHandler", (OverlayHandler,), {"feed": self.feed, "streams": self.streams})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="auction-overlay", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        # Wakes every open stream so its handler returns, then drops the viewers still connected
+        self.feed.stop()
+        for connection in list(self.streams):
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass  # Already closed by the viewer
+
+
+OVERLAY_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Auction overlay</title>
+<style>
+  body { margin: 0; background: transparent; font-family: "Segoe UI", Arial, sans-serif; color: #fff; }
+  .bar { position: fixed; left: 40px; right: 40px; bottom: 40px; display: flex; gap: 16px; align-items: stretch; }
+  .panel { background: rgba(15, 23, 42, 0.88); border-radius: 14px; padding: 14px 20px; display: flex; align-items: center; gap: 16px; }
+  .lot { flex: 1; }
+  .lot img.player { width: 84px; height: 92px; object-fit: cover; border-radius: 10px; }
+  .name { font-size: 30px; font-weight: 700; }
+  .meta { font-size: 16px; opacity: 0.8; }
+  .price { font-size: 40px; font-weight: 800; color: #facc15; }
+  .leader img, .sale img { width: 56px; height: 56px; object-fit: contain; }
+  .timer { font-size: 36px; font-weight: 800; min-width: 90px; text-align: center; }
+  .timer.low { color: #f87171; }
+  .sale { font-size: 16px; }
+  .hidden { display: none; }
+</style>
+</head>
+<body>
+<div class="bar">
+  <div class="panel lot hidden" id="lot">
+    <img class="player" id="lot-image" alt="">
+    <div>
+      <div class="name" id="lot-name"></div>
+      <div class="meta" id="lot-meta"></div>
+    </div>
+    <div style="margin-left: auto; text-align: right;">
+      <div class="price" id="lot-price"></div>
+      <div class="meta" id="lot-leader">No bids yet</div>
+    </div>
+    <div class="leader"><img id="leader-logo" class="hidden" alt=""></div>
+    <div class="timer hidden" id="timer"></div>
+  </div>
+  <div class="panel sale hidden" id="sale">
+    <img id="sale-logo" alt="">
+    <div><div class="meta">Last sale</div><div id="sale-text"></div></div>
+  </div>
+</div>
+<script>
+  let closesAt = null;
+  const $ = (id) => document.getElementById(id);
+  function show(el, on) { el.classList.toggle("hidden", !on); }
+  function setImage(el, src) { show(el, !!src); if (src && el.getAttribute("src") !== src) el.src = src; }
+
+  function render(state) {
+    const lot = state.lot;
+    show($("lot"), !!lot);
+    if (lot) {
+      setImage($("lot-image"), lot.image);
+      $("lot-name").textContent = lot.name;
+      $("lot-meta").textContent = [lot.category, lot.nationality, lot.rating && "Rating " + lot.rating].filter(Boolean).join(" · ");
+      $("lot-price").textContent = lot.price_label;
+      $("lot-leader").textContent = lot.leader ? "Leading: " + lot.leader : "No bids yet";
+      setImage($("leader-logo"), lot.leader_logo);
+    }
+    closesAt = lot ? lot.closes_at : null;
+    const sale = state.last_sale;
+    show($("sale"), !!sale);
+    if (sale) {
+      setImage($("sale-logo"), sale.team_logo);
+      $("sale-text").textContent = sale.name + " → " + sale.team + " for " + sale.amount_label;
+    }
+    tick();
+  }
+
+  function tick() {
+    const timer = $("timer");
+    show(timer, closesAt !== null);
+    if (closesAt === null) return;
+    const left = Math.max(0, Math.ceil(closesAt - Date.now() / 1000));
+    timer.textContent = left + "s";
+    timer.classList.toggle("low", left <= 10);
+  }
+  setInterval(tick, 250);
+
+  if (window.EventSource) {
+    new EventSource("/events").onmessage = (event) => render(JSON.parse(event.data));
+  } else {
+    let etag = null;
+    setInterval(async () => {
+      const response = await fetch("/state.json", { headers: etag ? { "If-None-Match": etag } : {} });
+      if (response.status === 200) { etag = response.headers.get("ETag"); render(await response.json()); }
+    }, 1000);
+  }
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the broadcast overlay for an auction database.")
+    parser.add_argument("db_path", nargs="?", default="biddi09i_game.db")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--host", default="0.0.0.0")
+    args = parser.parse_args()
+    server = OverlayServer(args.db_path, args.port, args.host)
+    print(f"overlay at http://localhost:{server.port}/ (add it as a browser source)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Full-text and faceted player search for the admin lot picker.
+
+Names, categories and nationalities are indexed in the ``items_fts`` FTS5
+table (kept in sync by triggers, see auction_core.schema). Searches
+combine a prefix match with facet filters and return one page of rows plus
+the total, so the picker stays instant however many players are loaded.
+SQLite builds without FTS5 fall back to a LIKE match on the name.
+"""
+import re
+
+from models import Item, fetch
+
+PAGE_SIZE = 25
+
+COLUMNS = "id, name, rating, category, nationality, image_url, base_price, is_active, winner_team, expected_price"
+
+RATING_BANDS = {
+    "90+": (90, None),
+    "80-89": (80, 89),
+    "70-79": (70, 79),
+    "60-69": (60, 69),
+    "Below 60": (None, 59),
+}
+
+STATUSES = {
+    "Pending": "winner_team IS NULL AND is_active = 0",
+    "Active": "is_active = 1",
+    "Sold": "winner_team IS NOT NULL AND winner_team != 'UNSOLD'",
+    "Unsold": "winner_team = 'UNSOLD'",
+}
+
+
+def has_fts(cur):
+    cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'")
+    return cur.fetchone() is not None
+
+
+def _match_query(text):
+    # Every word must match as a prefix: "vir koh" finds "Virat Kohli"
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+
+def search(cur, text="", category=None, nationality=None, rating_band=None, status=None,
+           page=0, page_size=PAGE_SIZE):
+    """One page of matching players (best rated first, as Item rows) and the total number of matches."""
+    where, params = [], []
+    if re.search(r"\w", text or ""):
+        if has_fts(cur):
+            where.append("id IN (SELECT rowid FROM items_fts WHERE items_fts MATCH ?)")
+            params.append(_match_query(text))
+        else:
+            where.append("name LIKE ?")
+            params.append(f"%{text.strip()}%")
+    if category:
+        where.append("category = ?")
+        params.append(category)
+    if nationality:
+        where.append("nationality = ?")
+        params.append(nationality)
+    if rating_band:
+        low, high = RATING_BANDS[rating_band]
+        if low is not None:
+            where.append("rating >= ?")
+            params.append(low)
+        if high is not None:
+            where.append("rating <= ?")
+            params.append(high)
+    if status:
+        where.append(f"({STATUSES[status]})")
+    clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+    cur.execute(f"SELECT COUNT(*) FROM items {clause}", params)
+    total = cur.fetchone()[0]
+    rows = fetch(cur.connection, Item, f"SELECT {COLUMNS} FROM items {clause} ORDER BY rating DESC, id LIMIT ? OFFSET ?",
+                 params + [page_size, page * page_size]).fetchall()
+    return rows, total
+
+
+def facets(cur):
+    """Values (with player counts) for the category and nationality filters."""
+    result = {}
+    for column in ("category", "nationality"):
+        cur.execute(f"SELECT {column}, COUNT(*) FROM items WHERE {column} IS NOT NULL GROUP BY {column} ORDER BY {column}")
+        result[column] = cur.fetchall()
+    return result
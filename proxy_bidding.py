@@ -0,0 +1,102 @@
+"""
+Proxy (max-bid) auto-bidding.
+
+Teams register a confidential maximum for a lot. Whenever the price moves,
+``run_proxies`` settles the competing proxies in the caller's transaction, so
+a contested lot settles in one write instead of dozens of button clicks.
+
+The highest maximum wins; equal maximums go to the team that registered
+first. The winner pays one ladder step above the most the runner-up could
+bid, capped at its own maximum (so on equal maximums it pays that maximum).
+Only the runner-up's last bid and the winner's answer are recorded.
+"""
+from datetime import datetime
+
+
+def _ladder_max(start, limit, ladder, strict=False):
+    """Highest price on the ladder from ``start`` that is at most ``limit`` (below it if ``strict``), or None."""
+    return ladder.max_price_within(start, limit - 1 if strict else limit)
+
+
+def resolve(price, leader, proxies, ladder):
+    """
+    Settle competing proxies and return the bids they place as (team, amount).
+
+    ``price`` is the current highest bid (or the base price when ``leader`` is
+    None, in which case the first bid is placed at that price). ``proxies`` is a
+    list of (team_name, max_amount) in registration order; earlier proxies win
+    ties. ``ladder`` is the auction's increments.IncrementLadder.
+    """
+    if not proxies:
+        return []
+    first = price if leader is None else ladder.next_price(price)
+    # sorted() is stable, so equal maximums stay in registration order
+    ranked = sorted(proxies, key=lambda proxy: -proxy[1])
+    winner, winner_max = ranked[0]
+    rivals = [(team_name, max_amount) for team_name, max_amount in ranked[1:]
+              if team_name != winner and max_amount >= first]
+    if not rivals:
+        # Unopposed: the winner only has to take the lead, if it doesn't hold it already
+        return [] if winner == leader or winner_max < first else [(winner, first)]
+
+    runner, runner_max = rivals[0]
+    if runner_max < winner_max:
+        runner_price = _ladder_max(first, runner_max, ladder)
+        answer = min(ladder.next_price(runner_price), winner_max)
+    else:
+        # Equal maximums: the earlier registration takes the lot at that maximum
+        runner_price = _ladder_max(first, runner_max, ladder, strict=True)
+        answer = winner_max
+    # A runner-up that already leads doesn't bid over itself; its maximum still sets the winner's price
+    bids = [] if runner_price is None or runner == leader else [(runner, runner_price)]
+    bids.append((winner, answer))
+    return bids
+
+
+def register_proxy(cur, item_id, team_name, max_amount):
+    # Raising a maximum keeps the team's original place in the tie-break order
+    cur.execute("""INSERT INTO proxy_bids (item_id, team_name, max_amount, created_at) VALUES (?, ?, ?, ?)
+                   ON CONFLICT(item_id, team_name) DO UPDATE SET max_amount = excluded.max_amount""",
+                (item_id, team_name, max_amount, datetime.now().isoformat()))
+
+
+def clear_proxies(cur, item_id):
+    cur.execute("DELETE FROM proxy_bids WHERE item_id = ?", (item_id,))
+
+
+def run_proxies(cur, item_id, ladder, limit_fn=None):
+    """
+    Resolve the registered proxies for an open lot and record their bids.
+    ``limit_fn(team_name, category, nationality, item_id)`` may cap each
+    team's maximum further (returning None excludes the team).
+    """
+    cur.execute("SELECT is_active, base_price, category, nationality FROM items WHERE id = ?", (item_id,))
+    item = cur.fetchone()
+    if not item or not item[0]:
+        return []
+
+    # A proxy can never commit more than the team has left
+    cur.execute("""SELECT p.team_name, MIN(p.max_amount, t.budget_remaining)
+                   FROM proxy_bids p JOIN teams t ON t.name = p.team_name
+                   WHERE p.item_id = ? ORDER BY p.created_at""", (item_id,))
+    proxies = cur.fetchall()
+    if limit_fn is not None:
+        capped = []
+        for team_name, max_amount in proxies:
+            limit = limit_fn(team_name, item[2], item[3], item_id)
+            if limit is not None:
+                capped.append((team_name, min(max_amount, limit)))
+        proxies = capped
+    if not proxies:
+        return []
+
+    cur.execute("SELECT team_name, amount FROM bids WHERE item_id = ? ORDER BY amount DESC LIMIT 1", (item_id,))
+    highest = cur.fetchone()
+    leader, price = highest if highest else (None, item[1])
+
+    bids = resolve(price, leader, proxies, ladder)
+    if bids:
+        cur.executemany("INSERT INTO bids (item_id, team_name, amount, timestamp, proxy) VALUES (?, ?, ?, ?, 1)",
+                        [(item_id, team_name, amount, datetime.now().isoformat()) for team_name, amount in bids])
+        cur.execute("UPDATE items SET base_price = ? WHERE id = ?", (bids[-1][1], item_id))
+    return bids
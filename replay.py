@@ -0,0 +1,258 @@
+"""
+Deterministic replay of a recorded auction.
+
+Reads the lot events (opened, sold, unsold, stopped, requeued for the
+accelerated round, proxy maximums registered) and the ``bids`` rows of
+an auction database and re-executes them, in timestamp order, against a fresh
+database through the same AuctionEngine commands and write queue as the app.
+Bids placed by proxies are not re-submitted: the registered proxies answer
+again through the proxy path, and their bids are compared with the recorded
+ones. The replay then checks that every team's remaining budget and the
+``sold_items`` rows match the recording.
+
+Databases from before ``lot_events`` existed are replayed from ``bids``,
+``sold_items`` and ``unsold_items`` alone: a lot opens at its first recorded
+action and its first bid is taken as its base price.
+
+    python replay.py biddi09i_game.db              # as fast as possible
+    python replay.py biddi09i_game.db --speed 1    # at recorded speed
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+
+import increments
+import lot_queue as lotq
+import squad_rules
+from auction_core import AuctionEngine, create_schema
+from squad_rules import BidRejected
+from write_queue import WriteQueue
+
+# Order of events that share a timestamp
+_EVENT_ORDER = {"requeued": 0, "open": 0, "proxy": 1, "bid": 1, "proxy_bid": 1, "sold": 2, "unsold": 2, "stopped": 2}
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _columns(cur, table):
+    cur.execute(f"PRAGMA table_info({table})")
+    return {row[1] for row in cur.fetchall()}
+
+
+def load_events(cur):
+    """Recorded actions as (timestamp, event, item_id, team_name, amount), in order."""
+    cur.execute("SELECT id FROM items")
+    item_ids = {row[0] for row in cur.fetchall()}
+    # Bids a proxy placed are replayed by the proxy registration ("proxy_bid" only moves the price)
+    proxy = "proxy" if "proxy" in _columns(cur, "bids") else "0"
+    cur.execute(f"SELECT item_id, team_name, amount, timestamp, {proxy} FROM bids")
+    events = [(_timestamp(ts), "proxy_bid" if is_proxy else "bid", item_id, team_name, amount)
+              for item_id, team_name, amount, ts, is_proxy in cur.fetchall() if item_id in item_ids]
+
+    lot_event_columns = _columns(cur, "lot_events")
+    if lot_event_columns:
+        team = "team_name" if "team_name" in lot_event_columns else "NULL"
+        cur.execute(f"SELECT item_id, event, amount, timestamp, {team} FROM lot_events ORDER BY id")
+        lot_events = cur.fetchall()
+    if lot_event_columns and lot_events:
+        events += [(_timestamp(ts), event, item_id, team_name, amount)
+                   for item_id, event, amount, ts, team_name in lot_events if item_id in item_ids]
+    else:
+        events += _legacy_lot_events(cur, events)
+    return sorted(events, key=lambda event: (event[0], _EVENT_ORDER[event[1]]))
+
+
+def _legacy_lot_events(cur, bid_events):
+    # A lot (re)opens at the first bid or close after it was last closed
+    cur.execute("SELECT id, name, base_price FROM items")
+    items = {name: (item_id, base_price) for item_id, name, base_price in cur.fetchall()}
+    closes = []
+    cur.execute("SELECT item_name, sold_amount, timestamp FROM sold_items")
+    closes += [(name, "sold", amount, ts) for name, amount, ts in cur.fetchall()]
+    cur.execute("SELECT item_name, NULL, timestamp FROM unsold_items")
+    closes += [(name, "unsold", amount, ts) for name, amount, ts in cur.fetchall()]
+
+    actions = {}
+    for ts, _, item_id, _, amount in bid_events:
+        actions.setdefault(item_id, []).append((ts, 0, "bid", amount))
+    for name, event, amount, ts in closes:
+        if name in items:
+            actions.setdefault(items[name][0], []).append((_timestamp(ts), 1, event, amount))
+
+    base_prices = {item_id: base_price for item_id, base_price in items.values()}
+    events = []
+    for item_id, item_actions in actions.items():
+        is_open = False
+        for ts, _, event, amount in sorted(item_actions):
+            if not is_open:
+                events.append((ts, "open", item_id, None, amount if event == "bid" else base_prices[item_id]))
+                is_open = True
+            if event != "bid":
+                events.append((ts, event, item_id, None, amount))
+                is_open = False
+    return events
+
+
+def _copy_auction(source, cur):
+    """Copy players, teams and settings into a fresh database, as before the first lot."""
+    source.execute("SELECT id, name, rating, category, nationality, image_url, base_price FROM items")
+    cur.executemany("""INSERT INTO items (id, name, rating, category, nationality, image_url, base_price)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""", source.fetchall())
+    source.execute("PRAGMA table_info(teams)")
+    limits = "max_players, max_foreign_players" if "max_players" in {row[1] for row in source.fetchall()} else "0, 0"
+    source.execute(f"""SELECT name, COALESCE(initial_budget, budget_remaining), logo_url,
+                              COALESCE(initial_budget, budget_remaining), password, {limits} FROM teams""")
+    cur.executemany("""INSERT INTO teams (name, budget_remaining, logo_url, initial_budget, password, max_players, max_foreign_players)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""", source.fetchall())
+    source.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'settings'")
+    if source.fetchone():
+        source.execute("SELECT key, value FROM settings")
+        cur.executemany("INSERT INTO settings (key, value) VALUES (?, ?)", source.fetchall())
+
+
+def _set_base_price(cur, item_id, price):
+    cur.execute("UPDATE items SET base_price = ?, winner_team = NULL WHERE id = ?", (price, item_id))
+
+
+def _outcome(cur):
+    cur.execute("SELECT name, budget_remaining FROM teams ORDER BY name")
+    budgets = dict(cur.fetchall())
+    cur.execute("SELECT item_name, team_bought, sold_amount FROM sold_items ORDER BY item_name, team_bought, sold_amount")
+    return budgets, cur.fetchall()
+
+
+def replay(db_path, speed=0):
+    """
+    Replay the auction recorded in ``db_path`` and return a report (a dict).
+    ``speed`` 0 replays as fast as possible; 1 keeps the recorded gaps, 2 halves them.
+    """
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True).cursor()
+    events = load_events(source)
+    expected_budgets, expected_sold = _outcome(source)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        replay_path = os.path.join(tmp, "replay.db")
+        conn = sqlite3.connect(replay_path)
+        cur = conn.cursor()
+        create_schema(cur)
+        _copy_auction(source, cur)
+        conn.commit()
+        source.connection.close()
+
+        settings = dict(cur.execute("SELECT key, value FROM settings").fetchall())
+        squad_book = squad_rules.SquadBook(
+            min_squad_size=int(settings.get('min_squad_size', 0)),
+            category_minimums=json.loads(settings.get('category_minimums', '{}')),
+            reserve_price=int(settings.get('slot_reserve_price', 0)),
+        )
+        squad_book.load(cur)
+        engine = AuctionEngine(squad_book, increments.IncrementLadder.from_json(settings.get('increment_ladder')))
+        writer = WriteQueue(replay_path)
+
+        # The price each bid was placed against is the lot's previous recorded price
+        prices = {}
+        submitted = []
+        recorded_proxy_bids, replayed_proxy_bids = [], []
+        start = time.perf_counter()
+        first_ts = events[0][0] if events else 0
+        for ts, event, item_id, team_name, amount in events:
+            if speed:
+                delay = (ts - first_ts) / speed - (time.perf_counter() - start)
+                if delay > 0:
+                    time.sleep(delay)
+            if event == "open":
+                writer.submit(_set_base_price, item_id, amount)
+                writer.submit(engine.set_active_item, item_id, False)
+                prices.pop(item_id, None)
+            elif event == "bid":
+                current_amount = prices.get(item_id, amount)
+                prices[item_id] = amount
+                submitted.append((writer.submit(engine.place_bid, item_id, team_name, current_amount),
+                                  ts, item_id, team_name, amount))
+            elif event == "proxy":
+                future = writer.submit(engine.register_proxy, item_id, team_name, amount)
+                future.add_done_callback(lambda f, item_id=item_id: replayed_proxy_bids.extend(
+                    (item_id, *bid) for bid in (f.result() if not f.exception() else [])))
+            elif event == "proxy_bid":
+                prices[item_id] = amount
+                recorded_proxy_bids.append((item_id, team_name, amount))
+            elif event == "sold" or event == "stopped":
+                writer.submit(engine.close_lot, item_id, False)
+            elif event == "unsold":
+                writer.submit(engine.mark_as_unsold, item_id)
+            elif event == "requeued":
+                writer.submit(lotq.start_accelerated_round, [item_id])
+        writer.flush()
+        wall_time = time.perf_counter() - start
+        commits = writer.commits
+        writer.close()
+
+        bid_mismatches = []
+        for future, ts, item_id, team_name, amount in submitted:
+            try:
+                recorded = future.result()
+            except BidRejected as e:
+                bid_mismatches.append((item_id, team_name, amount, f"rejected: {e}"))
+            else:
+                if recorded[0][1] != amount:
+                    bid_mismatches.append((item_id, team_name, amount, f"placed at {recorded[0][1]}"))
+                replayed_proxy_bids.extend((item_id, *bid) for bid in recorded[1:])
+
+        # Proxy bids are compared as a whole: the same bids must come back, from whichever command
+        replayed = Counter(replayed_proxy_bids)
+        replayed.subtract(recorded_proxy_bids)
+        for (item_id, team_name, amount), count in sorted(replayed.items()):
+            if count < 0:
+                bid_mismatches.append((item_id, team_name, amount, "proxy bid missing from the replay"))
+            elif count > 0:
+                bid_mismatches.append((item_id, team_name, amount, "proxy bid only in the replay"))
+
+        budgets, sold = _outcome(cur)
+        conn.close()
+
+    return {
+        "events": len(events),
+        "bids": len(submitted),
+        "commits": commits,
+        "wall_time": wall_time,
+        "bid_mismatches": bid_mismatches,
+        "budget_mismatches": {name: (expected_budgets.get(name), budget) for name, budget in budgets.items()
+                              if expected_budgets.get(name) != budget},
+        "sold_missing": sorted(set(expected_sold) - set(sold)),
+        "sold_extra": sorted(set(sold) - set(expected_sold)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded auction against a fresh database.")
+    parser.add_argument("db_path")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="0 = as fast as possible, 1 = recorded speed, 2 = twice as fast, ...")
+    args = parser.parse_args()
+
+    report = replay(args.db_path, args.speed)
+    wall_time = report["wall_time"] or 1e-9
+    print(f"replayed {report['events']} events ({report['bids']} bids) in {report['wall_time']:.2f}s, "
+          f"{report['bids'] / wall_time:,.0f} bids/s, {report['commits']} commits")
+    for item_id, team_name, amount, problem in report["bid_mismatches"]:
+        print(f"bid mismatch: item {item_id}, {team_name} {amount}: {problem}")
+    for name, (expected, actual) in report["budget_mismatches"].items():
+        print(f"budget mismatch: {name} recorded {expected}, replayed {actual}")
+    for row in report["sold_missing"]:
+        print(f"sold_items missing from replay: {row}")
+    for row in report["sold_extra"]:
+        print(f"sold_items only in replay: {row}")
+    ok = not (report["bid_mismatches"] or report["budget_mismatches"] or report["sold_missing"] or report["sold_extra"])
+    print("replay matches the recording" if ok else "replay differs from the recording")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
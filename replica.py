@@ -0,0 +1,219 @@
+"""
+Read-only analytics replica of the live auction database.
+
+The analytical views (Players Market, Team Squad, Auction History, charts)
+read a separate copy of the database so their scans never contend with bid
+writes. The replica starts as a backup-API copy and a background thread then
+applies committed changes every ``interval`` seconds:
+
+- append-only history tables (bids, sold/unsold items, lot events) copy only
+  the rows past their id watermark; a row count mismatch means rows were
+  deleted (a deleted player, an archive) and the table is copied again;
+- keyed tables (players, teams, settings, ...) are copied by primary key,
+  only for the keys their triggers logged in ``replica_changes`` past the
+  change watermark, so a cycle never scans a whole table and the replica's
+  search index isn't rebuilt every cycle. A keyed table without change-log
+  triggers (a database from before them) is diffed in full instead.
+
+A cycle is skipped when ``PRAGMA data_version`` shows no commit since the
+last one. ``lag()`` is how far the replica may be behind the live database.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+APPEND_TABLES = ("bids", "sold_items", "unsold_items", "lot_events")
+CHANGE_LOG = "replica_changes"
+
+
+def replica_path_for(db_path):
+    root, ext = os.path.splitext(db_path)
+    return f"{root}.replica{ext or '.db'}"
+
+
+def _tables(conn):
+    """Ordinary tables to replicate (not SQLite internals, FTS tables or their shadow tables)."""
+    rows = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'").fetchall()
+    virtual = [name for name, sql in rows if sql and sql.upper().startswith("CREATE VIRTUAL")]
+    return [name for name, _ in rows
+            if name != CHANGE_LOG and name not in virtual and not any(name.startswith(f"{table}_") for table in virtual)]
+
+
+def _logged_tables(conn):
+    """Tables whose inserts, updates and deletes are all recorded in the change log."""
+    names = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    return {name[:-len("_replica_insert")] for name in names
+            if name.endswith("_replica_insert")
+            and {name.replace("_insert", "_update"), name.replace("_insert", "_delete")} <= names}
+
+
+def _key_columns(conn, table):
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    key = [row[1] for row in sorted(info, key=lambda row: row[5]) if row[5]]
+    return [row[1] for row in info], key or [row[1] for row in info]
+
+
+class Replicator:
+    def __init__(self, db_path, replica_path=None, interval=1.0, clock=time.time):
+        self.db_path = db_path
+        self.replica_path = replica_path or replica_path_for(db_path)
+        self.interval = interval
+        self.clock = clock
+        self.synced_at = None   # the replica matched the live database as of this time
+        self.cycles = 0         # cycles that applied changes
+        self.rows_applied = 0
+        self.last_error = None
+        self._watermarks = {}   # append tables: last copied id; the change log: last applied seq
+        self._data_version = None
+        self._rebuild()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="auction-replica", daemon=True)
+        self._thread.start()
+
+    def connect(self):
+        """A read-only connection to the replica."""
+        return sqlite3.connect(f"file:{self.replica_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def lag(self):
+        """Seconds the replica may be behind the live database (None before the first sync)."""
+        return None if self.synced_at is None else max(0.0, self.clock() - self.synced_at)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _rebuild(self):
+        # Full copy through the backup API, renamed into place so a reader never sees half a file
+        started = self.clock()
+        partial = self.replica_path + ".partial"
+        src = sqlite3.connect(self.db_path)
+        dst = sqlite3.connect(partial)
+        try:
+            src.backup(dst, pages=256)
+            dst.execute("PRAGMA journal_mode=WAL")
+            for table in APPEND_TABLES:
+                self._watermarks[table] = dst.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+            if _logged_tables(dst):
+                self._watermarks[CHANGE_LOG] = dst.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {CHANGE_LOG}").fetchone()[0]
+            # The replica's own writes need no change log
+            for table in _logged_tables(dst):
+                for op in ("insert", "update", "delete"):
+                    dst.execute(f"DROP TRIGGER {table}_replica_{op}")
+            dst.commit()
+        finally:
+            dst.close()
+            src.close()
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(self.replica_path + suffix):
+                os.remove(self.replica_path + suffix)
+        os.replace(partial, self.replica_path)
+        self.synced_at = started
+
+    def _run(self):
+        src = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, isolation_level=None)
+        dst = sqlite3.connect(self.replica_path, isolation_level=None)
+        dst.execute("PRAGMA synchronous=OFF")  # The replica can always be rebuilt from the live database
+        self._data_version = src.execute("PRAGMA data_version").fetchone()[0]
+        try:
+            while not self._stop.wait(self.interval):
+                try:
+                    self.sync(src, dst)
+                    self.last_error = None
+                except sqlite3.Error as exc:
+                    self.last_error = exc
+                    if dst.in_transaction:
+                        dst.execute("ROLLBACK")
+        finally:
+            dst.close()
+            src.close()
+
+    def sync(self, src, dst):
+        """Apply everything committed to ``src`` since the last cycle; returns the rows written."""
+        started = self.clock()
+        version = src.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            self.synced_at = started
+            return 0
+        applied = 0
+        src.execute("BEGIN")  # One consistent snapshot of the live database for the whole cycle
+        try:
+            dst.execute("BEGIN")
+            logged = _logged_tables(src)
+            change_seq, changes = self._changes(src) if logged else (None, {})
+            for table in _tables(src):
+                if table in APPEND_TABLES:
+                    applied += self._sync_append(src, dst, table)
+                elif table in logged:
+                    applied += self._sync_changed(src, dst, table, changes.get(table, []))
+                else:
+                    applied += self._sync_keyed(src, dst, table)
+            dst.execute("COMMIT")
+        finally:
+            src.execute("COMMIT")
+        self._data_version = version
+        if logged:
+            self._watermarks[CHANGE_LOG] = change_seq
+        self.synced_at = started
+        if applied:
+            self.cycles += 1
+            self.rows_applied += applied
+        return applied
+
+    def _sync_append(self, src, dst, table):
+        columns, _ = _key_columns(src, table)
+        rows = src.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id > ? ORDER BY id",
+                           (self._watermarks.get(table, 0),)).fetchall()
+        live = src.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        have = dst.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        if have + len(rows) != live:
+            # Rows were deleted from the live table: copy it again
+            dst.execute(f"DELETE FROM {table}")
+            rows = src.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id").fetchall()
+            self._watermarks[table] = 0
+        if rows:
+            dst.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", rows)
+            self._watermarks[table] = rows[-1][0]
+        return len(rows)
+
+    def _changes(self, src):
+        """(last seq, {table: [primary key tuple]}) logged since the change watermark."""
+        seq = self._watermarks.get(CHANGE_LOG, 0)
+        changes = {}
+        for seq, table, key in src.execute(f"SELECT seq, tbl, key FROM {CHANGE_LOG} WHERE seq > ? ORDER BY seq", (seq,)):
+            changes.setdefault(table, []).append(tuple(json.loads(key)))
+        return seq, changes
+
+    def _sync_changed(self, src, dst, table, keys):
+        columns, key = _key_columns(src, table)
+        where = " AND ".join(f"{column} = ?" for column in key)
+        select = f"SELECT {', '.join(columns)} FROM {table} WHERE {where}"
+        for row_key in keys:
+            row = src.execute(select, row_key).fetchone()
+            if row is None:
+                dst.execute(f"DELETE FROM {table} WHERE {where}", row_key)
+            else:
+                self._upsert(dst, table, columns, where, row, row_key)
+        return len(keys)
+
+    def _upsert(self, dst, table, columns, where, row, row_key):
+        # UPDATE rather than INSERT OR REPLACE, so triggers see an update, not a delete and insert
+        cur = dst.execute(f"UPDATE {table} SET {', '.join(f'{column} = ?' for column in columns)} WHERE {where}",
+                          row + row_key)
+        if cur.rowcount == 0:
+            dst.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})", row)
+
+    def _sync_keyed(self, src, dst, table):
+        columns, key = _key_columns(src, table)
+        select = f"SELECT {', '.join(columns)} FROM {table}"
+        positions = [columns.index(column) for column in key]
+        live = {tuple(row[i] for i in positions): row for row in src.execute(select)}
+        have = {tuple(row[i] for i in positions): row for row in dst.execute(select)}
+        where = " AND ".join(f"{column} = ?" for column in key)
+        changed = [row for row_key, row in live.items() if have.get(row_key) != row]
+        removed = [row_key for row_key in have if row_key not in live]
+        for row in changed:
+            self._upsert(dst, table, columns, where, row, tuple(row[i] for i in positions))
+        dst.executemany(f"DELETE FROM {table} WHERE {where}", removed)
+        return len(changed) + len(removed)
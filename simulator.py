@@ -0,0 +1,246 @@
+"""
+Headless auction simulator for capacity planning.
+
+Runs a full auction of synthetic players and teams against a temporary copy
+of the schema, with bots bidding for every team. Bids, sales and unsold lots
+go through the same AuctionEngine commands and write queue as the app, so the
+numbers reflect the real write path. Several auctions can run in parallel
+processes (each on its own database).
+
+    python simulator.py --lots 400 --teams 10 --strategies valuation,pacing,random --processes 4
+"""
+import abc
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from multiprocessing import Pool
+
+import increments
+import squad_rules
+from auction_core import AuctionEngine, create_schema, format_amount
+from squad_rules import BidRejected, HOME_NATIONALITY
+from write_queue import WriteQueue
+
+CATEGORIES = ["Batsman", "Bowler", "Allrounder", "Wicketkeeper"]
+STARTING_BUDGET = 1000000000  # ₹100 Cr
+BASE_PRICES = [2000000, 5000000, 7500000, 10000000, 20000000]  # ₹20L to ₹2 Cr
+
+
+class Bot(abc.ABC):
+    """A bidding strategy for one team: ``wants`` decides whether to bid ``price`` on a lot."""
+
+    def __init__(self, team_name, rng):
+        self.team_name = team_name
+        self.rng = rng
+
+    @abc.abstractmethod
+    def wants(self, lot, price, squad):
+        """True to bid ``price`` on ``lot`` (a dict of the player's columns), given the team's squad counters."""
+
+
+class RandomBot(Bot):
+    """Bids with a fixed probability while the price stays under a share of its budget."""
+
+    def __init__(self, team_name, rng, probability=0.3, budget_share=0.2):
+        super().__init__(team_name, rng)
+        self.probability = probability
+        self.budget_share = budget_share
+
+    def wants(self, lot, price, squad):
+        return price <= squad.budget * self.budget_share and self.rng.random() < self.probability
+
+
+class ValuationBot(Bot):
+    """
+    Values each player at its cached model price (see valuation.py), or from its
+    rating when there is none, with some noise, and bids up to that value.
+    """
+
+    def __init__(self, team_name, rng, crores_per_point=0.2, noise=0.25):
+        super().__init__(team_name, rng)
+        self.crores_per_point = crores_per_point
+        self.noise = noise
+        self._values = {}
+
+    def value(self, lot):
+        if lot["id"] not in self._values:
+            base = lot.get("expected_price") or max(lot["rating"] - 50, 1) * self.crores_per_point * 10000000
+            self._values[lot["id"]] = base * self.rng.uniform(1 - self.noise, 1 + self.noise)
+        return self._values[lot["id"]]
+
+    def wants(self, lot, price, squad):
+        return price <= self.value(lot)
+
+
+class PacingBot(Bot):
+    """Spreads its budget evenly over the slots it still has to fill, paying more for better players."""
+
+    def __init__(self, team_name, rng, target_squad=20):
+        super().__init__(team_name, rng)
+        self.target_squad = target_squad
+
+    def wants(self, lot, price, squad):
+        slots_left = max(self.target_squad - squad.players, 1)
+        return price <= squad.budget / slots_left * (lot["rating"] / 75)
+
+
+STRATEGIES = {"random": RandomBot, "valuation": ValuationBot, "pacing": PacingBot}
+
+
+def _populate(cur, rng, num_lots, num_teams, max_players, max_foreign):
+    teams = [f"Team {index + 1}" for index in range(num_teams)]
+    cur.executemany("""INSERT INTO teams (name, budget_remaining, logo_url, initial_budget, password, max_players, max_foreign_players)
+                       VALUES (?, ?, '', ?, '', ?, ?)""",
+                    [(name, STARTING_BUDGET, STARTING_BUDGET, max_players, max_foreign) for name in teams])
+    cur.executemany("""INSERT INTO items (name, rating, category, nationality, image_url, base_price)
+                       VALUES (?, ?, ?, ?, '', ?)""",
+                    [(f"Player {index + 1}", rng.randint(55, 95), rng.choice(CATEGORIES),
+                      HOME_NATIONALITY if rng.random() < 0.7 else "Overseas", rng.choice(BASE_PRICES))
+                     for index in range(num_lots)])
+    return teams
+
+
+def simulate(num_lots=400, num_teams=10, strategies=("valuation",), seed=0,
+             max_players=25, max_foreign=8, min_squad_size=0, reserve_price=0):
+    """Run one auction to completion and return its report (a dict)."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "simulation.db")
+        conn = sqlite3.connect(db_path)
+        cur = conn.cursor()
+        create_schema(cur)
+        teams = _populate(cur, rng, num_lots, num_teams, max_players, max_foreign)
+        conn.commit()
+        cur.execute("SELECT id, name, rating, category, nationality, base_price, expected_price FROM items ORDER BY id")
+        lots = [dict(zip(("id", "name", "rating", "category", "nationality", "base_price", "expected_price"), row))
+                for row in cur.fetchall()]
+
+        squad_book = squad_rules.SquadBook(min_squad_size=min_squad_size, reserve_price=reserve_price)
+        squad_book.load(cur)
+        ladder = increments.IncrementLadder()
+        engine = AuctionEngine(squad_book, ladder)
+        writer = WriteQueue(db_path)
+        bots = [STRATEGIES[strategies[index % len(strategies)]](team, random.Random(rng.random()))
+                for index, team in enumerate(teams)]
+
+        bids = rejected = sold = 0
+        start = time.perf_counter()
+        for lot in lots:
+            price = writer.submit(engine.set_active_item, lot["id"]).result()
+            leader = None
+            while True:
+                next_price = ladder.next_price(price) if leader else price
+                bidders = []
+                for bot in bots:
+                    if bot.team_name == leader:
+                        continue
+                    limit = squad_book.limit_or_none(bot.team_name, lot["category"], lot["nationality"], lot["id"])
+                    if limit is not None and next_price <= limit and bot.wants(lot, next_price, squad_book.squad(bot.team_name)):
+                        bidders.append(bot)
+                if not bidders:
+                    break
+                # Everyone interested clicks at the price they saw; only the first bid counts
+                rng.shuffle(bidders)
+                futures = [writer.submit(engine.place_bid, lot["id"], bot.team_name, price) for bot in bidders]
+                for future in futures:
+                    try:
+                        recorded = future.result()
+                    except BidRejected:
+                        rejected += 1
+                    else:
+                        bids += len(recorded)
+                        leader, price = recorded[-1]
+            if leader:
+                writer.submit(engine.stop_all_bidding).result()
+                sold += 1
+            else:
+                writer.submit(engine.mark_as_unsold, lot["id"]).result()
+        wall_time = time.perf_counter() - start
+        commits = writer.commits
+        writer.close()
+
+        cur.execute("""SELECT t.name, t.budget_remaining, COUNT(i.id),
+                              (SELECT COALESCE(SUM(s.sold_amount), 0) FROM sold_items s WHERE s.team_bought = t.name)
+                       FROM teams t LEFT JOIN items i ON i.winner_team = t.name
+                       GROUP BY t.name ORDER BY t.rowid""")
+        strategy_of = {bot.team_name: type(bot).__name__ for bot in bots}
+        squads = {name: {"players": players, "budget_remaining": budget, "spent": spent, "strategy": strategy_of[name]}
+                  for name, budget, players, spent in cur.fetchall()}
+        conn.close()
+
+    return {
+        "seed": seed,
+        "lots": num_lots,
+        "sold": sold,
+        "unsold": num_lots - sold,
+        "bids": bids,
+        "rejected": rejected,
+        "commits": commits,
+        "wall_time": wall_time,
+        "squads": squads,
+    }
+
+
+def _simulate_kwargs(kwargs):
+    return simulate(**kwargs)
+
+
+def print_report(reports):
+    wall_time = max(report["wall_time"] for report in reports)
+    bids = sum(report["bids"] for report in reports)
+    lots = sum(report["lots"] for report in reports)
+    print(f"auctions:   {len(reports)}")
+    print(f"wall time:  {wall_time:.2f}s")
+    print(f"throughput: {bids / wall_time:,.0f} bids/s, {lots / wall_time:,.1f} lots/s")
+    for report in reports:
+        print(f"\nseed {report['seed']}: {report['sold']} sold, {report['unsold']} unsold, "
+              f"{report['bids']} bids ({report['rejected']} rejected as stale), "
+              f"{report['commits']} commits in {report['wall_time']:.2f}s")
+        squads = report["squads"]
+        players = [squad["players"] for squad in squads.values()]
+        budgets = [squad["budget_remaining"] for squad in squads.values()]
+        print(f"  squad size: min {min(players)}, median {statistics.median(players):g}, max {max(players)}")
+        print(f"  budget left: min {format_amount(min(budgets))}, median {format_amount(statistics.median(budgets))}, "
+              f"max {format_amount(max(budgets))}")
+        for name, squad in squads.items():
+            print(f"    {name:<10} {squad['strategy']:<13} {squad['players']:>3} players  "
+                  f"{format_amount(squad['budget_remaining'])} left")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lots", type=int, default=400)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--strategies", default="valuation,pacing,random",
+                        help=f"comma-separated, assigned to teams in turn ({', '.join(STRATEGIES)})")
+    parser.add_argument("--max-players", type=int, default=25)
+    parser.add_argument("--max-foreign", type=int, default=8)
+    parser.add_argument("--min-squad-size", type=int, default=0)
+    parser.add_argument("--reserve-price", type=int, default=0, help="budget held back per unfilled slot")
+    parser.add_argument("--runs", type=int, default=1, help="independent auctions (different seeds)")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    strategies = tuple(name.strip() for name in args.strategies.split(","))
+    unknown = [name for name in strategies if name not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies: {', '.join(unknown)}")
+    runs = [dict(num_lots=args.lots, num_teams=args.teams, strategies=strategies, seed=args.seed + run,
+                 max_players=args.max_players, max_foreign=args.max_foreign,
+                 min_squad_size=args.min_squad_size, reserve_price=args.reserve_price)
+            for run in range(args.runs)]
+    if args.processes > 1:
+        with Pool(args.processes) as pool:
+            reports = pool.map(_simulate_kwargs, runs)
+    else:
+        reports = [simulate(**kwargs) for kwargs in runs]
+    print_report(reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Bid-time squad rules.
+
+Keeps per-team squad counters in memory (players, overseas players, players
+per category, remaining budget) so a bid can be checked against squad caps,
+overseas limits, category minimums and the budget that must be held back for
+the slots still to fill, without recounting the team's players. Lots a team
+currently leads in a parallel round count as bought at their current price,
+so leading bids can't together overspend the budget or overfill the squad.
+Each team's
+maximum affordable bid is recomputed whenever its counters change, so the UI
+can read it on every refresh for free.
+"""
+import threading
+
+HOME_NATIONALITY = "India"
+
+
+class BidRejected(Exception):
+    """A bid that breaks an auction or squad rule; the message is shown to the team."""
+
+
+class TeamSquad:
+    __slots__ = ("budget", "max_players", "max_foreign", "players", "foreign", "categories", "leads", "max_bid")
+
+    def __init__(self, budget=0, max_players=0, max_foreign=0):
+        self.budget = budget
+        self.max_players = max_players  # 0 means no cap
+        self.max_foreign = max_foreign  # 0 means no cap
+        self.players = 0
+        self.foreign = 0
+        self.categories = {}
+        self.leads = {}  # open lot id -> (amount, category, is home player) for lots the team leads
+        self.max_bid = 0  # see SquadBook._update_max_bid
+
+
+class SquadBook:
+    def __init__(self, min_squad_size=0, category_minimums=None, reserve_price=0):
+        self.min_squad_size = min_squad_size
+        self.category_minimums = category_minimums or {}
+        self.reserve_price = reserve_price  # money held back per slot still to fill
+        self._teams = {}
+        self._leaders = {}  # open lot id -> leading team
+        self._lock = threading.Lock()
+
+    def configure(self, min_squad_size=None, category_minimums=None, reserve_price=None):
+        with self._lock:
+            if min_squad_size is not None:
+                self.min_squad_size = min_squad_size
+            if category_minimums is not None:
+                self.category_minimums = category_minimums
+            if reserve_price is not None:
+                self.reserve_price = reserve_price
+            for squad in self._teams.values():
+                self._update_max_bid(squad)
+
+    def load(self, cur):
+        """Build the counters for every team (three queries)."""
+        teams = self._read_teams(cur)
+        leads = self._read_leads(cur)
+        with self._lock:
+            self._teams = teams
+            self._leaders = {}
+            for item_id, (team_name, *lead) in leads.items():
+                self._set_lead(item_id, team_name, *lead)
+
+    def refresh_team(self, cur, team_name):
+        """Re-read one team after a sale, refund, budget edit or squad change."""
+        teams = self._read_teams(cur, team_name)
+        with self._lock:
+            if team_name in teams:
+                squad = teams[team_name]
+                old = self._teams.get(team_name)
+                if old is not None:
+                    squad.leads = old.leads
+                    self._update_max_bid(squad)
+                self._teams[team_name] = squad
+            else:
+                self._teams.pop(team_name, None)
+
+    def set_lead(self, item_id, team_name, amount, category, nationality):
+        """``team_name`` now leads open lot ``item_id`` at ``amount``."""
+        with self._lock:
+            self._set_lead(item_id, team_name, amount, category, nationality)
+
+    def clear_lead(self, item_id):
+        """Lot ``item_id`` closed: a sale is counted by ``refresh_team`` instead."""
+        with self._lock:
+            self._clear_lead(item_id)
+
+    def load_leads(self, cur):
+        """Re-read the leaders of every open lot (after lots are opened or closed in bulk)."""
+        leads = self._read_leads(cur)
+        with self._lock:
+            for item_id in list(self._leaders):
+                self._clear_lead(item_id)
+            for item_id, (team_name, *lead) in leads.items():
+                self._set_lead(item_id, team_name, *lead)
+
+    def _set_lead(self, item_id, team_name, amount, category, nationality):
+        self._clear_lead(item_id)
+        squad = self._teams.get(team_name)
+        if squad is None:
+            return
+        squad.leads[item_id] = (amount, category, nationality == HOME_NATIONALITY)
+        self._leaders[item_id] = team_name
+        self._update_max_bid(squad)
+
+    def _clear_lead(self, item_id):
+        squad = self._teams.get(self._leaders.pop(item_id, None))
+        if squad is not None and squad.leads.pop(item_id, None) is not None:
+            self._update_max_bid(squad)
+
+    def _read_leads(self, cur):
+        cur.execute("""SELECT i.id, (SELECT b.team_name FROM bids b WHERE b.item_id = i.id
+                                     ORDER BY b.amount DESC LIMIT 1),
+                              i.base_price, i.category, i.nationality
+                       FROM items i WHERE i.is_active = 1""")
+        return {item_id: (team_name, amount, category, nationality)
+                for item_id, team_name, amount, category, nationality in cur.fetchall()
+                if team_name is not None}
+
+    def _read_teams(self, cur, team_name=None):
+        where, params = ("WHERE name = ?", (team_name,)) if team_name else ("", ())
+        cur.execute(f"SELECT name, budget_remaining, max_players, max_foreign_players FROM teams {where}", params)
+        teams = {name: TeamSquad(budget or 0, max_players or 0, max_foreign or 0)
+                 for name, budget, max_players, max_foreign in cur.fetchall()}
+
+        where, params = ("AND winner_team = ?", (team_name,)) if team_name else ("", ())
+        cur.execute(f"""SELECT winner_team, category, nationality = ?, COUNT(*) FROM items
+                        WHERE winner_team IS NOT NULL AND winner_team != 'UNSOLD' {where}
+                        GROUP BY winner_team, category, nationality = ?""",
+                    (HOME_NATIONALITY, *params, HOME_NATIONALITY))
+        for name, category, is_home, count in cur.fetchall():
+            squad = teams.get(name)
+            if squad is None:
+                continue
+            squad.players += count
+            squad.categories[category] = squad.categories.get(category, 0) + count
+            if not is_home:
+                squad.foreign += count
+        for squad in teams.values():
+            self._update_max_bid(squad)
+        return teams
+
+    def _committed(self, squad, exclude=None):
+        """(budget, players, overseas players, players per category) counting the team's leads."""
+        budget, players, foreign = squad.budget, squad.players, squad.foreign
+        categories = squad.categories
+        for item_id, (amount, category, is_home) in squad.leads.items():
+            if item_id == exclude:
+                continue
+            if categories is squad.categories:
+                categories = dict(categories)
+            budget -= amount
+            players += 1
+            foreign += not is_home
+            categories[category] = categories.get(category, 0) + 1
+        return budget, players, foreign, categories
+
+    def _required_slots(self, players, categories, category):
+        """(unmet category minimums, slots that must be paid for) after buying one more player."""
+        players_after = players + 1
+        unmet = sum(max(0, minimum - categories.get(name, 0) - (name == category))
+                    for name, minimum in self.category_minimums.items())
+        return unmet, max(self.min_squad_size - players_after, unmet, 0)
+
+    def _update_max_bid(self, squad):
+        # Best case over the next player: one that counts towards an unmet minimum if any
+        budget, players, _, categories = self._committed(squad)
+        if squad.max_players and players >= squad.max_players:
+            squad.max_bid = 0
+            return
+        unmet_category = next((name for name, minimum in self.category_minimums.items()
+                               if categories.get(name, 0) < minimum), None)
+        _, required = self._required_slots(players, categories, unmet_category)
+        squad.max_bid = max(0, budget - required * self.reserve_price)
+
+    def squad(self, team_name):
+        with self._lock:
+            return self._teams.get(team_name)
+
+    def bid_limit(self, team_name, category, nationality, item_id=None):
+        """
+        Highest amount the team may bid for a player of this category and
+        nationality, holding back what it leads on other open lots (``item_id``
+        is the lot being bid on). Raises BidRejected if the team can't buy the
+        player at all.
+        """
+        with self._lock:
+            squad = self._teams.get(team_name)
+            if squad is None:
+                raise BidRejected(f"{team_name} is not registered.")
+            budget, players, foreign, categories = self._committed(squad, exclude=item_id)
+            if squad.max_players and players >= squad.max_players:
+                raise BidRejected(f"{team_name}'s squad is full ({squad.max_players} players).")
+            if (nationality != HOME_NATIONALITY and squad.max_foreign
+                    and foreign >= squad.max_foreign):
+                raise BidRejected(f"{team_name} has reached the overseas limit ({squad.max_foreign} players).")
+
+            # Slots that must still be filled after buying this player
+            unmet, required = self._required_slots(players, categories, category)
+            if squad.max_players and unmet > squad.max_players - players - 1:
+                raise BidRejected(f"{team_name} needs its remaining slots for category minimums.")
+            return budget - required * self.reserve_price
+
+    def max_bid(self, team_name):
+        """Precomputed maximum the team can bid on its next player (0 if it can't buy)."""
+        with self._lock:
+            squad = self._teams.get(team_name)
+            return squad.max_bid if squad else 0
+
+    def limit_or_none(self, team_name, category, nationality, item_id=None):
+        """Like ``bid_limit`` but returns None instead of raising (used for proxies)."""
+        try:
+            return self.bid_limit(team_name, category, nationality, item_id)
+        except BidRejected:
+            return None
+
+    def check_bid(self, team_name, category, nationality, amount, item_id=None):
+        if amount > self.bid_limit(team_name, category, nationality, item_id):
+            raise BidRejected(f"{team_name} must keep enough budget to fill its remaining squad slots"
+                              " and cover the lots it leads.")
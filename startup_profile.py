@@ -0,0 +1,129 @@
+"""
+Startup profile for the app: what a new server process pays before the first
+page is painted.
+
+Import costs are measured in fresh interpreters (so nothing is already in
+sys.modules), and the schema bootstrap is measured on a copy of the
+database, comparing the old per-run CREATE/ALTER pass with the
+``PRAGMA user_version`` check. The first paint is the first run of atime.py
+in a fresh interpreter through Streamlit's headless AppTest runner, on a copy
+of the database (Streamlit's own import is not included).
+
+    python startup_profile.py biddi09i_game.db
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from auction_core.schema import create_schema, ensure_schema
+
+# Modules atime.py imports before it draws anything, and those it loads on first use.
+# plotly is not deferrable: importing streamlit already imports it.
+EAGER_MODULES = ["streamlit", "streamlit_autorefresh", "requests", "PIL", "auction_core"]
+LAZY_MODULES = ["pandas"]
+
+FIRST_PAINT = """
+import os, shutil, sys, tempfile, time
+from streamlit.testing.v1 import AppTest
+app, db_path = sys.argv[1], sys.argv[2]
+os.chdir(tempfile.mkdtemp())
+shutil.copy(db_path, "biddi09i_game.db")
+test = AppTest.from_file(app, default_timeout=120)
+start = time.perf_counter()
+test.run()
+print(time.perf_counter() - start, len(test.exception), "pandas" in sys.modules)
+os._exit(0)  # Skip joining the auction's background threads
+"""
+
+
+def import_time(module, runs=3):
+    """Median seconds to import ``module`` in a fresh interpreter (None if it isn't installed)."""
+    timings = []
+    for _ in range(runs):
+        code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode != 0:
+            return None
+        timings.append(float(result.stdout))
+    return statistics.median(timings)
+
+
+def first_paint_time(db_path, runs=5):
+    """
+    (median seconds for the app's first run in a fresh interpreter, whether that
+    run imported pandas), or None if Streamlit isn't installed.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    timings, pandas_loaded = [], False
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", FIRST_PAINT, os.path.join(root, "atime.py"), os.path.abspath(db_path)],
+                                capture_output=True, text=True, env={**os.environ, "PYTHONPATH": root})
+        if result.returncode != 0:
+            return None
+        seconds, errors, pandas_loaded = result.stdout.split()[-3:]
+        if int(errors):
+            raise RuntimeError("atime.py raised an exception on its first run")
+        timings.append(float(seconds))
+    return statistics.median(timings), pandas_loaded == "True"
+
+
+def bootstrap_time(db_path, runs=20):
+    """Median seconds per run for the old schema pass and for ensure_schema on an up-to-date database."""
+    with tempfile.TemporaryDirectory() as tmp:
+        copy = os.path.join(tmp, "profile.db")
+        shutil.copy(db_path, copy)
+        conn = sqlite3.connect(copy)
+        legacy, versioned = [], []
+        for _ in range(runs):
+            start = time.perf_counter()
+            create_schema(conn.cursor())
+            conn.commit()
+            legacy.append(time.perf_counter() - start)
+        ensure_schema(conn)
+        for _ in range(runs):
+            start = time.perf_counter()
+            ensure_schema(conn)
+            versioned.append(time.perf_counter() - start)
+        conn.close()
+    return statistics.median(legacy), statistics.median(versioned)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the app's cold start.")
+    parser.add_argument("db_path", nargs="?", default="biddi09i_game.db")
+    args = parser.parse_args()
+
+    totals = {}
+    for group, modules in (("at startup", EAGER_MODULES), ("on first use", LAZY_MODULES)):
+        print(f"imports {group}:")
+        totals[group] = 0
+        for module in modules:
+            seconds = import_time(module)
+            if seconds is None:
+                print(f"  {module:<24} not installed")
+                continue
+            totals[group] += seconds
+            print(f"  {module:<24} {seconds * 1000:8.1f} ms")
+
+    legacy, versioned = bootstrap_time(args.db_path)
+    print(f"schema pass every run      {legacy * 1000:8.2f} ms")
+    print(f"user_version check         {versioned * 1000:8.2f} ms")
+    print(f"deferred from first paint  {totals['on first use'] * 1000:8.1f} ms of imports")
+
+    paint = first_paint_time(args.db_path)
+    if paint is None:
+        print("first paint                streamlit not installed")
+    else:
+        seconds, pandas_loaded = paint
+        print(f"first paint (first run)    {seconds * 1000:8.1f} ms{' (pandas loaded)' if pandas_loaded else ''}")
+
+
+if __name__ == "__main__":
+    main()
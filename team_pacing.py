@@ -0,0 +1,169 @@
+"""
+Per-team spend pacing and projected squad completion.
+
+Team counters (budget, players per category) come from the SquadBook, which
+is already kept current on every sale. This module keeps the other half in
+memory: the pool of players still to be auctioned, with a predicted price
+each (the valuation model's expected price, else the base price), sorted per
+category. ``refresh`` only reads players and lot events added since the last
+call, so keeping the dashboards current costs a few indexed queries per
+rerun, not a scan of the auction. Players put back up by the accelerated
+round ('requeued' events) rejoin the pool; lots done counts distinct players
+that are closed, so a player auctioned twice counts once.
+
+For a team, ``dashboard`` reports:
+
+- pace: the share of its budget spent against the share of lots auctioned
+  (above 1 means it is spending faster than the auction is progressing);
+- open slots per category (unmet category minimums, then the rest of the
+  minimum squad) and the projected cost of filling them at the median
+  predicted price of the players left in that category;
+- an overspend risk score: the projected cost as a share of the budget left,
+  capped at 100.
+"""
+import bisect
+import statistics
+import threading
+
+ANY_CATEGORY = "Any"
+
+
+class TeamPacing:
+    def __init__(self, squad_book):
+        self.squad_book = squad_book
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next refresh reloads from the start (e.g. after a deletion)."""
+        with self._lock:
+            self._initial_budgets = {}  # team_name -> initial budget
+            self._pool = {}             # item_id -> (category, predicted price) of players still to auction
+            self._prices = {}           # category -> sorted predicted prices in the pool
+            self._closed = set()        # item ids auctioned (sold or unsold) and not back up for auction
+            self._last_item_id = 0
+            self._last_event_id = None  # None until the first refresh has counted past lots
+
+    def refresh(self, cur):
+        """Apply players added and lots opened/closed since the last refresh."""
+        with self._lock:
+            cur.execute("SELECT name, initial_budget FROM teams")
+            self._initial_budgets = {name: budget or 0 for name, budget in cur.fetchall()}
+
+            first = self._last_event_id is None
+            cur.execute("""SELECT id, category, COALESCE(expected_price, base_price, 0) FROM items
+                           WHERE id > ? AND winner_team IS NULL AND is_active = 0 ORDER BY id""", (self._last_item_id,))
+            for item_id, category, price in cur.fetchall():
+                self._add(item_id, category, price)
+            cur.execute("SELECT COALESCE(MAX(id), 0) FROM items")
+            self._last_item_id = max(self._last_item_id, cur.fetchone()[0])
+
+            if first:
+                # Lots already auctioned
+                cur.execute("SELECT id FROM items WHERE winner_team IS NOT NULL")
+                self._closed = {row[0] for row in cur.fetchall()}
+                cur.execute("SELECT COALESCE(MAX(id), 0) FROM lot_events")
+                self._last_event_id = cur.fetchone()[0]
+                return
+
+            cur.execute("SELECT id, item_id, event FROM lot_events WHERE id > ? ORDER BY id", (self._last_event_id,))
+            for event_id, item_id, event in cur.fetchall():
+                self._last_event_id = event_id
+                if event == 'requeued':
+                    # Back up for auction in the accelerated round
+                    self._closed.discard(item_id)
+                    cur.execute("SELECT category, COALESCE(expected_price, base_price, 0) FROM items WHERE id = ?", (item_id,))
+                    row = cur.fetchone()
+                    if row and item_id not in self._pool:
+                        self._add(item_id, *row)
+                    continue
+                # An opened player leaves the pool; a closed one counts as auctioned
+                self._remove(item_id)
+                if event in ('sold', 'unsold'):
+                    self._closed.add(item_id)
+                elif event == 'open':
+                    self._closed.discard(item_id)
+
+    def _add(self, item_id, category, price):
+        self._pool[item_id] = (category, price)
+        for key in (category, ANY_CATEGORY):
+            bisect.insort(self._prices.setdefault(key, []), price)
+
+    def _remove(self, item_id):
+        entry = self._pool.pop(item_id, None)
+        if entry is None:
+            return
+        category, price = entry
+        for key in (category, ANY_CATEGORY):
+            prices = self._prices[key]
+            del prices[bisect.bisect_left(prices, price)]
+
+    def remaining_lots(self):
+        with self._lock:
+            return len(self._pool)
+
+    def _median_price(self, category):
+        prices = self._prices.get(category)
+        return statistics.median(prices) if prices else 0
+
+    def _open_slots(self, squad):
+        """{category: slots still to fill}: unmet category minimums first, then the rest of the minimum squad."""
+        book = self.squad_book
+        slots = {name: max(0, minimum - squad.categories.get(name, 0))
+                 for name, minimum in book.category_minimums.items()}
+        slots = {name: count for name, count in slots.items() if count}
+        target = book.min_squad_size or squad.max_players
+        if squad.max_players:
+            target = min(target, squad.max_players)
+        rest = max(0, target - squad.players - sum(slots.values()))
+        if rest:
+            slots[ANY_CATEGORY] = rest
+        return slots
+
+    def dashboard(self, team_name):
+        """Pacing, projected completion cost and overspend risk for one team (None if it isn't registered)."""
+        squad = self.squad_book.squad(team_name)
+        if squad is None:
+            return None
+        with self._lock:
+            initial = self._initial_budgets.get(team_name, 0)
+            spent = max(0, initial - squad.budget)
+            remaining_lots = len(self._pool)
+            lots_done = len(self._closed)
+            categories = []
+            for category, count in self._open_slots(squad).items():
+                price = self._median_price(category)
+                categories.append({
+                    "category": category,
+                    "have": squad.players if category == ANY_CATEGORY else squad.categories.get(category, 0),
+                    "open": count,
+                    "available": len(self._prices.get(category, ())),
+                    "median_price": price,
+                    "projected_cost": price * count,
+                })
+
+        progress = lots_done / (lots_done + remaining_lots) if lots_done + remaining_lots else 0
+        spent_share = spent / initial if initial else 0
+        projected_cost = sum(row["projected_cost"] for row in categories)
+        if projected_cost == 0:
+            risk = 0
+        elif squad.budget <= 0:
+            risk = 100
+        else:
+            risk = min(100, round(100 * projected_cost / squad.budget))
+        return {
+            "spent": spent,
+            "budget": squad.budget,
+            "initial_budget": initial,
+            "players": squad.players,
+            "lots_done": lots_done,
+            "remaining_lots": remaining_lots,
+            "spend_per_lot": spent / lots_done if lots_done else 0,
+            "budget_per_remaining_lot": squad.budget / remaining_lots if remaining_lots else squad.budget,
+            "pace": spent_share / progress if progress else 0,
+            "open_slots": sum(row["open"] for row in categories),
+            "categories": categories,
+            "projected_cost": projected_cost,
+            "shortfall": max(0, projected_cost - squad.budget),
+            "risk": risk,
+        }
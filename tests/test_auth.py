@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+import auth
+from auction_core.schema import create_schema
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def authenticator(clock):
+    authenticator = auth.Authenticator(session_ttl=60, login_attempts=3, login_window=300)
+    authenticator.sessions.clock = clock
+    authenticator.login_limiter.clock = clock
+    return authenticator
+
+
+@pytest.fixture
+def cur():
+    cur = sqlite3.connect(":memory:").cursor()
+    create_schema(cur)
+    cur.execute("INSERT INTO teams (name, password, budget_remaining) VALUES ('A', ?, 0)", (auth.hash_password("secret"),))
+    return cur
+
+
+def test_idle_session_expires(authenticator, clock):
+    token = authenticator.sessions.issue("team", "A")
+    clock.advance(59)
+    assert authenticator.team(token) == "A"
+    clock.advance(61)
+    assert authenticator.team(token) is None
+
+
+def test_each_request_renews_the_session(authenticator, clock):
+    token = authenticator.sessions.issue("team", "A")
+    for _ in range(10):
+        clock.advance(50)
+        assert authenticator.team(token) == "A"
+
+
+def test_token_is_checked_for_its_role(authenticator):
+    token = authenticator.sessions.issue("team", "A")
+    assert not authenticator.is_admin(token)
+    assert authenticator.team(token) is None  # A token used for the wrong role is revoked
+
+
+def test_tampered_token_is_rejected(authenticator):
+    token = authenticator.sessions.issue("team", "A")
+    assert authenticator.team(token[:-1] + ("0" if token[-1] != "0" else "1")) is None
+
+
+def test_repeated_failures_lock_out_that_client_only(authenticator, cur, clock):
+    for _ in range(3):
+        assert authenticator.login_team(cur, "A", "wrong", client="10.0.0.1") == (None, None)
+    with pytest.raises(auth.TooManyAttempts):
+        authenticator.login_team(cur, "A", "secret", client="10.0.0.1")
+
+    token, upgraded = authenticator.login_team(cur, "A", "secret", client="10.0.0.2")
+    assert authenticator.team(token) == "A" and upgraded is None
+
+    clock.advance(300)
+    assert authenticator.login_team(cur, "A", "secret", client="10.0.0.1")[0] is not None
+
+
+def test_admin_lockout(authenticator, cur):
+    for _ in range(3):
+        assert authenticator.login_admin(cur, "wrong", client="x") is None
+    with pytest.raises(auth.TooManyAttempts):
+        authenticator.login_admin(cur, auth.DEFAULT_ADMIN_PASSWORD, client="x")
+    assert authenticator.is_admin(authenticator.login_admin(cur, auth.DEFAULT_ADMIN_PASSWORD, client="y"))
@@ -0,0 +1,68 @@
+import os
+import sqlite3
+import threading
+
+import pytest
+
+import backup
+from auction_core.schema import create_schema
+from write_queue import WriteQueue, _insert_bid
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    db_path = str(tmp_path / "auction.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    create_schema(conn.cursor())
+    conn.executemany("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)",
+                     [(1, "A", amount, "x" * 100) for amount in range(20000)])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def _bids(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        return conn.execute("SELECT COUNT(*) FROM bids").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_backup_taken_during_writes_is_a_readable_copy(db_path, tmp_path):
+    writer = WriteQueue(db_path)
+    stop = threading.Event()
+
+    def keep_bidding():
+        while not stop.wait(0.01):
+            writer.submit(_insert_bid, 2, "B", 1).result()
+
+    thread = threading.Thread(target=keep_bidding)
+    thread.start()
+    try:
+        path = backup.backup(db_path, str(tmp_path / "copy.db"), pages=16, sleep=0)
+    finally:
+        stop.set()
+        thread.join()
+        writer.close()
+    assert _bids(path) >= 20000
+    assert not os.path.exists(path + ".partial")
+
+
+def test_failed_backup_leaves_no_partial_file(tmp_path):
+    not_a_database = tmp_path / "broken.db"
+    not_a_database.write_bytes(b"not a database" * 1000)
+    dest = tmp_path / "copy.db"
+    with pytest.raises(sqlite3.DatabaseError):
+        backup.backup(str(not_a_database), str(dest))
+    assert sorted(os.listdir(tmp_path)) == ["broken.db"]
+
+
+def test_snapshots_go_next_to_the_database(db_path, tmp_path, monkeypatch):
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(__file__)))
+    path = backup.snapshot(db_path, "manual")
+    assert os.path.dirname(path) == str(tmp_path / "backups")
+    assert backup.snapshots(str(tmp_path / "backups")) == [path]
+    assert _bids(path) == 20000
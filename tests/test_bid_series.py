@@ -0,0 +1,47 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from auction_core.schema import create_schema
+from bid_series import BidSeries, note_deletion
+
+
+@pytest.fixture
+def cur():
+    cur = sqlite3.connect(":memory:").cursor()
+    create_schema(cur)
+    return cur
+
+
+def _bid(cur, item_id, team_name, amount):
+    cur.execute("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)",
+                (item_id, team_name, amount, datetime.now().isoformat()))
+
+
+def test_refresh_only_appends_new_rows(cur):
+    series = BidSeries()
+    _bid(cur, 1, "A", 100)
+    assert series.refresh(cur) == 1
+    version = series.version
+    assert series.refresh(cur) == 0
+    assert series.version == version
+    _bid(cur, 1, "B", 110)
+    assert series.refresh(cur) == 1
+    assert series.lot(1)[1:] == ([100, 110], ["A", "B"])
+
+
+def test_a_noted_deletion_rebuilds_the_series(cur):
+    series = BidSeries()
+    _bid(cur, 1, "A", 100)
+    _bid(cur, 2, "B", 200)
+    series.refresh(cur)
+    cur.execute("DELETE FROM bids WHERE item_id = 1")
+    note_deletion(cur)
+    version = series.version
+    series.refresh(cur)
+    assert series.version > version
+    assert series.lot_ids() == [2]
+    note_deletion(cur)
+    series.refresh(cur)
+    assert series.lot(2)[1] == [200]
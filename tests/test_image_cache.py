@@ -0,0 +1,104 @@
+import io
+import os
+
+import pytest
+import requests
+from PIL import Image
+
+import image_cache
+
+
+def png_bytes(size=(400, 300), color=(200, 30, 30, 255)):
+    out = io.BytesIO()
+    Image.new("RGBA", size, color).save(out, format="PNG")
+    return out.getvalue()
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def served(monkeypatch):
+    """(images, fetched): requests.get serves ``images[url]`` and records every URL it is asked for."""
+    images, fetched = {}, []
+
+    def get(url, timeout):
+        fetched.append(url)
+        return FakeResponse(images[url])
+
+    monkeypatch.setattr(requests, "get", get)
+    return images, fetched
+
+
+def test_image_key_is_a_content_address():
+    red, blue = png_bytes(), png_bytes(color=(0, 0, 255, 255))
+    assert image_cache.image_key(red) == image_cache.image_key(png_bytes())
+    assert image_cache.image_key(red) != image_cache.image_key(blue)
+    assert len(image_cache.image_key(red)) == 32
+    int(image_cache.image_key(red), 16)
+
+
+@pytest.mark.parametrize("variant", sorted(image_cache.VARIANTS))
+def test_thumbnails_have_the_variant_size(variant):
+    width, height, _ = image_cache.VARIANTS[variant]
+    thumbnail = Image.open(io.BytesIO(image_cache.make_thumbnail(png_bytes((400, 300)), variant)))
+    assert thumbnail.format == "PNG"
+    assert thumbnail.size == (width, height)
+
+
+def test_contain_pads_instead_of_cropping():
+    # A wide logo keeps its aspect ratio: transparent bands above and below it
+    thumbnail = Image.open(io.BytesIO(image_cache.make_thumbnail(png_bytes((400, 100)), "logo")))
+    assert thumbnail.getpixel((35, 0))[3] == 0
+    assert thumbnail.getpixel((35, 35))[3] == 255
+
+
+def test_circle_has_transparent_corners():
+    thumbnail = Image.open(io.BytesIO(image_cache.make_thumbnail(png_bytes(), "avatar")))
+    assert thumbnail.getpixel((0, 0))[3] == 0
+    assert thumbnail.getpixel((40, 40))[3] == 255
+
+
+def test_cache_image_writes_every_variant_under_the_content_key(tmp_path, served):
+    images, fetched = served
+    images["https://example.com/a.png"] = images["https://example.com/copy.png"] = png_bytes()
+
+    key = image_cache.cache_image("https://example.com/a.png", str(tmp_path))
+
+    assert key == image_cache.image_key(png_bytes())
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{key}_{variant}.png" for variant in image_cache.VARIANTS)
+    # The same picture under another URL maps to the same files
+    assert image_cache.cache_image("https://example.com/copy.png", str(tmp_path)) == key
+    assert len(os.listdir(tmp_path)) == len(image_cache.VARIANTS)
+    assert fetched == ["https://example.com/a.png", "https://example.com/copy.png"]
+
+
+def test_cache_image_returns_none_for_undecodable_data(tmp_path, served):
+    images, _ = served
+    images["https://example.com/broken.png"] = b"not an image"
+    assert image_cache.cache_image("https://example.com/broken.png", str(tmp_path)) is None
+
+
+@pytest.mark.parametrize("source", ["/etc/passwd", "file:///etc/passwd", "ftp://example.com/a.png", "biddi09i_game.db"])
+def test_only_http_urls_are_fetched(tmp_path, served, source):
+    _, fetched = served
+    with pytest.raises(ValueError):
+        image_cache.fetch_image(source)
+    assert image_cache.cache_image(source, str(tmp_path)) is None
+    assert fetched == []
+    assert os.listdir(tmp_path) == []
+
+
+def test_thumbnail_url_falls_back_to_the_original_url():
+    assert image_cache.thumbnail_url(None, "card", "https://example.com/a.png") == "https://example.com/a.png"
+    assert image_cache.thumbnail_url("", "card") == ""
+
+
+def test_thumbnail_url_points_at_the_cached_file():
+    key = "0" * 32
+    assert image_cache.thumbnail_url(key, "card", "https://example.com/a.png") == f"app/static/img/{key}_card.png?v={key}"
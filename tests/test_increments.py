@@ -0,0 +1,44 @@
+import pytest
+
+from increments import IncrementLadder, format_steps, parse_steps
+
+LAKH = 100000
+
+
+@pytest.fixture
+def ladder():
+    return IncrementLadder()
+
+
+def test_increment_follows_the_breakpoints(ladder):
+    assert ladder.next_price(20 * LAKH) == 25 * LAKH
+    assert ladder.next_price(100 * LAKH) == 110 * LAKH
+    assert ladder.next_price(600 * LAKH) == 625 * LAKH
+
+
+def test_max_price_within_stays_on_the_ladder_from_the_start(ladder):
+    assert ladder.max_price_within(20 * LAKH, 99 * LAKH) == 95 * LAKH
+    assert ladder.max_price_within(21 * LAKH, 99 * LAKH) == 96 * LAKH
+    assert ladder.max_price_within(20 * LAKH, 20 * LAKH) == 20 * LAKH
+    assert ladder.max_price_within(20 * LAKH, 19 * LAKH) is None
+
+
+def test_price_tables_are_bounded():
+    ladder = IncrementLadder(cache_size=3)
+    for start in range(10):
+        ladder.max_price_within(start * LAKH, 50 * LAKH)
+    assert list(ladder._tables) == [7 * LAKH, 8 * LAKH, 9 * LAKH]
+    # A table in use is kept over older ones
+    ladder.max_price_within(7 * LAKH, 50 * LAKH)
+    ladder.max_price_within(10 * LAKH, 50 * LAKH)
+    assert list(ladder._tables) == [9 * LAKH, 7 * LAKH, 10 * LAKH]
+
+
+def test_changing_the_steps_drops_the_tables(ladder):
+    ladder.max_price_within(20 * LAKH, 50 * LAKH)
+    ladder.set_steps([(0, 10 * LAKH)])
+    assert ladder.max_price_within(20 * LAKH, 55 * LAKH) == 50 * LAKH
+
+
+def test_steps_round_trip_in_lakhs(ladder):
+    assert parse_steps(format_steps(ladder.steps)) == ladder.steps
@@ -0,0 +1,137 @@
+import sqlite3
+
+import pytest
+
+from auction_core import Auction
+from auction_core.schema import create_schema
+from lot_timer import LotTimer
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def timer(clock):
+    expired = []
+    timer = LotTimer(on_expire=expired.append, duration=60, snipe_window=10, extension=15, clock=clock)
+    timer.expired = expired
+    return timer
+
+
+def test_open_sets_the_deadline_from_the_clock(timer, clock):
+    assert timer.open(1) == clock.now + 60
+    assert timer.open(2, duration=30) == clock.now + 30
+    assert timer.remaining(2) == 30
+
+
+def test_bid_outside_the_snipe_window_does_not_extend(timer, clock):
+    deadline = timer.open(1)
+    clock.advance(45)
+    assert timer.on_bid(1) is None
+    assert timer.deadline(1) == deadline
+
+
+def test_bid_inside_the_snipe_window_extends(timer, clock):
+    timer.open(1)
+    clock.advance(55)
+    assert timer.on_bid(1) == clock.now + 15
+    clock.advance(10)
+    assert timer.tick() == []
+    assert timer.remaining(1) == 5
+
+
+def test_bid_on_an_untimed_lot_does_nothing(timer):
+    assert timer.on_bid(1) is None
+
+
+def test_tick_closes_expired_lots_only(timer, clock):
+    timer.open(1, duration=10)
+    timer.open(2, duration=20)
+    clock.advance(10)
+    assert timer.tick() == [1]
+    assert timer.expired == [1]
+    assert timer.deadline(1) is None
+    assert timer.remaining(2) == 10
+    clock.advance(10)
+    assert timer.tick() == [2]
+    assert timer.tick() == []
+    assert timer.expired == [1, 2]
+
+
+def test_cancelled_lot_never_expires(timer, clock):
+    timer.open(1)
+    timer.cancel(1)
+    clock.advance(120)
+    assert timer.tick() == []
+
+
+@pytest.fixture
+def auction(tmp_path, clock):
+    db_path = str(tmp_path / "auction.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.execute("INSERT INTO teams (name, password, budget_remaining, initial_budget) VALUES "
+                 "('A', '', 1000000000, 1000000000), ('B', '', 1000000000, 1000000000)")
+    conn.execute("INSERT INTO items (id, name, base_price, category, nationality, rating) "
+                 "VALUES (1, 'Player', 2000000, 'Batsman', 'India', 80)")
+    conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                     [("lot_duration", "60"), ("snipe_window", "10"), ("snipe_extension", "15")])
+    conn.commit()
+    conn.close()
+
+    auction = Auction(db_path)
+    # Drive the timer by hand: stop its thread and give it the fake clock
+    auction.lot_timer.stop()
+    auction.lot_timer.clock = clock
+    yield auction
+    auction.replica.stop()
+    auction.writer.close()
+
+
+def _lot(auction):
+    conn = sqlite3.connect(auction.db_path)
+    try:
+        return conn.execute("SELECT is_active, winner_team, closes_at FROM items WHERE id = 1").fetchone()
+    finally:
+        conn.close()
+
+
+def test_late_bid_extends_the_stored_deadline_in_its_own_commit(auction, clock):
+    auction.start_lot(1).result()
+    clock.advance(55)
+    auction.place_bid(1, "A", 2000000).result()
+    # No further write is needed: the bid's transaction carried the new deadline
+    assert _lot(auction) == (1, None, clock.now + 15)
+    assert auction.lot_timer.deadline(1) == clock.now + 15
+
+
+def test_expired_lot_is_sold_to_the_highest_bidder(auction, clock):
+    auction.start_lot(1).result()
+    auction.place_bid(1, "A", 2000000).result()
+    clock.advance(59)
+    assert auction.lot_timer.tick() == []
+    clock.advance(1)
+    assert auction.lot_timer.tick() == [1]
+    auction.writer.flush()
+    assert _lot(auction) == (0, "A", None)
+
+
+def test_expired_lot_without_bids_goes_unsold(auction, clock):
+    auction.start_lot(1).result()
+    clock.advance(60)
+    assert auction.lot_timer.tick() == [1]
+    auction.writer.flush()
+    assert _lot(auction) == (0, "UNSOLD", None)
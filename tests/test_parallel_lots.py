@@ -0,0 +1,126 @@
+import sqlite3
+import threading
+
+import pytest
+
+from auction_core import Auction
+from auction_core.schema import create_schema
+from squad_rules import BidRejected, SquadBook
+
+CRORE, LAKH = 10000000, 100000
+
+
+@pytest.fixture
+def auction(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "auction.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.execute("INSERT INTO teams (name, password, budget_remaining, initial_budget) VALUES "
+                 "('A', '', ?, ?), ('B', '', ?, ?)", (CRORE, CRORE, 10 * CRORE, 10 * CRORE))
+    conn.executemany("INSERT INTO items (id, name, base_price, category, nationality, rating) VALUES (?, ?, ?, ?, ?, ?)",
+                     [(item_id, f"Player {item_id}", 80 * LAKH, "Batsman", "India", 80) for item_id in (1, 2, 3)])
+    conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('max_active_lots', '3')")
+    conn.commit()
+    conn.close()
+
+    auction = Auction(db_path)
+    auction.lot_timer.stop()
+    for item_id in (1, 2, 3):
+        auction.start_lot(item_id).result()
+    yield auction
+    auction.replica.stop()
+    auction.writer.close()
+
+
+def _budget(auction, team_name):
+    conn = sqlite3.connect(auction.db_path)
+    try:
+        return conn.execute("SELECT budget_remaining FROM teams WHERE name = ?", (team_name,)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_leading_bids_on_parallel_lots_cannot_overspend(auction):
+    auction.place_bid(1, "A", 80 * LAKH).result()
+    assert auction.squad_book.max_bid("A") == 20 * LAKH
+    for item_id in (2, 3):
+        with pytest.raises(BidRejected):
+            auction.place_bid(item_id, "A", 80 * LAKH).result()
+
+    auction.stop_all_bidding().result()
+    assert _budget(auction, "A") == 20 * LAKH
+    assert auction.squad_book.max_bid("A") == 20 * LAKH
+
+
+def test_being_outbid_releases_the_reservation(auction):
+    auction.place_bid(1, "A", 80 * LAKH).result()
+    auction.place_bid(1, "B", 80 * LAKH).result()
+    assert auction.squad_book.max_bid("A") == CRORE
+    auction.place_bid(2, "A", 80 * LAKH).result()
+
+
+def test_proxies_respect_the_reservation(auction):
+    auction.place_bid(1, "A", 80 * LAKH).result()
+    auction.register_proxy(2, "A", 90 * LAKH).result()
+    assert auction.register_proxy(2, "B", 85 * LAKH).result() == [("B", 80 * LAKH)]
+
+
+def test_a_lead_counts_towards_the_squad_cap():
+    book = SquadBook()
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    create_schema(cur)
+    cur.execute("INSERT INTO teams (name, password, budget_remaining, max_players) VALUES ('A', '', ?, 1)", (CRORE,))
+    book.load(cur)
+
+    book.set_lead(1, "A", 10 * LAKH, "Batsman", "India")
+    assert book.max_bid("A") == 0
+    with pytest.raises(BidRejected):
+        book.bid_limit("A", "Batsman", "India", item_id=2)
+    # Raising its own lead is still allowed
+    assert book.bid_limit("A", "Batsman", "India", item_id=1) == CRORE
+
+    book.clear_lead(1)
+    assert book.max_bid("A") == CRORE
+
+
+def _hold_writer(auction):
+    """Block the writer until the returned event is set, so the next commands share one batch."""
+    release = threading.Event()
+    auction.writer.submit(lambda cur: release.wait(5))
+    return release
+
+
+def test_a_slot_freed_earlier_in_the_batch_can_be_bid_for(auction):
+    conn = sqlite3.connect(auction.db_path)
+    conn.execute("UPDATE teams SET budget_remaining = ?, max_players = 1 WHERE name = 'A'", (10 * CRORE,))
+    conn.commit()
+    auction.squad_book.load(conn.cursor())
+    conn.close()
+    auction.place_bid(1, "A", 80 * LAKH).result()
+    auction.stop_lot(1).result()
+    with pytest.raises(BidRejected):
+        auction.place_bid(2, "A", 80 * LAKH).result()
+
+    release = _hold_writer(auction)
+    deleted = auction.writer.submit(auction.engine.delete_item, 1)
+    bid = auction.writer.submit(auction.engine.place_bid, 2, "A", 80 * LAKH)
+    release.set()
+    deleted.result()
+    assert bid.result() == [("A", 80 * LAKH)]
+
+
+def test_a_rolled_back_command_restores_the_squad_book(auction):
+    auction.place_bid(1, "A", 80 * LAKH).result()
+
+    def sell_then_fail(cur):
+        auction.engine.close_lot(cur, 1, False)
+        assert auction.squad_book.squad("A").players == 1
+        raise RuntimeError("failed after the sale")
+
+    with pytest.raises(RuntimeError):
+        auction.writer.submit(sell_then_fail).result()
+    squad = auction.squad_book.squad("A")
+    assert (squad.budget, squad.players, auction.squad_book.max_bid("A")) == (CRORE, 0, 20 * LAKH)
+    assert _budget(auction, "A") == CRORE
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+import proxy_bidding
+from auction_core.schema import create_schema
+from increments import IncrementLadder
+
+ladder = IncrementLadder([(0, 10)], ceiling=1000)
+
+
+def test_single_proxy_takes_the_lead_at_the_next_step():
+    assert proxy_bidding.resolve(100, "A", [("B", 500)], ladder) == [("B", 110)]
+
+
+def test_first_bid_is_placed_at_the_base_price():
+    assert proxy_bidding.resolve(100, None, [("B", 500)], ladder) == [("B", 100)]
+
+
+def test_leader_holding_the_highest_proxy_does_not_bid_against_itself():
+    assert proxy_bidding.resolve(100, "A", [("A", 500)], ladder) == []
+
+
+def test_proxy_below_the_next_step_does_not_bid():
+    assert proxy_bidding.resolve(100, "A", [("B", 105)], ladder) == []
+
+
+def test_winner_pays_one_step_above_the_runner_up():
+    bids = proxy_bidding.resolve(100, None, [("A", 300), ("B", 500)], ladder)
+    assert bids == [("A", 300), ("B", 310)]
+
+
+def test_winner_price_is_capped_at_its_maximum():
+    bids = proxy_bidding.resolve(100, None, [("A", 300), ("B", 305)], ladder)
+    assert bids == [("A", 300), ("B", 305)]
+
+
+@pytest.mark.parametrize("price, leader", [(100, None), (100, "C"), (110, "C"), (120, "C")])
+def test_equal_maximums_go_to_the_earlier_registration(price, leader):
+    # Whatever the distance to the maximum, the result must not depend on its parity
+    bids = proxy_bidding.resolve(price, leader, [("A", 300), ("B", 300)], ladder)
+    assert bids[-1] == ("A", 300)
+    assert all(team == "B" and amount < 300 for team, amount in bids[:-1])
+
+
+def test_leader_is_not_recorded_as_the_runner_up_to_its_own_bid():
+    bids = proxy_bidding.resolve(100, "A", [("A", 300), ("B", 500)], ladder)
+    assert bids == [("B", 310)]
+
+
+@pytest.mark.parametrize("leader", ["A", "B"])
+def test_equal_maximums_when_one_of_them_leads(leader):
+    bids = proxy_bidding.resolve(200, leader, [("A", 300), ("B", 300)], ladder)
+    assert bids[-1] == ("A", 300)
+
+
+def test_run_proxies_records_the_settled_bids():
+    conn = sqlite3.connect(":memory:")
+    cur = conn.cursor()
+    create_schema(cur)
+    cur.execute("INSERT INTO teams (name, password, budget_remaining) VALUES ('A', '', 1000), ('B', '', 1000)")
+    cur.execute("INSERT INTO items (id, name, base_price, is_active) VALUES (1, 'Player', 100, 1)")
+    proxy_bidding.register_proxy(cur, 1, "A", 400)
+    proxy_bidding.register_proxy(cur, 1, "B", 400)
+
+    bids = proxy_bidding.run_proxies(cur, 1, ladder)
+
+    assert bids[-1] == ("A", 400)
+    cur.execute("SELECT team_name, amount FROM bids WHERE item_id = 1 ORDER BY amount DESC LIMIT 1")
+    assert cur.fetchone() == ("A", 400)
+    cur.execute("SELECT base_price FROM items WHERE id = 1")
+    assert cur.fetchone()[0] == 400
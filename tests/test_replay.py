@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+
+import replay
+from auction_core import Auction
+from auction_core.schema import create_schema
+
+LAKH = 100000
+
+
+@pytest.fixture
+def auction(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "auction.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.execute("INSERT INTO teams (name, password, budget_remaining, initial_budget) VALUES "
+                 "('A', '', 1000000000, 1000000000), ('B', '', 1000000000, 1000000000), "
+                 "('C', '', 1000000000, 1000000000)")
+    conn.executemany("INSERT INTO items (id, name, base_price, category, nationality, rating) VALUES (?, ?, ?, ?, ?, ?)",
+                     [(1, "Player 1", 20 * LAKH, "Batsman", "India", 80),
+                      (2, "Player 2", 50 * LAKH, "Bowler", "Australia", 85)])
+    conn.commit()
+    conn.close()
+
+    auction = Auction(db_path)
+    auction.lot_timer.stop()
+    yield auction
+    auction.replica.stop()
+    auction.writer.close()
+
+
+def test_replay_re_runs_proxies_instead_of_their_bids(auction):
+    auction.start_lot(1).result()
+    auction.register_proxy(1, "A", 73 * LAKH).result()   # A opens the lot at the base price
+    bids = auction.register_proxy(1, "B", 61 * LAKH).result()  # B jumps to its maximum, A answers
+    assert [team for team, _ in bids] == ["B", "A"] and bids[0][1] > 21 * LAKH
+    auction.place_bid(1, "C", bids[-1][1]).result()      # C bids over A's proxy
+    auction.stop_all_bidding().result()
+
+    auction.start_lot(2).result()
+    auction.place_bid(2, "C", 50 * LAKH).result()
+    auction.register_proxy(2, "A", 100 * LAKH).result()
+    auction.register_proxy(2, "A", 140 * LAKH).result()  # Raising the maximum
+    auction.place_bid(2, "B", auction.lot_board.snapshot(2)[0]).result()  # A's proxy answers B's bid
+    auction.stop_all_bidding().result()
+    auction.writer.flush()
+
+    conn = sqlite3.connect(auction.db_path)
+    proxy_bids = conn.execute("SELECT COUNT(*) FROM bids WHERE proxy = 1").fetchone()[0]
+    conn.close()
+    assert proxy_bids >= 4
+
+    report = replay.replay(auction.db_path)
+    assert report["bid_mismatches"] == []
+    assert report["budget_mismatches"] == {}
+    assert report["sold_missing"] == report["sold_extra"] == []
+
+
+def test_replay_reports_a_proxy_bid_that_does_not_come_back(auction):
+    auction.start_lot(1).result()
+    auction.register_proxy(1, "A", 40 * LAKH).result()
+    auction.place_bid(1, "B", 20 * LAKH).result()
+    auction.writer.flush()
+
+    # Forge a recording where A's proxy answered at a price off the ladder
+    conn = sqlite3.connect(auction.db_path)
+    conn.execute("UPDATE bids SET amount = amount + 1 WHERE proxy = 1")
+    conn.commit()
+    conn.close()
+
+    problems = {problem for *_, problem in replay.replay(auction.db_path)["bid_mismatches"]}
+    assert problems >= {"proxy bid missing from the replay", "proxy bid only in the replay"}
@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+from auction_core.schema import create_schema
+from replica import Replicator
+
+
+@pytest.fixture
+def live(tmp_path):
+    db_path = str(tmp_path / "auction.db")
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    create_schema(conn.cursor())
+    conn.execute("INSERT INTO teams (name, password, budget_remaining) VALUES ('A', '', 100), ('B', '', 100)")
+    conn.executemany("INSERT INTO items (id, name, base_price, category, nationality, rating) VALUES (?, ?, 10, 'Batsman', 'India', 80)",
+                     [(item_id, f"Player {item_id}") for item_id in range(1, 51)])
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def replicator(live, tmp_path):
+    # Drive the cycles by hand: stop the thread and sync through our own connections
+    replicator = Replicator(str(tmp_path / "auction.db"), interval=60)
+    replicator.stop()
+    replicator._data_version = None  # PRAGMA data_version is per connection
+    src = sqlite3.connect(f"file:{replicator.db_path}?mode=ro", uri=True, isolation_level=None)
+    dst = sqlite3.connect(replicator.replica_path, isolation_level=None)
+    replicator.sync_once = lambda: replicator.sync(src, dst)
+    replicator.replica = dst
+    yield replicator
+    dst.close()
+    src.close()
+
+
+def test_only_changed_keyed_rows_are_copied(live, replicator):
+    live.execute("UPDATE items SET name = 'Renamed' WHERE id = 7")
+    live.execute("DELETE FROM teams WHERE name = 'B'")
+    live.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('lot_duration', '45')")
+    live.execute("INSERT INTO nominations (team_name, item_id) VALUES ('A', 7)")
+
+    assert replicator.sync_once() == 4
+    replica = replicator.replica
+    assert replica.execute("SELECT name FROM items WHERE id = 7").fetchone() == ("Renamed",)
+    assert replica.execute("SELECT name FROM teams").fetchall() == [("A",)]
+    assert replica.execute("SELECT value FROM settings WHERE key = 'lot_duration'").fetchone() == ("45",)
+    assert replica.execute("SELECT team_name, item_id FROM nominations").fetchall() == [("A", 7)]
+    assert replica.execute("SELECT rowid FROM items_fts WHERE items_fts MATCH 'Renamed'").fetchall() == [(7,)]
+
+    # A commit that touches no keyed table copies just its own rows
+    live.execute("INSERT INTO bids (item_id, team_name, amount) VALUES (7, 'A', 10)")
+    assert replicator.sync_once() == 1
+    assert replicator.sync_once() == 0
+
+
+def test_a_key_changed_twice_is_copied_once(live, replicator):
+    live.execute("UPDATE teams SET budget_remaining = 90 WHERE name = 'A'")
+    live.execute("UPDATE teams SET budget_remaining = 80 WHERE name = 'A'")
+    assert replicator.sync_once() == 1
+    assert replicator.replica.execute("SELECT budget_remaining FROM teams WHERE name = 'A'").fetchone() == (80,)
+
+
+def test_the_replica_keeps_no_change_log_of_its_own(replicator):
+    replica = replicator.replica
+    assert replica.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_replica_%'").fetchone() == (0,)
@@ -0,0 +1,28 @@
+import pytest
+
+import simulator
+
+
+def test_bot_without_a_policy_cannot_be_built():
+    with pytest.raises(TypeError):
+        simulator.Bot("Team 1", None)
+
+
+@pytest.mark.parametrize("strategies", [("valuation",), ("pacing",), ("random",), ("valuation", "pacing", "random")])
+def test_simulated_auction_keeps_budgets_and_squads_consistent(strategies):
+    report = simulator.simulate(num_lots=40, num_teams=4, strategies=strategies, seed=3, max_players=6)
+
+    assert report["sold"] + report["unsold"] == 40
+    assert sum(squad["players"] for squad in report["squads"].values()) == report["sold"]
+    for squad in report["squads"].values():
+        assert squad["budget_remaining"] >= 0
+        assert squad["budget_remaining"] + squad["spent"] == simulator.STARTING_BUDGET
+        assert squad["players"] <= 6
+
+
+def test_reserve_price_keeps_money_back_for_the_minimum_squad():
+    report = simulator.simulate(num_lots=40, num_teams=4, strategies=("valuation",), seed=1,
+                                min_squad_size=5, reserve_price=20000000)
+    for squad in report["squads"].values():
+        open_slots = max(0, 5 - squad["players"])
+        assert squad["budget_remaining"] >= open_slots * 20000000
@@ -0,0 +1,69 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("sklearn")
+
+import archive
+import valuation
+from auction_core.schema import create_schema
+
+CATEGORIES = ["Batsman", "Bowler", "All-rounder", "Wicketkeeper"]
+
+
+def _sell(conn, first_id, count):
+    for item_id in range(first_id, first_id + count):
+        rating = 60 + item_id % 35
+        conn.execute("INSERT INTO sold_items (item_name, sold_amount, rating, category, nationality, team_bought, timestamp) "
+                     "VALUES (?, ?, ?, ?, ?, 'A', ?)",
+                     (f"Player {item_id}", rating * 100000, rating, CATEGORIES[item_id % 4],
+                      "India" if item_id % 3 else "Australia", datetime.now().isoformat()))
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = str(tmp_path / "auction.db")
+    conn = sqlite3.connect(db_path)
+    create_schema(conn.cursor())
+    conn.execute("INSERT INTO teams (name, password, budget_remaining, initial_budget) VALUES ('A', '', 1000000000, 1000000000)")
+    conn.executemany("INSERT INTO items (id, name, base_price, category, nationality, rating) VALUES (?, ?, 2000000, ?, 'India', ?)",
+                     [(item_id, f"Player {item_id}", CATEGORIES[item_id % 4], 60 + item_id % 35) for item_id in range(1, 11)])
+    conn.commit()
+    conn.close()
+    return db_path
+
+
+def test_training_reads_the_archive_as_well_as_the_live_tables(db_path, tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    conn = sqlite3.connect(db_path)
+    _sell(conn, 1, 8)
+    conn.commit()
+    conn.close()
+    archive.archive_auction(db_path, "2024", archive_dir)
+
+    conn = sqlite3.connect(db_path)
+    _sell(conn, 1, 4)
+    conn.commit()
+    conn.close()
+
+    assert len(valuation.load_archived_sales(archive_dir)) == 8
+    _, metadata = valuation.train([db_path], archive_dir)
+    assert (metadata["auctions"], metadata["samples"]) == (2, 12)
+
+
+def test_cached_predictions_go_through_the_writer(db_path):
+    conn = sqlite3.connect(db_path)
+    _sell(conn, 1, 10)
+    conn.commit()
+    conn.close()
+    model, metadata = valuation.train([db_path])
+
+    assert valuation.cache_predictions(db_path, model, metadata) == 10
+    conn = sqlite3.connect(db_path)
+    prices = [row[0] for row in conn.execute("SELECT expected_price FROM items")]
+    stored = conn.execute("SELECT value FROM settings WHERE key = 'valuation_model'").fetchone()
+    conn.close()
+    assert all(price and price % 100000 == 0 for price in prices)
+    assert stored is not None
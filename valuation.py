@@ -0,0 +1,151 @@
+"""
+Player valuation model.
+
+Trains a price model on the ``sold_items`` of one or more saved auctions and
+of the auctions archived to Parquet (see archive.py) (rating, category and
+overseas status -> sold amount) and writes a predicted price for every player
+into ``items.expected_price``. Training and inference run offline; the writes
+go through a write queue like every other mutation, and the app and the bots
+only read the cached column.
+
+    python valuation.py biddi09i_game.db                      # train on this auction and the archive
+    python valuation.py biddi09i_game.db --history 2024.db 2023.db --archive-dir archive
+"""
+import argparse
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer, TransformedTargetRegressor
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.model_selection import cross_val_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from archive import ARCHIVE_DIR, ArchiveReader
+from auction_core import format_amount
+from squad_rules import HOME_NATIONALITY
+from write_queue import WriteQueue
+
+SALE_COLUMNS = ["rating", "category", "nationality", "sold_amount"]
+
+def load_sales(db_path):
+    """Final sale of every player in one auction database, as a DataFrame."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        # A player that was re-auctioned keeps only its last sale
+        return pd.read_sql_query("""SELECT rating, category, nationality, sold_amount FROM sold_items s
+                                    WHERE id = (SELECT MAX(id) FROM sold_items WHERE item_name = s.item_name)""", conn)
+    finally:
+        conn.close()
+
+
+def load_archived_sales(archive_dir=ARCHIVE_DIR):
+    """Final sale of every player in every archived auction, as a DataFrame (empty without an archive)."""
+    reader = ArchiveReader(archive_dir)
+    if "sold_items" not in reader.tables():
+        return pd.DataFrame(columns=SALE_COLUMNS)
+    sales = reader.read("sold_items", columns=["auction", "id", "item_name", *SALE_COLUMNS]).to_pandas()
+    last = sales.groupby(["auction", "item_name"])["id"].transform("max")
+    return sales.loc[sales["id"] == last, SALE_COLUMNS].reset_index(drop=True)
+
+
+def _features(frame):
+    return pd.DataFrame({
+        "rating": frame["rating"].fillna(0),
+        "category": frame["category"].fillna(""),
+        "overseas": (frame["nationality"] != HOME_NATIONALITY).astype(int),
+    })
+
+
+def build_model():
+    # Prices are skewed (a few marquee players go for many times the rest), so fit on log price
+    return TransformedTargetRegressor(
+        regressor=Pipeline([
+            ("encode", ColumnTransformer([("category", OneHotEncoder(handle_unknown="ignore"), ["category"])],
+                                         remainder="passthrough")),
+            ("regress", GradientBoostingRegressor(n_estimators=200, max_depth=3, learning_rate=0.05)),
+        ]),
+        func=np.log1p,
+        inverse_func=np.expm1,
+    )
+
+
+def train(db_paths, archive_dir=None):
+    """
+    Fit the model on every auction in ``db_paths`` and, with ``archive_dir``,
+    every auction archived there; returns (model, metadata).
+    """
+    frames = [load_sales(path) for path in db_paths]
+    archived = ArchiveReader(archive_dir).auctions() if archive_dir else []
+    if archived:
+        frames.append(load_archived_sales(archive_dir))
+    sales = pd.concat(frames, ignore_index=True)
+    sales = sales[sales["sold_amount"] > 0]
+    if len(sales) < 5:
+        raise ValueError(f"Need at least 5 sales to train on, found {len(sales)}.")
+    X, y = _features(sales), sales["sold_amount"]
+
+    model = build_model()
+    metadata = {"trained_at": datetime.now().isoformat(), "auctions": len(db_paths) + len(archived),
+                "samples": len(sales)}
+    if len(sales) >= 20:
+        scores = cross_val_score(model, X, y, cv=5, scoring="neg_mean_absolute_error")
+        metadata["mae"] = int(-scores.mean())
+    model.fit(X, y)
+    return model, metadata
+
+
+def _store_predictions(cur, prices, metadata):
+    cur.executemany("UPDATE items SET expected_price = ? WHERE id = ?", prices)
+    cur.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('valuation_model', ?)", (json.dumps(metadata),))
+
+
+def cache_predictions(db_path, model, metadata, writer=None):
+    """
+    Write every player's expected price into ``items`` (one command). Pass the
+    app's ``writer`` (Auction.writer) when it is running; otherwise a write
+    queue is opened for the call. The database must already have the app's
+    schema.
+    """
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        players = pd.read_sql_query("SELECT id, rating, category, nationality FROM items", conn)
+    finally:
+        conn.close()
+    prices = []
+    if not players.empty:
+        predicted = model.predict(_features(players))
+        prices = [(int(round(price, -5)), int(item_id)) for item_id, price in zip(players["id"], predicted)]
+
+    own_writer = writer is None
+    if own_writer:
+        writer = WriteQueue(db_path)
+    try:
+        writer.submit(_store_predictions, prices, metadata).result()
+    finally:
+        if own_writer:
+            writer.close()
+    return len(players)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the player valuation model and cache its predictions.")
+    parser.add_argument("db_path", help="auction whose players get an expected price")
+    parser.add_argument("--history", nargs="*", default=[], help="past auction databases to train on as well")
+    parser.add_argument("--archive-dir", default=None,
+                        help=f"archived auctions to train on as well (default: {ARCHIVE_DIR}/ next to the database)")
+    args = parser.parse_args()
+
+    archive_dir = args.archive_dir or os.path.join(os.path.dirname(os.path.abspath(args.db_path)), ARCHIVE_DIR)
+    model, metadata = train([args.db_path] + args.history, archive_dir)
+    priced = cache_predictions(args.db_path, model, metadata)
+    mae = f", cross-validated MAE {format_amount(metadata['mae'])}" if "mae" in metadata else ""
+    print(f"trained on {metadata['samples']} sales from {metadata['auctions']} auctions{mae}; priced {priced} players")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Single-writer queue for all database mutations.
+
+Callers submit commands (plain functions that take a cursor as their first
+argument) and get a ``concurrent.futures.Future`` back. One background thread
+owns the only writing connection, applies commands strictly in submission
+order and group-commits everything that queued up while the previous
+transaction was running, so a burst of bids costs one fsync instead of one
+per bid.
+
+A command that also updates in-memory state (e.g. the squad book) does so as
+it runs, so later commands in the same batch see it, and registers an undo
+with ``on_rollback`` in case the command or its batch rolls back.
+"""
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+_STOP = object()
+
+# Writer connection -> rollback callbacks registered by the batch being applied
+_pending = {}
+
+
+def on_rollback(cur, fn, *args):
+    """
+    Run ``fn(cur, *args)`` if the current command is rolled back, on its own or
+    with its batch, once the rollback is done (so ``fn`` reads the restored
+    rows). Outside a WriteQueue (a caller managing its own transaction) it is
+    ignored.
+    """
+    callbacks = _pending.get(cur.connection)
+    if callbacks is not None:
+        callbacks.append((fn, args))
+
+
+class WriteQueue:
+    def __init__(self, db_path, max_batch=64):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.commits = 0    # transactions committed
+        self.commands = 0   # commands applied
+        self.last_error = None  # from the last rollback callback that failed
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="auction-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue ``fn(cursor, *args, **kwargs)``; the future resolves once it is committed."""
+        future = Future()
+        self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def flush(self):
+        """Block until every command submitted so far has been committed."""
+        self.submit(_noop).result()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        # Autocommit mode: transactions are opened and closed explicitly below
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")  # Readers don't block the writer
+        cur = conn.cursor()
+        stopping = False
+        while not stopping:
+            command = self._queue.get()
+            if command is _STOP:
+                break
+            batch = [command]
+            while len(batch) < self.max_batch:
+                try:
+                    command = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if command is _STOP:
+                    stopping = True
+                    break
+                batch.append(command)
+            self._apply(cur, batch)
+        conn.close()
+
+    def _apply(self, cur, batch):
+        outcomes = []
+        callbacks = _pending[cur.connection] = []
+        try:
+            cur.execute("BEGIN IMMEDIATE")
+            for future, fn, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                # A failing command only rolls back its own changes (and undoes its in-memory ones)
+                cur.execute("SAVEPOINT command")
+                registered = len(callbacks)
+                try:
+                    result = fn(cur, *args, **kwargs)
+                except Exception as exc:
+                    cur.execute("ROLLBACK TO command")
+                    cur.execute("RELEASE command")
+                    self._undo(cur, callbacks[registered:])
+                    del callbacks[registered:]
+                    outcomes.append((future, False, exc))
+                else:
+                    cur.execute("RELEASE command")
+                    outcomes.append((future, True, result))
+            cur.execute("COMMIT")
+        except sqlite3.Error as exc:
+            if cur.connection.in_transaction:
+                cur.execute("ROLLBACK")
+            self._undo(cur, callbacks)
+            for future, fn, args, kwargs in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        finally:
+            del _pending[cur.connection]
+
+        self.commits += 1
+        self.commands += len(outcomes)
+        # Results are only published after the commit, so callers see durable state
+        for future, ok, value in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    def _undo(self, cur, callbacks):
+        for fn, args in reversed(callbacks):
+            try:
+                fn(cur, *args)
+            except Exception as exc:
+                self.last_error = exc
+
+
+def _noop(cur):
+    return None
+
+
+def _insert_bid(cur, item_id, team_name, amount):
+    cur.execute("INSERT INTO bids (item_id, team_name, amount, timestamp) VALUES (?, ?, ?, ?)",
+                (item_id, team_name, amount, str(time.time())))
+
+
+def benchmark(num_bids=2000):
+    """Compare commit-per-bid against the write queue for a burst of bids."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        setup = sqlite3.connect(db_path)
+        setup.execute("PRAGMA journal_mode=WAL")
+        setup.execute("CREATE TABLE bids (id INTEGER PRIMARY KEY AUTOINCREMENT, item_id INTEGER, team_name TEXT, amount INTEGER, timestamp TEXT)")
+        setup.commit()
+
+        start = time.perf_counter()
+        for i in range(num_bids):
+            _insert_bid(setup, 1, "Team A", i)
+            setup.commit()
+        direct = time.perf_counter() - start
+        setup.close()
+
+        writer = WriteQueue(db_path)
+        start = time.perf_counter()
+        futures = [writer.submit(_insert_bid, 2, "Team B", i) for i in range(num_bids)]
+        for future in futures:
+            future.result()
+        queued = time.perf_counter() - start
+        writer.close()
+
+    print(f"commit per bid: {num_bids / direct:,.0f} bids/s")
+    print(f"write queue:    {num_bids / queued:,.0f} bids/s ({writer.commits} commits)")
+
+
+if __name__ == "__main__":
+    benchmark()